@@ -0,0 +1,111 @@
+"""Time the /analysis question set per question vs. the single-pass aggregate.
+
+Needs a reachable PostgreSQL (the same settings as the app, see config.py).
+Synthetic applicants spread over 34 terms are loaded into a scratch table
+that is migrated like the real one and dropped afterwards. The "per-question"
+numbers run every question's own query, one after another, which is what
+_build_results did before. The "single-pass" numbers fold the whole-table
+questions into one aggregate scan and run the rest on their own.
+
+Usage:
+    python benchmarks/bench_analysis_queries.py [--rows 1000000] [--repeat 5]
+"""
+
+import argparse
+import contextlib
+import importlib
+import io
+import os
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+import psycopg  # pylint: disable=wrong-import-position
+
+import app as app_module  # pylint: disable=wrong-import-position
+import config  # pylint: disable=wrong-import-position
+import migrate  # pylint: disable=wrong-import-position
+import query_data  # pylint: disable=wrong-import-position
+
+BENCH_TABLE = "applicant_bench"
+
+
+def fill_table(conn, rows):
+    """Insert rows synthetic applicants with generate_series."""
+    conn.execute(
+        f"""
+        INSERT INTO {BENCH_TABLE} (
+            program, url, status, term, us_or_international, gpa, gre,
+            degree, llm_generated_program, llm_generated_university)
+        SELECT field || ', University ' || (i % 997),
+            'https://www.thegradcafe.com/result/' || i,
+            (ARRAY['Accepted', 'Rejected', 'Interview', 'Wait listed'])[1 + i % 4],
+            (ARRAY['Fall', 'Spring'])[1 + i % 2] || ' ' || (2010 + i % 17),
+            (ARRAY['American', 'International', 'Other'])[1 + i % 3],
+            3.0 + (i % 100) / 100.0,
+            CASE WHEN i % 3 = 0 THEN 320 END,
+            (ARRAY['Masters', 'PhD'])[1 + i % 2],
+            field,
+            'University ' || (i % 997)
+        FROM generate_series(1, {int(rows)}) AS i,
+            LATERAL (SELECT (ARRAY['Computer Science', 'Physics', 'Economics',
+                'Biology', 'Mathematics'])[1 + i % 5] AS field) AS f;
+        """
+    )
+
+
+def best_of(repeat, question_map):
+    """Fastest of repeat _build_results runs, in milliseconds."""
+    deps = app_module.AppDeps(
+        base_dir=ROOT,
+        question_map=question_map,
+        connect_fn=psycopg.connect,
+        db_kwargs_fn=config.get_db_connect_kwargs,
+        start_pull_fn=None,
+    )
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        app_module._build_results(deps)  # pylint: disable=protected-access
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    """Print /analysis result-building latency for both strategies."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    config.TABLE_NAME = BENCH_TABLE
+    # Rebuild the questions against the scratch table.
+    importlib.reload(query_data)
+    stock = query_data.question_sql_dict
+    # A trailing newline keeps each query's meaning but stops it from folding.
+    per_question = {question: query + "\n" for question, query in stock.items()}
+
+    with psycopg.connect(**config.get_db_connect_kwargs(), autocommit=True) as conn:
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                migrate.upgrade(conn, target=2)
+                fill_table(conn, args.rows)
+                migrate.upgrade(conn)
+            conn.execute(f"VACUUM ANALYZE {BENCH_TABLE};")
+
+            print(f"{'strategy':<14} {'queries':>8} {'ms / page':>10}")
+            for label, question_map in (("per-question", per_question), ("single-pass", stock)):
+                _sql, folded = query_data.single_pass_plan(question_map)
+                queries = len(question_map) - len(folded) + (1 if folded else 0)
+                print(f"{label:<14} {queries:>8} {best_of(args.repeat, question_map):>10.1f}")
+        finally:
+            conn.execute(f"DROP TABLE IF EXISTS {BENCH_TABLE};")
+            conn.execute(f"DROP TABLE IF EXISTS {migrate.error_table_name()};")
+            conn.execute(f"DELETE FROM {migrate.SCHEMA_VERSION_TABLE} WHERE table_name = %s;",
+                         (BENCH_TABLE,))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Compare executemany inserts with the COPY + staging-table loader.
+
+Needs a reachable PostgreSQL (the same settings as the app, see config.py).
+Synthetic applicant rows are loaded into a scratch table that is dropped
+afterwards. The "executemany" numbers come from a verbatim copy of the old
+INSERT ... VALUES ... ON CONFLICT loop. Each size is loaded into an empty
+table, and then loaded again so every row is a duplicate.
+
+Usage:
+    python benchmarks/bench_copy_load.py [--sizes 10000,100000,1000000]
+                                         [--executemany-max 100000]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+from datetime import date
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+import psycopg  # pylint: disable=wrong-import-position
+
+import config  # pylint: disable=wrong-import-position
+import load_data  # pylint: disable=wrong-import-position
+import migrate  # pylint: disable=wrong-import-position
+
+BENCH_TABLE = "applicant_bench"
+
+
+def legacy_executemany(conn, records):
+    """The pre-COPY loader's happy path, kept here only as the baseline."""
+    insert_query = f"""
+    INSERT INTO {config.TABLE_NAME} (
+        program, comments, date_added, url, status, term,
+        us_or_international, gpa, gre, gre_v, gre_aw, degree,
+        llm_generated_program, llm_generated_university
+    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+    ON CONFLICT (url) DO NOTHING;
+    """
+    with conn.cursor() as cursor:
+        cursor.executemany(insert_query, records)
+    conn.commit()
+
+
+def synthetic_rows(count):
+    """Build count insert tuples shaped like cleaned GradCafe rows."""
+    return [
+        (
+            f"Computer Science, University {i % 900}",
+            "Great program, quick reply." if i % 3 else None,
+            date(2026, 1 + i % 12, 1 + i % 28),
+            f"https://www.thegradcafe.com/result/{i}",
+            ("Accepted", "Rejected", "Interview", "Wait listed")[i % 4],
+            "Fall 2026",
+            "International" if i % 2 else "American",
+            3.0 + (i % 100) / 100,
+            320.0 + i % 20,
+            160.0 + i % 10,
+            4.0 + (i % 4) / 2,
+            "PhD" if i % 2 else "Masters",
+            "Computer Science",
+            f"University {i % 900}",
+        )
+        for i in range(count)
+    ]
+
+
+def _timed(load, conn, rows):
+    """Seconds to run one load with load_data's progress output silenced."""
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        load(conn, rows)
+    return time.perf_counter() - start
+
+
+def main():
+    """Print rows/s for each loader and size, fresh and all-duplicate."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="10000,100000,1000000")
+    parser.add_argument("--executemany-max", type=int, default=100000,
+                        help="Skip the executemany baseline above this many rows.")
+    args = parser.parse_args()
+
+    config.TABLE_NAME = BENCH_TABLE
+    loaders = [("executemany", legacy_executemany),
+               ("copy", load_data.bulk_insert_with_skip_duplicates)]
+    print(f"{'rows':>8} {'loader':<12} {'fresh rows/s':>13} {'dupes rows/s':>13}")
+    with psycopg.connect(**config.get_db_connect_kwargs()) as conn:
+        with contextlib.redirect_stdout(io.StringIO()):
+            load_data.create_table_if_not_exists(conn)
+        conn.commit()
+        try:
+            for size in (int(s) for s in args.sizes.split(",")):
+                rows = synthetic_rows(size)
+                for name, load in loaders:
+                    if name == "executemany" and size > args.executemany_max:
+                        continue
+                    conn.execute(f"TRUNCATE TABLE {BENCH_TABLE} RESTART IDENTITY;")
+                    conn.commit()
+                    fresh = _timed(load, conn, rows)
+                    dupes = _timed(load, conn, rows)
+                    print(f"{size:>8} {name:<12} {size / fresh:>13,.0f} {size / dupes:>13,.0f}")
+        finally:
+            conn.execute(f"DROP TABLE IF EXISTS {BENCH_TABLE};")
+            conn.execute(f"DROP TABLE IF EXISTS {load_data.error_table_name()};")
+            conn.execute(f"DELETE FROM {migrate.SCHEMA_VERSION_TABLE} WHERE table_name = %s;",
+                         (BENCH_TABLE,))
+            conn.commit()
+
+
+if __name__ == "__main__":
+    main()
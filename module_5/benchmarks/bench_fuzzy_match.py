@@ -0,0 +1,75 @@
+"""Compare per-lookup latency of difflib.get_close_matches and FuzzyIndex.
+
+Queries are canonical names with a few random typos, the kind of near-miss
+that reaches the fuzzy step after the LLM answers. Both matchers run over the
+same queries at the cutoffs the standardizer uses, and every answer is
+checked for parity before timings are printed.
+
+Usage:
+    python benchmarks/bench_fuzzy_match.py [--queries 2000]
+"""
+
+import argparse
+import difflib
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(os.path.join(ROOT, "llm_hosting"))
+
+import standardizer  # pylint: disable=wrong-import-position
+from fuzzy_index import FuzzyIndex  # pylint: disable=wrong-import-position
+
+
+def _mutate(rng, text):
+    """Apply up to four random character edits to text."""
+    chars = list(text)
+    for _ in range(rng.randint(0, 4)):
+        op, i = rng.random(), rng.randrange(len(chars) + 1)
+        if op < 0.33 and chars:
+            chars.pop(min(i, len(chars) - 1))
+        elif op < 0.66:
+            chars.insert(i, rng.choice("abcdefghijklmnopqrstuvwxyz ,."))
+        elif chars:
+            chars[min(i, len(chars) - 1)] = rng.choice("abcdefghijklmnopqrstuvwxyz")
+    return "".join(chars).title()
+
+
+def _time_per_lookup(match, queries):
+    """Return (microseconds per query, answers)."""
+    start = time.perf_counter()
+    answers = [match(q) for q in queries]
+    return (time.perf_counter() - start) / len(queries) * 1e6, answers
+
+
+def main():
+    """Print difflib vs. index latency for the program and university lists."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    print(f"{'list':<12} {'size':>5} {'difflib us':>11} {'index us':>9} {'speedup':>8}")
+    for label, candidates, cutoff in (
+        ("programs", standardizer.CANON_PROGS, 0.84),
+        ("universities", standardizer.CANON_UNIS, 0.86),
+    ):
+        queries = [_mutate(rng, rng.choice(candidates)) for _ in range(args.queries)]
+        index = FuzzyIndex(candidates)
+
+        def scan(query, candidates=candidates, cutoff=cutoff):
+            matches = difflib.get_close_matches(query, candidates, n=1, cutoff=cutoff)
+            return matches[0] if matches else None
+
+        slow, expected = _time_per_lookup(scan, queries)
+        fast, answers = _time_per_lookup(lambda q, c=cutoff: index.best_match(q, c), queries)
+        mismatches = sum(a != b for a, b in zip(expected, answers))
+        if mismatches:
+            raise SystemExit(f"{label}: {mismatches} answers differ from difflib")
+        print(f"{label:<12} {len(candidates):>5} {slow:>11.1f} {fast:>9.1f} {slow / fast:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
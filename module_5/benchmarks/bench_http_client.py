@@ -0,0 +1,81 @@
+"""Benchmark page fetches against a local stub server, with and without keep-alive.
+
+Usage:
+    python benchmarks/bench_http_client.py [--requests 500]
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import urllib3
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+import config  # pylint: disable=wrong-import-position
+import scrape  # pylint: disable=wrong-import-position
+
+PAGE = b"<html><body><table><tr><td>stub</td></tr></table></body></html>" * 40
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Serve the same small HTML page over HTTP/1.1 so connections can be reused."""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """Return the stub page."""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(PAGE)))
+        self.end_headers()
+        self.wfile.write(PAGE)
+
+    def log_message(self, *_args):
+        """Keep benchmark output quiet."""
+
+
+def _run(fetch, url, count):
+    start = time.perf_counter()
+    for _ in range(count):
+        fetch(url)
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    """Report requests/sec for a pooled scraper versus one connection per request."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=500)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/survey/?page=1"
+
+    # Measure the network path: with the HTML cache on, every fetch after the
+    # first would be a disk read, and html_cache/ would be written to the cwd.
+    config.HTML_CACHE_ENABLED = False
+    scraper = scrape.GradCafeScraper()
+    scraper.rate_limiter = scrape.HostRateLimiter(0)
+
+    def fetch_without_reuse(page_url):
+        return urllib3.request("GET", page_url, headers={"Connection": "close"}).data
+
+    try:
+        pooled = _run(scraper.fetch_page, url, args.requests)
+        fresh = _run(fetch_without_reuse, url, args.requests)
+    finally:
+        server.shutdown()
+
+    print(f"requests:                {args.requests}")
+    print(f"keep-alive pool:         {pooled:8.1f} req/s")
+    print(f"new connection each:     {fresh:8.1f} req/s")
+    print(f"speedup:                 {pooled / fresh:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Micro-benchmark list/detail page parsing for each BeautifulSoup backend.
+
+Usage:
+    python benchmarks/bench_parsers.py [--seconds 2]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+import config  # pylint: disable=wrong-import-position
+import scrape  # pylint: disable=wrong-import-position
+from model import ApplicantData  # pylint: disable=wrong-import-position
+
+BACKENDS = ("html.parser", "lxml")
+
+
+def _fixture(name):
+    with open(os.path.join(ROOT, "tests", "resources", name), encoding="utf-8") as f:
+        return f.read()
+
+
+def _pages_per_second(parse, seconds):
+    count = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        parse()
+        count += 1
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    """Print list and detail pages parsed per second for each backend."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=float, default=2.0,
+                        help="Time spent on each backend/page combination.")
+    args = parser.parse_args()
+
+    list_html = _fixture("list_page.html")
+    detail_html = _fixture("detail_page.html")
+
+    print(f"{'backend':<12} {'list pages/s':>14} {'detail pages/s':>16}")
+    for backend in BACKENDS:
+        config.PARSER_BACKEND = backend
+        scraper = scrape.GradCafeScraper()
+        list_rate = _pages_per_second(lambda s=scraper: s.parse_list_page(list_html), args.seconds)
+        detail_rate = _pages_per_second(
+            lambda s=scraper: s.parse_detail_page(detail_html, ApplicantData()), args.seconds)
+        print(f"{backend:<12} {list_rate:>14.1f} {detail_rate:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
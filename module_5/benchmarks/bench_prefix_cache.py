@@ -0,0 +1,74 @@
+"""Compare per-row latency with and without the saved few-shot prefix state.
+
+Needs llama-cpp-python and the GGUF model (downloaded on first run). Three
+modes standardize the same program strings one row at a time:
+
+* reset    - llm.reset() before every call, so the whole prompt is evaluated
+* implicit - llama.cpp reuses only what matches the previous call's tokens
+* saved    - PROMPT_PREFIX_CACHE restores the prefilled prefix state whenever
+             the prompt shape changes (here only once, as every row is single)
+
+The answer cache is disabled so every row reaches the model. Throughput counts
+prompt plus completion tokens per second of wall time.
+
+Usage:
+    python benchmarks/bench_prefix_cache.py [--rows 40]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(os.path.join(ROOT, "llm_hosting"))
+
+import standardizer  # pylint: disable=wrong-import-position
+from sample_programs import distinct_programs  # pylint: disable=wrong-import-position
+
+
+def _run(mode, llm, programs):
+    """Standardize programs one by one and return (seconds, tokens)."""
+    standardizer.PROMPT_PREFIX_CACHE = mode == "saved"
+    standardizer._PREFIX_STATES.clear()  # pylint: disable=protected-access
+    standardizer._LAST_SHAPE = None  # pylint: disable=protected-access
+    complete = llm.create_chat_completion
+    tokens = [0]
+
+    def measured(**kwargs):
+        if mode == "reset":
+            llm.reset()
+        out = complete(**kwargs)
+        tokens[0] += out["usage"]["prompt_tokens"] + out["usage"]["completion_tokens"]
+        return out
+
+    llm.create_chat_completion = measured
+    try:
+        standardizer._call_llm("warm up, UBC")  # pylint: disable=protected-access
+        tokens[0] = 0
+        start = time.perf_counter()
+        for text in programs:
+            standardizer._call_llm(text)  # pylint: disable=protected-access
+        return time.perf_counter() - start, tokens[0]
+    finally:
+        llm.create_chat_completion = complete
+
+
+def main():
+    """Print per-row latency and tokens/sec for each prefix mode."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=40)
+    args = parser.parse_args()
+
+    standardizer.CACHE_PATH = ""
+    llm = standardizer._load_llm()  # pylint: disable=protected-access
+    programs = distinct_programs(args.rows)
+
+    print(f"{'mode':<9} {'ms/row':>8} {'tokens/s':>10}")
+    for mode in ("reset", "implicit", "saved"):
+        seconds, tokens = _run(mode, llm, programs)
+        print(f"{mode:<9} {seconds / len(programs) * 1000:>8.1f} {tokens / seconds:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
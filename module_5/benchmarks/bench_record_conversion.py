@@ -0,0 +1,143 @@
+"""Profile record -> insert-tuple conversion per 100k rows.
+
+Synthetic records repeat dates and numeric strings the way scraped GradCafe
+rows do. The "legacy" numbers come from a verbatim copy of the old per-record
+converter (strptime and re.search on every field). The "batch" numbers come
+from load_data.records_to_rows, which converts column by column with
+memoized date and number parsing. JSON decoding time per 100k lines is shown
+for scale, and the top functions of a cProfile run of each path are printed.
+
+Usage:
+    python benchmarks/bench_record_conversion.py [--rows 100000] [--top 8]
+"""
+
+import argparse
+import cProfile
+import io
+import json
+import os
+import pstats
+import random
+import re
+import sys
+import time
+from datetime import datetime
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+import load_data  # pylint: disable=wrong-import-position
+
+
+def legacy_parse_date(date_string):
+    """The pre-cache date parser, kept here only as the baseline."""
+    try:
+        return datetime.strptime(date_string, "%B %d, %Y").date()
+    except (ValueError, TypeError):
+        return None
+
+
+def legacy_parse_float(value):
+    """The pre-fast-path number parser, kept here only as the baseline."""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = re.search(r"[-+]?\d*\.?\d+(?:[eE][-+]?\d+)?", str(value))
+    return float(match.group()) if match else None
+
+
+def legacy_record_to_row(record):
+    """The per-record converter, kept here only as the baseline."""
+    return (
+        record.get('program'),
+        record.get('comments'),
+        legacy_parse_date(record.get('date_added')),
+        record.get('url'),
+        record.get('applicant_status'),
+        record.get('semester_year_start'),
+        record.get('citizenship'),
+        legacy_parse_float(record.get('gpa')),
+        legacy_parse_float(record.get('gre')),
+        legacy_parse_float(record.get('gre_v')),
+        legacy_parse_float(record.get('gre_aw')),
+        record.get('masters_or_phd'),
+        record.get('llm-generated-program'),
+        record.get('llm-generated-university')
+    )
+
+
+def synthetic_records(count, seed=0):
+    """Records with realistic repetition in dates and scores."""
+    rng = random.Random(seed)
+    months = ["January", "February", "March", "April", "December"]
+    return [
+        {
+            "program": f"Computer Science, University {i % 900}",
+            "url": f"https://www.thegradcafe.com/result/{i}",
+            "date_added": f"{rng.choice(months)} {rng.randint(1, 28)}, {rng.choice((2025, 2026))}",
+            "applicant_status": "Accepted",
+            "semester_year_start": "Fall 2026",
+            "citizenship": "International",
+            "gpa": rng.choice(
+                ["3.50", "GPA 3.89", "3.70", None, "4.00", f"3.{rng.randint(0, 99):02d}"]),
+            "gre": rng.choice([None, "320", "GRE 315", f"{rng.randint(290, 340)}"]),
+            "gre_v": rng.choice([None, "160", f"{rng.randint(140, 170)}"]),
+            "gre_aw": rng.choice([None, "4.5", "AW 4.0"]),
+            "masters_or_phd": "PhD",
+        }
+        for i in range(count)
+    ]
+
+
+def _profile(label, func, top):
+    """Run func under cProfile, print its top functions, return wall seconds."""
+    profiler = cProfile.Profile()
+    start = time.perf_counter()
+    profiler.runcall(func)
+    elapsed = time.perf_counter() - start
+    out = io.StringIO()
+    pstats.Stats(profiler, stream=out).sort_stats("tottime").print_stats(top)
+    print(f"--- {label} (profiled) ---")
+    print("\n".join(line for line in out.getvalue().splitlines()[4:] if line.strip()))
+    return elapsed
+
+
+def main():
+    """Print per-100k conversion time for each path and their profiles."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--top", type=int, default=8)
+    args = parser.parse_args()
+
+    records = synthetic_records(args.rows)
+    lines = [json.dumps(record) for record in records]
+    scale = 100000 / args.rows
+
+    def legacy():
+        return [legacy_record_to_row(record) for record in records]
+
+    def batch():
+        load_data._parse_date_text.cache_clear()  # pylint: disable=protected-access
+        load_data._parse_float_text.cache_clear()  # pylint: disable=protected-access
+        return load_data.records_to_rows(records)
+
+    assert legacy() == batch()
+    timings = {}
+    for label, func in (("json.loads", lambda: [json.loads(line) for line in lines]),
+                        ("legacy", legacy), ("batch", batch)):
+        start = time.perf_counter()
+        func()
+        timings[label] = (time.perf_counter() - start) * scale * 1000
+
+    print(f"{'stage':<12} {'ms / 100k rows':>15}")
+    for label, ms in timings.items():
+        print(f"{label:<12} {ms:>15.1f}")
+    print(f"batch is {timings['legacy'] / timings['batch']:.1f}x faster than legacy\n")
+
+    _profile("legacy", legacy, args.top)
+    _profile("batch", batch, args.top)
+
+
+if __name__ == "__main__":
+    main()
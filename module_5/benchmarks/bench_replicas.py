@@ -0,0 +1,66 @@
+"""Sweep model replica count K against threads per replica on this machine.
+
+Needs llama-cpp-python and the GGUF model. For each K that divides the core
+budget, the same distinct program strings are standardized with K replicas of
+cores // K threads each. The answer cache is disabled so every row reaches
+the model. Prints rows/s per split and the best one.
+
+Usage:
+    python benchmarks/bench_replicas.py [--rows 64] [--batch-size 4] [--cores N]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(os.path.join(ROOT, "llm_hosting"))
+
+import standardizer  # pylint: disable=wrong-import-position
+from sample_programs import distinct_programs  # pylint: disable=wrong-import-position
+
+
+def _rows_per_second(replicas, cores, programs, batch_size):
+    """Time one pass over programs with the given replica split."""
+    # N_THREADS is the whole budget; start_replicas() gives each replica its share.
+    standardizer.N_THREADS = cores
+    standardizer.REPLICAS = replicas
+    if replicas > 1:
+        standardizer.start_replicas(replicas)
+    else:
+        standardizer.warm_up()
+    try:
+        start = time.perf_counter()
+        standardizer.standardize_texts(programs, batch_size=batch_size)
+        return len(programs) / (time.perf_counter() - start)
+    finally:
+        standardizer.stop_replicas()
+
+
+def main():
+    """Print rows/s for each K x threads split and the fastest one."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=64)
+    parser.add_argument("--batch-size", type=int, default=4)
+    parser.add_argument("--cores", type=int, default=os.cpu_count() or 2)
+    args = parser.parse_args()
+
+    standardizer.CACHE_PATH = ""
+    programs = distinct_programs(args.rows)
+    splits = [k for k in range(1, args.cores + 1) if args.cores % k == 0]
+
+    print(f"{'replicas':>8} {'threads':>8} {'rows/s':>8}")
+    results = []
+    for replicas in splits:
+        rate = _rows_per_second(replicas, args.cores, programs, args.batch_size)
+        results.append((rate, replicas))
+        print(f"{replicas:>8} {args.cores // replicas:>8} {rate:>8.2f}")
+
+    best_rate, best_k = max(results)
+    print(f"best: STANDARDIZER_REPLICAS={best_k} N_THREADS={args.cores} "
+          f"({args.cores // best_k} threads each, {best_rate:.2f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Measure how many rows the standardization cache keeps away from the model.
+
+Program strings are drawn with a Zipf-like skew from the canonical program and
+university lists, which mirrors how often popular GradCafe entries repeat.
+A stub model with a fixed per-call latency stands in for TinyLlama.
+Hits and misses come from cache_stats(), so they count the distinct program
+strings each pass looks up, not rows or batched model calls.
+
+Usage:
+    python benchmarks/bench_standardize_cache.py [--rows 20000] [--latency-ms 2]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(os.path.join(ROOT, "llm_hosting"))
+
+import standardizer  # pylint: disable=wrong-import-position
+
+
+def _stub_llama(latency):
+    """A model stand-in that answers every completion after a fixed delay."""
+
+    def create_chat_completion(**_kwargs):
+        time.sleep(latency)
+        content = '{"standardized_program": "X", "standardized_university": "Y"}'
+        return {"choices": [{"message": {"content": content}}]}
+
+    return SimpleNamespace(create_chat_completion=create_chat_completion)
+
+
+def _sample_programs(count, seed):
+    """Draw program strings with a heavy-tailed popularity distribution."""
+    rng = random.Random(seed)
+    combos = [f"{prog}, {uni}" for prog in standardizer.CANON_PROGS[:60]
+              for uni in standardizer.CANON_UNIS[:80]]
+    rng.shuffle(combos)
+    weights = [1.0 / (rank + 1) for rank in range(len(combos))]
+    return rng.choices(combos, weights=weights, k=count)
+
+
+def _run_pass(rows):
+    start = time.perf_counter()
+    standardizer.standardize_rows([{"program": text} for text in rows])
+    return time.perf_counter() - start
+
+
+def main():
+    """Print cache hits, misses and wall time for a cold and a warm pass."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--latency-ms", type=float, default=2.0)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    # Measure the answer cache alone: the stub has no prefix state to save,
+    # and the rules fast path would answer rows before the cache is asked.
+    standardizer.PROMPT_PREFIX_CACHE = False
+    standardizer.RULES_FAST_PATH = False
+
+    with tempfile.TemporaryDirectory() as tmp:
+        standardizer.CACHE_PATH = os.path.join(tmp, "cache.sqlite3")
+        standardizer._LLM = _stub_llama(args.latency_ms / 1000)  # pylint: disable=protected-access
+
+        print(f"{'pass':<6} {'rows':>7} {'hits':>7} {'misses':>7} {'hit rate':>9} {'seconds':>8}")
+        for label, seed in (("cold", args.seed), ("warm", args.seed + 1)):
+            rows = _sample_programs(args.rows, seed)
+            before = standardizer.cache_stats()
+            elapsed = _run_pass(rows)
+            after = standardizer.cache_stats()
+            hits = after["hits"] - before["hits"]
+            misses = after["misses"] - before["misses"]
+            hit_rate = hits / max(1, hits + misses)
+            print(f"{label:<6} {len(rows):>7} {hits:>7} {misses:>7} {hit_rate:>8.1%} "
+                  f"{elapsed:>8.2f}")
+        standardizer._get_cache().close()  # pylint: disable=protected-access
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Benchmark per-row badge parsing before and after the precompiled pattern table.
+
+The "before" numbers come from a verbatim copy of the old ``_parse_status_info``
+that built four status patterns inline and searched them one by one.
+
+Usage:
+    python benchmarks/bench_status_parsing.py [--repeat 2000]
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+import scrape  # pylint: disable=wrong-import-position
+from model import ApplicantData  # pylint: disable=wrong-import-position
+
+
+def legacy_parse_status_info(text, applicant):
+    """The pre-registry implementation, kept here only as the baseline."""
+    status_patterns = [
+        (r'Accepted\s+on\s+(.+?)(?=Fall|Spring|Summer|American|International|GPA|$)',
+         'Accepted'),
+        (r'Rejected\s+on\s+(.+?)(?=Fall|Spring|Summer|American|International|GPA|$)',
+         'Rejected'),
+        (r'Interview\s+on\s+(.+?)(?=Fall|Spring|Summer|American|International|GPA|$)',
+         'Interview'),
+        (r'Wait\s*listed\s+on\s+(.+?)(?=Fall|Spring|Summer|American|International|GPA|$)',
+         'Wait listed'),
+    ]
+    for pattern, status_value in status_patterns:
+        match = re.search(pattern, text, re.IGNORECASE)
+        if match:
+            applicant.status = status_value
+            applicant.decision_date = match.group(1).strip()
+            break
+    semester_match = re.search(r'(Fall|Spring|Summer)\s+(\d{4})', text)
+    if semester_match:
+        applicant.semester_year_start = f"{semester_match.group(1)} {semester_match.group(2)}"
+    if re.search(r'\bAmerican\b', text):
+        applicant.citizenship = 'American'
+    elif re.search(r'\bInternational\b', text):
+        applicant.citizenship = 'International'
+    gpa_match = re.search(r'GPA\s+(\d+\.?\d*)', text)
+    if gpa_match:
+        applicant.gpa = gpa_match.group(1)
+
+
+def _badge_texts():
+    """Collect the status badge text of every row in the recorded list page."""
+    with open(os.path.join(ROOT, "tests", "resources", "list_page.html"), encoding="utf-8") as f:
+        soup = scrape.GradCafeScraper().make_soup(f.read())
+    return [div.get_text(strip=True) for div in soup.select("div.tw-inline-flex.md\\:tw-hidden")]
+
+
+def _per_row_us(parse, texts, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for text in texts:
+            parse(text, ApplicantData())
+    return (time.perf_counter() - start) / (repeat * len(texts)) * 1e6
+
+
+def main():
+    """Print microseconds per badge row for the old and new status parsers."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    texts = _badge_texts()
+    scraper = scrape.GradCafeScraper()
+    before_cached = _per_row_us(legacy_parse_status_info, texts, args.repeat)
+
+    # Purging re's internal cache shows the worst case for inline patterns, where
+    # every call recompiles because other regex users have evicted them.
+    def legacy_uncached(text, applicant):
+        re.purge()
+        legacy_parse_status_info(text, applicant)
+
+    before_uncached = _per_row_us(legacy_uncached, texts, max(1, args.repeat // 20))
+    after = _per_row_us(scraper._parse_status_info, texts, args.repeat)  # pylint: disable=protected-access
+
+    print(f"rows per pass:                 {len(texts)}")
+    print(f"before (re cache warm):        {before_cached:8.2f} us/row")
+    print(f"before (re cache cold):        {before_uncached:8.2f} us/row")
+    print(f"after  (precompiled table):    {after:8.2f} us/row")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,13 @@
+"""Program strings for the model benchmarks, built from llm_hosting/sample_data.json."""
+
+import json
+import os
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+def distinct_programs(count):
+    """Cycle the sample programs, made distinct so llama.cpp cannot reuse a whole prompt."""
+    with open(os.path.join(ROOT, "llm_hosting", "sample_data.json"), encoding="utf-8") as f:
+        base = [row["program"].strip() for row in json.load(f)]
+    return [f"{base[i % len(base)]} {i}" for i in range(count)]
@@ -1,254 +1,33 @@
 # -*- coding: utf-8 -*-
-"""Flask + tiny local LLM standardizer with incremental JSONL CLI output."""
+"""Flask + tiny local LLM standardizer with incremental JSONL CLI output.
+
+The model and normalization rules live in ``standardizer.py``; this module
+only adds the HTTP API and the command-line entry points.
+"""
 
 from __future__ import annotations
 
+import itertools
 import json
 import os
-import re
 import sys
-import difflib
-from typing import Any, Dict, List, Tuple
+from typing import IO, Any, Dict, Iterator, List
 
 from flask import Flask, jsonify, request
-from huggingface_hub import hf_hub_download
-from llama_cpp import Llama  # CPU-only by default if N_GPU_LAYERS=0
-
-app = Flask(__name__)
-
-# ---------------- Model config ----------------
-MODEL_REPO = os.getenv(
-    "MODEL_REPO",
-    "TheBloke/TinyLlama-1.1B-Chat-v1.0-GGUF",
-)
-MODEL_FILE = os.getenv(
-    "MODEL_FILE",
-    "tinyllama-1.1b-chat-v1.0.Q4_K_M.gguf",
-)
-
-N_THREADS = int(os.getenv("N_THREADS", str(os.cpu_count() or 2)))
-N_CTX = int(os.getenv("N_CTX", "2048"))
-N_GPU_LAYERS = int(os.getenv("N_GPU_LAYERS", "0"))  # 0 → CPU-only
 
-CANON_UNIS_PATH = os.getenv("CANON_UNIS_PATH", "canon_universities.txt")
-CANON_PROGS_PATH = os.getenv("CANON_PROGS_PATH", "canon_programs.txt")
-
-# Precompiled, non-greedy JSON object matcher to tolerate chatter around JSON
-JSON_OBJ_RE = re.compile(r"\{.*?\}", re.DOTALL)
-
-# ---------------- Canonical lists + abbrev maps ----------------
-def _read_lines(path: str) -> List[str]:
-    """Read non-empty, stripped lines from a file (UTF-8)."""
-    try:
-        with open(path, "r", encoding="utf-8") as f:
-            return [ln.strip() for ln in f if ln.strip()]
-    except FileNotFoundError:
-        return []
-
-
-CANON_UNIS = _read_lines(CANON_UNIS_PATH)
-CANON_PROGS = _read_lines(CANON_PROGS_PATH)
-
-ABBREV_UNI: Dict[str, str] = {
-    r"(?i)^mcg(\.|ill)?$": "McGill University",
-    r"(?i)^(ubc|u\.?b\.?c\.?)$": "University of British Columbia",
-    r"(?i)^uoft$": "University of Toronto",
-}
-
-COMMON_UNI_FIXES: Dict[str, str] = {
-    "McGiill University": "McGill University",
-    "Mcgill University": "McGill University",
-    # Normalize 'Of' → 'of'
-    "University Of British Columbia": "University of British Columbia",
-}
-
-COMMON_PROG_FIXES: Dict[str, str] = {
-    "Mathematic": "Mathematics",
-    "Info Studies": "Information Studies",
-}
-
-# ---------------- Few-shot prompt ----------------
-SYSTEM_PROMPT = (
-    "You are a data cleaning assistant. Standardize degree program and university "
-    "names.\n\n"
-    "Rules:\n"
-    "- Input provides a single string under key `program` that may contain both "
-    "program and university.\n"
-    "- Split into (program name, university name).\n"
-    "- Trim extra spaces and commas.\n"
-    '- Expand obvious abbreviations (e.g., "McG" -> "McGill University", '
-    '"UBC" -> "University of British Columbia").\n'
-    "- Use Title Case for program; use official capitalization for university "
-    "names (e.g., \"University of X\").\n"
-    '- Ensure correct spelling (e.g., "McGill", not "McGiill").\n'
-    '- If university cannot be inferred, return "Unknown".\n\n'
-    "Return JSON ONLY with keys:\n"
-    "  standardized_program, standardized_university\n"
+from standardizer import (
+    BATCH_SIZE, cache_stats, path_stats, standardize_rows, start_replicas, warm_up
 )
 
-FEW_SHOTS: List[Tuple[Dict[str, str], Dict[str, str]]] = [
-    (
-        {"program": "Information Studies, McGill University"},
-        {
-            "standardized_program": "Information Studies",
-            "standardized_university": "McGill University",
-        },
-    ),
-    (
-        {"program": "Information, McG"},
-        {
-            "standardized_program": "Information Studies",
-            "standardized_university": "McGill University",
-        },
-    ),
-    (
-        {"program": "Mathematics, University Of British Columbia"},
-        {
-            "standardized_program": "Mathematics",
-            "standardized_university": "University of British Columbia",
-        },
-    ),
-]
-
-_LLM: Llama | None = None
-
-
-def _load_llm() -> Llama:
-    """Download (or reuse) the GGUF file and initialize llama.cpp."""
-    global _LLM
-    if _LLM is not None:
-        return _LLM
-
-    model_path = hf_hub_download(
-        repo_id=MODEL_REPO,
-        filename=MODEL_FILE,
-        local_dir="models",
-        local_dir_use_symlinks=False,
-        force_filename=MODEL_FILE,
-    )
-
-    _LLM = Llama(
-        model_path=model_path,
-        n_ctx=N_CTX,
-        n_threads=N_THREADS,
-        n_gpu_layers=N_GPU_LAYERS,
-        verbose=False,
-    )
-    return _LLM
-
-
-def _split_fallback(text: str) -> Tuple[str, str]:
-    """Simple, rules-first parser if the model returns non-JSON."""
-    s = re.sub(r"\s+", " ", (text or "")).strip().strip(",")
-    parts = [p.strip() for p in re.split(r",| at | @ ", s) if p.strip()]
-    prog = parts[0] if parts else ""
-    uni = parts[1] if len(parts) > 1 else ""
-
-    # High-signal expansions
-    if re.fullmatch(r"(?i)mcg(ill)?(\.)?", uni or ""):
-        uni = "McGill University"
-    if re.fullmatch(
-        r"(?i)(ubc|u\.?b\.?c\.?|university of british columbia)",
-        uni or "",
-    ):
-        uni = "University of British Columbia"
-
-    # Title-case program; normalize 'Of' → 'of' for universities
-    prog = prog.title()
-    if uni:
-        uni = re.sub(r"\bOf\b", "of", uni.title())
-    else:
-        uni = "Unknown"
-    return prog, uni
-
-
-def _best_match(name: str, candidates: List[str], cutoff: float = 0.86) -> str | None:
-    """Fuzzy match via difflib (lightweight, Replit-friendly)."""
-    if not name or not candidates:
-        return None
-    matches = difflib.get_close_matches(name, candidates, n=1, cutoff=cutoff)
-    return matches[0] if matches else None
-
-
-def _post_normalize_program(prog: str) -> str:
-    """Apply common fixes, title case, then canonical/fuzzy mapping."""
-    p = (prog or "").strip()
-    p = COMMON_PROG_FIXES.get(p, p)
-    p = p.title()
-    if p in CANON_PROGS:
-        return p
-    match = _best_match(p, CANON_PROGS, cutoff=0.84)
-    return match or p
-
-
-def _post_normalize_university(uni: str) -> str:
-    """Expand abbreviations, apply common fixes, capitalization, and canonical map."""
-    u = (uni or "").strip()
-
-    # Abbreviations
-    for pat, full in ABBREV_UNI.items():
-        if re.fullmatch(pat, u):
-            u = full
-            break
-
-    # Common spelling fixes
-    u = COMMON_UNI_FIXES.get(u, u)
-
-    # Normalize 'Of' → 'of'
-    if u:
-        u = re.sub(r"\bOf\b", "of", u.title())
-
-    # Canonical or fuzzy map
-    if u in CANON_UNIS:
-        return u
-    match = _best_match(u, CANON_UNIS, cutoff=0.86)
-    return match or u or "Unknown"
-
-
-def _call_llm(program_text: str) -> Dict[str, str]:
-    """Query the tiny LLM and return standardized fields."""
-    llm = _load_llm()
-
-    messages = [{"role": "system", "content": SYSTEM_PROMPT}]
-    for x_in, x_out in FEW_SHOTS:
-        messages.append(
-            {"role": "user", "content": json.dumps(x_in, ensure_ascii=False)}
-        )
-        messages.append(
-            {
-                "role": "assistant",
-                "content": json.dumps(x_out, ensure_ascii=False),
-            }
-        )
-    messages.append(
-        {
-            "role": "user",
-            "content": json.dumps({"program": program_text}, ensure_ascii=False),
-        }
-    )
-
-    out = llm.create_chat_completion(
-        messages=messages,
-        temperature=0.0,
-        max_tokens=128,
-        top_p=1.0,
-    )
-
-    text = (out["choices"][0]["message"]["content"] or "").strip()
-    try:
-        match = JSON_OBJ_RE.search(text)
-        obj = json.loads(match.group(0) if match else text)
-        std_prog = str(obj.get("standardized_program", "")).strip()
-        std_uni = str(obj.get("standardized_university", "")).strip()
-    except Exception:
-        std_prog, std_uni = _split_fallback(program_text)
+app = Flask(__name__)
 
-    std_prog = _post_normalize_program(std_prog)
-    std_uni = _post_normalize_university(std_uni)
-    return {
-        "standardized_program": std_prog,
-        "standardized_university": std_uni,
-    }
+# Rows read per standardize_rows call in CLI mode; output is flushed after each.
+# The first call takes a single prompt batch, so output starts after one prompt.
+CLI_CHUNK_ROWS = 64
+# Characters read at a time when stream-parsing a JSON array input.
+CLI_READ_CHARS = 1 << 16
+# Characters that can continue a JSON number, e.g. "-500" + ".5" or "1" + "e3".
+_NUMBER_CHARS = frozenset("0123456789+-.eE")
 
 
 def _normalize_input(payload: Any) -> List[Dict[str, Any]]:
@@ -266,21 +45,105 @@ def health() -> Any:
     return jsonify({"ok": True})
 
 
+@app.get("/stats")
+def stats() -> Any:
+    """Report cache hits/misses and rows per standardization path since startup."""
+    return jsonify({"cache": cache_stats(), "paths": path_stats()})
+
+
 @app.post("/standardize")
 def standardize() -> Any:
-    """Standardize rows from an HTTP request and return JSON."""
+    """Standardize rows from an HTTP request and return JSON.
+
+    An integer batch_size in the body is honored up to the largest batch that
+    fits the model's context window (see standardizer.max_batch_size).
+    """
     payload = request.get_json(force=True, silent=True)
     rows = _normalize_input(payload)
-
-    out: List[Dict[str, Any]] = []
-    for row in rows:
-        program_text = (row or {}).get("program") or ""
-        result = _call_llm(program_text)
-        row["llm-generated-program"] = result["standardized_program"]
-        row["llm-generated-university"] = result["standardized_university"]
-        out.append(row)
-
-    return jsonify({"rows": out})
+    batch_size = payload.get("batch_size") if isinstance(payload, dict) else None
+    if not isinstance(batch_size, int):
+        batch_size = None
+
+    return jsonify({"rows": standardize_rows(rows, batch_size=batch_size)})
+
+
+def _iter_json_array(f: IO[str], first: str) -> Iterator[Any]:
+    """Yield the elements of a top-level JSON array without loading it whole.
+
+    first is the text already read from f, up to and past the opening bracket.
+    Elements are decoded with raw_decode as soon as the buffer holds one.
+    An element is yielded only once the character after it is known and
+    cannot continue a number, so a number split across reads is never cut.
+    """
+    decoder = json.JSONDecoder()
+    buf, pos, eof = first, first.index("[") + 1, False
+    while True:
+        while pos < len(buf) and buf[pos] in " \t\r\n,":
+            pos += 1
+        if pos < len(buf) and buf[pos] == "]":
+            return
+        try:
+            if pos == len(buf):
+                raise json.JSONDecodeError("need more input", buf, pos)
+            item, end = decoder.raw_decode(buf, pos)
+            if not eof and (end == len(buf) or buf[end] in _NUMBER_CHARS):
+                raise json.JSONDecodeError("element may continue", buf, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            more = f.read(CLI_READ_CHARS)
+            eof = not more
+            buf, pos = buf[pos:] + more, 0
+            continue
+        yield item
+        pos = end
+
+
+def _iter_rows(in_path: str) -> Iterator[Dict[str, Any]]:
+    """Yield rows from JSON Lines or a JSON list, streaming; {'rows': [...]} is loaded whole."""
+    with open(in_path, "r", encoding="utf-8") as f:
+        # Sniff with a bounded read: a one-line JSON array may be the whole file.
+        head = f.read(CLI_READ_CHARS)
+        while head and not head.strip():
+            head = f.read(CLI_READ_CHARS)
+        if not head:
+            return
+        if head.lstrip().startswith("["):
+            yield from _iter_json_array(f, head)
+            return
+        f.seek(0)
+        first = f.readline()
+        while not first.strip():
+            first = f.readline()
+        try:
+            obj = json.loads(first) if first.strip().startswith("{") else None
+        except json.JSONDecodeError:
+            obj = None
+        if not isinstance(obj, dict) or "rows" in obj:
+            f.seek(0)
+            yield from _normalize_input(json.load(f))
+            return
+        yield obj
+        for ln in f:
+            if ln.strip():
+                yield json.loads(ln)
+
+
+def _completed_lines(out_path: str) -> int:
+    """Count complete lines in out_path, dropping a partial last line left by a crash."""
+    if not os.path.exists(out_path):
+        return 0
+    count, good_bytes = 0, 0
+    with open(out_path, "rb") as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            count += 1
+            good_bytes += len(line)
+    if good_bytes != os.path.getsize(out_path):
+        with open(out_path, "r+b") as f:
+            f.truncate(good_bytes)
+    return count
 
 
 def _cli_process_file(
@@ -288,33 +151,58 @@ def _cli_process_file(
     out_path: str | None,
     append: bool,
     to_stdout: bool,
+    batch_size: int | None = None,
+    resume: bool = False,
 ) -> None:
-    """Process a JSON file and write JSONL incrementally."""
-    with open(in_path, "r", encoding="utf-8") as f:
-        rows = _normalize_input(json.load(f))
+    """Stream a JSON or JSONL file through the standardizer and write JSONL incrementally.
+
+    With resume (which implies append), input rows already present as lines
+    in the output file are skipped, so an interrupted backfill continues where
+    it stopped.
+    """
+    rows = _iter_rows(in_path)
 
     sink = sys.stdout if to_stdout else None
     if not to_stdout:
         out_path = out_path or (in_path + ".jsonl")
-        mode = "a" if append else "w"
+        if resume:
+            done = _completed_lines(out_path)
+            rows = itertools.islice(rows, done, None)
+            if done:
+                print(f"resume: skipping {done} rows already in {out_path}", file=sys.stderr)
+        mode = "a" if append or resume else "w"
         sink = open(out_path, mode, encoding="utf-8")
 
     assert sink is not None  # for type-checkers
 
     try:
-        for row in rows:
-            program_text = (row or {}).get("program") or ""
-            result = _call_llm(program_text)
-            row["llm-generated-program"] = result["standardized_program"]
-            row["llm-generated-university"] = result["standardized_university"]
-
-            json.dump(row, sink, ensure_ascii=False)
-            sink.write("\n")
+        size = batch_size or BATCH_SIZE
+        while True:
+            chunk = list(itertools.islice(rows, size))
+            if not chunk:
+                break
+            size = CLI_CHUNK_ROWS
+            for row in standardize_rows(chunk, batch_size=batch_size):
+                json.dump(row, sink, ensure_ascii=False)
+                sink.write("\n")
             sink.flush()
     finally:
         if sink is not sys.stdout:
             sink.close()
 
+    cache = cache_stats()
+    print(
+        f"cache: {cache['hits']} hits, {cache['misses']} misses, "
+        f"{cache['entries']} entries",
+        file=sys.stderr,
+    )
+    paths = path_stats()
+    print(
+        f"paths: {paths['rules']} rules, {paths['cache']} cache, {paths['model']} model "
+        f"({paths['rules_share']:.0%} skipped the model via rules)",
+        file=sys.stderr,
+    )
+
 
 if __name__ == "__main__":
     import argparse
@@ -324,7 +212,7 @@ if __name__ == "__main__":
     )
     parser.add_argument(
         "--file",
-        help="Path to JSON input (list of rows or {'rows': [...]})",
+        help="Path to JSON Lines or JSON input (list of rows or {'rows': [...]})",
         default=None,
     )
     parser.add_argument(
@@ -343,15 +231,40 @@ if __name__ == "__main__":
         action="store_true",
         help="Append to the output file instead of overwriting.",
     )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Append to the output file, skipping as many input rows as it "
+        "already has lines.",
+    )
     parser.add_argument(
         "--stdout",
         action="store_true",
         help="Write JSON Lines to stdout instead of a file.",
     )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=None,
+        help="Program strings per model prompt "
+        "(default: STANDARDIZE_BATCH_SIZE or 8; 1 disables batching).",
+    )
+    parser.add_argument(
+        "--replicas",
+        type=int,
+        default=None,
+        help="Model replicas in worker processes, each with N_THREADS/K threads "
+        "(default: STANDARDIZER_REPLICAS or 1).",
+    )
     args = parser.parse_args()
 
+    if args.replicas and args.replicas > 1:
+        start_replicas(args.replicas)
+
     if args.serve or args.file is None:
         port = int(os.getenv("PORT", "8000"))
+        # Load the model before accepting requests; it stays warm until exit.
+        warm_up()
         app.run(host="0.0.0.0", port=port, debug=False)
     else:
         _cli_process_file(
@@ -359,4 +272,6 @@ if __name__ == "__main__":
             out_path=args.out,
             append=bool(args.append),
             to_stdout=bool(args.stdout),
+            batch_size=args.batch_size,
+            resume=bool(args.resume),
         )
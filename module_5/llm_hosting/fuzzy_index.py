@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""Precomputed fuzzy matcher with the same answers as difflib.get_close_matches."""
+
+from __future__ import annotations
+
+import bisect
+import math
+import sys
+from array import array
+from collections import Counter
+from difflib import SequenceMatcher, get_close_matches
+from typing import Dict, Iterable, List, Tuple
+
+
+class FuzzyIndex:
+    """Best-match lookup over a fixed candidate list.
+
+    ``best_match(word, cutoff)`` returns exactly what
+    ``difflib.get_close_matches(word, candidates, n=1, cutoff=cutoff)`` would.
+    It uses difflib's own upper bounds, in the same float arithmetic, so
+    nothing that could match is ever pruned:
+
+    * ``real_quick_ratio``: length alone. Candidates are sorted by length, and
+      only the slice of lengths that can reach ``cutoff`` is visited.
+    * ``quick_ratio``: shared character counts. For every character, the
+      per-candidate counts are stored as one packed column of 16-bit lanes.
+      A query clips each column to its own count with ``bytes.translate`` and
+      adds the columns as big integers. That gives every candidate's
+      shared-character total without a Python-level loop over characters.
+
+    The remaining candidates are scored with ``SequenceMatcher.ratio`` in
+    descending bound order. Scoring stops once a bound falls below the best
+    ratio found. Ties resolve to the larger string, like ``heapq.nlargest``.
+    """
+
+    def __init__(self, candidates: Iterable[str]) -> None:
+        entries = sorted((len(name), name) for name in dict.fromkeys(candidates))
+        self._lengths: List[int] = [length for length, _name in entries]
+        self._names: List[str] = [name for _length, name in entries]
+        self._exact = frozenset(self._names)
+
+        counts = [Counter(name) for name in self._names]
+        alphabet = set().union(*counts) if counts else set()
+        # Each lane holds min(count, 255) in its low byte, so translate can clip it.
+        self._columns: Dict[str, bytes] = {
+            ch: array("H", [min(c[ch], 255) for c in counts]).tobytes() for ch in alphabet
+        }
+        self._clip_tables: Dict[int, bytes] = {}
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def _clip_table(self, limit: int) -> bytes:
+        """bytes.translate table mapping each byte value v to min(v, limit)."""
+        table = self._clip_tables.get(limit)
+        if table is None:
+            table = self._clip_tables[limit] = bytes(min(v, limit) for v in range(256))
+        return table
+
+    def _shared_counts(self, word_counts: Counter) -> memoryview:
+        """Per-candidate sum over characters of min(count in word, count in candidate)."""
+        total = 0
+        for ch, n in word_counts.items():
+            column = self._columns.get(ch)
+            if column is not None:
+                total += int.from_bytes(column.translate(self._clip_table(n)), sys.byteorder)
+        return memoryview(total.to_bytes(2 * len(self._names), sys.byteorder)).cast("H")
+
+    def _length_window(self, size: int, cutoff: float) -> Tuple[int, int]:
+        """Index range of candidates whose length bound may reach cutoff."""
+        if cutoff <= 0.0:
+            return 0, len(self._names)
+        low = math.floor(size * cutoff / (2.0 - cutoff)) - 1
+        high = math.ceil(size * (2.0 - cutoff) / cutoff) + 1
+        return bisect.bisect_left(self._lengths, low), bisect.bisect_right(self._lengths, high)
+
+    def best_match(self, word: str, cutoff: float = 0.6) -> str | None:
+        """Return the closest candidate scoring at least cutoff, or None."""
+        if not self._names:
+            return None
+        if word in self._exact:
+            # Only an identical string has ratio 1.0, so nothing can beat it.
+            return word
+
+        word_counts = Counter(word)
+        if not word or max(word_counts.values()) > 255:
+            # Lanes are clipped at 255; such inputs are not worth a special path.
+            matches = get_close_matches(word, self._names, n=1, cutoff=cutoff)
+            return matches[0] if matches else None
+
+        size = len(word)
+        shared = self._shared_counts(word_counts)
+        bounded: List[Tuple[float, int]] = []
+        start, stop = self._length_window(size, cutoff)
+        for i in range(start, stop):
+            length = self._lengths[i]
+            total = length + size
+            if 2.0 * min(length, size) / total < cutoff:
+                continue
+            bound = 2.0 * shared[i] / total
+            if bound >= cutoff:
+                bounded.append((bound, i))
+
+        bounded.sort(reverse=True)
+        matcher = SequenceMatcher()
+        matcher.set_seq2(word)
+        best: Tuple[float, str] | None = None
+        for bound, i in bounded:
+            if best is not None and bound < best[0]:
+                break
+            name = self._names[i]
+            matcher.set_seq1(name)
+            score = matcher.ratio()
+            if score >= cutoff and (best is None or (score, name) > best):
+                best = (score, name)
+        return best[1] if best else None
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""Persistent SQLite cache of standardized program/university pairs."""
+
+from __future__ import annotations
+
+import re
+import sqlite3
+import threading
+from typing import Dict, Iterable, Tuple
+
+WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_key(text: str) -> str:
+    """Collapse whitespace and case so trivially different inputs share an entry."""
+    return WHITESPACE_RE.sub(" ", text or "").strip().casefold()
+
+
+class StandardizeCache:
+    """Map normalized ``program`` text to its standardized pair on disk.
+
+    Entries are keyed by ``(version, normalized text)``. The version string
+    identifies the model and prompt, so changing either one starts a fresh
+    key space instead of serving stale answers. Rows of any other version are
+    deleted on open, as nothing reads them again. ``hits`` and ``misses``
+    count lookups made by this process.
+    """
+
+    def __init__(self, path: str, version: str) -> None:
+        self.path = path
+        self.version = version
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS standardized ("
+            " version TEXT NOT NULL,"
+            " input TEXT NOT NULL,"
+            " program TEXT NOT NULL,"
+            " university TEXT NOT NULL,"
+            " PRIMARY KEY (version, input))"
+        )
+        self._conn.execute("DELETE FROM standardized WHERE version <> ?", (version,))
+        self._conn.commit()
+
+    def get(self, text: str) -> Dict[str, str] | None:
+        """Return the cached result for text, or None on a miss."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT program, university FROM standardized WHERE version = ? AND input = ?",
+                (self.version, normalize_key(text)),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return {"standardized_program": row[0], "standardized_university": row[1]}
+
+    def put(self, text: str, result: Dict[str, str]) -> None:
+        """Store the standardized pair for text."""
+        self.put_many([(text, result)])
+
+    def put_many(self, items: Iterable[Tuple[str, Dict[str, str]]]) -> None:
+        """Store several (text, result) pairs in one transaction."""
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO standardized VALUES (?, ?, ?, ?)",
+                [
+                    (
+                        self.version,
+                        normalize_key(text),
+                        result["standardized_program"],
+                        result["standardized_university"],
+                    )
+                    for text, result in items
+                ],
+            )
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss counters and the number of entries for this version."""
+        with self._lock:
+            (entries,) = self._conn.execute(
+                "SELECT COUNT(*) FROM standardized WHERE version = ?", (self.version,)
+            ).fetchone()
+            return {"hits": self.hits, "misses": self.misses, "entries": entries}
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,706 @@
+# -*- coding: utf-8 -*-
+"""Importable program/university standardizer backed by a warm local LLM.
+
+The model is loaded on first use and kept in ``_LLM`` for the life of the
+process, so a long-running server (``app.py --serve``) or an in-process caller
+such as ``src/clean.py`` pays the download check and llama.cpp load once.
+``llama_cpp`` and ``huggingface_hub`` are imported lazily, so the rules and
+canonical-name helpers can be used without them installed.
+"""
+
+from __future__ import annotations
+
+import atexit
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from typing import Any, Dict, List, Tuple
+
+from fuzzy_index import FuzzyIndex
+from standardize_cache import StandardizeCache, normalize_key
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# ---------------- Model config ----------------
+MODEL_REPO = os.getenv(
+    "MODEL_REPO",
+    "TheBloke/TinyLlama-1.1B-Chat-v1.0-GGUF",
+)
+MODEL_FILE = os.getenv(
+    "MODEL_FILE",
+    "tinyllama-1.1b-chat-v1.0.Q4_K_M.gguf",
+)
+
+N_THREADS = int(os.getenv("N_THREADS", str(os.cpu_count() or 2)))
+N_CTX = int(os.getenv("N_CTX", "2048"))
+N_GPU_LAYERS = int(os.getenv("N_GPU_LAYERS", "0"))  # 0 → CPU-only
+# Model replicas. Above 1, prompt batches are sharded across that many worker
+# processes (worker_pool.py), each running N_THREADS // REPLICAS threads.
+REPLICAS = max(1, int(os.getenv("STANDARDIZER_REPLICAS", "1")))
+
+MODEL_DIR = os.getenv("MODEL_DIR", os.path.join(HERE, "models"))
+
+# Persistent cache of standardized answers; set to an empty string to disable.
+CACHE_PATH = os.getenv("STANDARDIZE_CACHE_PATH", os.path.join(HERE, "standardize_cache.sqlite3"))
+# The cache holds raw model answers and post-normalizes them on every read, so
+# rule and canon edits apply to cached rows as they are. Bump this only when
+# what counts as a raw answer changes, so the cached answers are redone.
+RULES_VERSION = "3"
+
+CANON_UNIS_PATH = os.getenv("CANON_UNIS_PATH", os.path.join(HERE, "canon_universities.txt"))
+CANON_PROGS_PATH = os.getenv("CANON_PROGS_PATH", os.path.join(HERE, "canon_programs.txt"))
+
+# Precompiled, non-greedy JSON object matcher to tolerate chatter around JSON
+JSON_OBJ_RE = re.compile(r"\{.*?\}", re.DOTALL)
+# Greedy array matcher for batched replies (objects inside contain no brackets)
+JSON_ARRAY_RE = re.compile(r"\[.*\]", re.DOTALL)
+
+# ---------------- Canonical lists + abbrev maps ----------------
+def _read_lines(path: str) -> List[str]:
+    """Read non-empty, stripped lines from a file (UTF-8)."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return [ln.strip() for ln in f if ln.strip()]
+    except FileNotFoundError:
+        return []
+
+
+def _file_stamp(path: str) -> Tuple[int, int] | None:
+    """(mtime_ns, size) of path, or None when it does not exist."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+CANON_UNIS: List[str] = []
+CANON_PROGS: List[str] = []
+# Exact and case-insensitive membership; the fuzzy indexes handle near misses.
+_UNIS_SET: frozenset = frozenset()
+_PROGS_SET: frozenset = frozenset()
+_UNIS_BY_FOLD: Dict[str, str] = {}
+_PROGS_BY_FOLD: Dict[str, str] = {}
+_UNIS_INDEX = FuzzyIndex([])
+_PROGS_INDEX = FuzzyIndex([])
+_CANON_STAMPS: Tuple[Any, Any] | None = None
+_CANON_CHECKED_AT = 0.0
+_CANON_LOCK = threading.Lock()
+# Seconds between checks of the canon files for edits; 0 checks on every call.
+CANON_RELOAD_SECONDS = float(os.getenv("CANON_RELOAD_SECONDS", "2"))
+
+
+def _fold_map(names: List[str]) -> Dict[str, str]:
+    """Map each casefolded name to its first canonical spelling."""
+    folded: Dict[str, str] = {}
+    for name in names:
+        folded.setdefault(name.casefold(), name)
+    return folded
+
+
+def reload_canon(force: bool = False) -> bool:
+    """Re-read the canon files if they changed on disk; return True if reloaded.
+
+    The lookup tables are rebuilt before being swapped in, so concurrent
+    requests see either the old lists or the new ones. The answer cache keeps
+    its entries: they hold raw model answers, which are post-normalized
+    against the current lists when read.
+    """
+    global CANON_UNIS, CANON_PROGS, _UNIS_SET, _PROGS_SET, _UNIS_BY_FOLD
+    global _PROGS_BY_FOLD, _UNIS_INDEX, _PROGS_INDEX, _CANON_STAMPS, _CANON_CHECKED_AT
+    with _CANON_LOCK:
+        _CANON_CHECKED_AT = time.monotonic()
+        stamps = (_file_stamp(CANON_UNIS_PATH), _file_stamp(CANON_PROGS_PATH))
+        if not force and stamps == _CANON_STAMPS:
+            return False
+        unis, progs = _read_lines(CANON_UNIS_PATH), _read_lines(CANON_PROGS_PATH)
+        unis_index, progs_index = FuzzyIndex(unis), FuzzyIndex(progs)
+        _UNIS_SET, _PROGS_SET = frozenset(unis), frozenset(progs)
+        _UNIS_BY_FOLD, _PROGS_BY_FOLD = _fold_map(unis), _fold_map(progs)
+        _UNIS_INDEX, _PROGS_INDEX = unis_index, progs_index
+        CANON_UNIS, CANON_PROGS = unis, progs
+        _CANON_STAMPS = stamps
+    return True
+
+
+def _maybe_reload_canon() -> None:
+    """Reload the canon files when they changed, at most every CANON_RELOAD_SECONDS."""
+    if time.monotonic() - _CANON_CHECKED_AT >= CANON_RELOAD_SECONDS:
+        reload_canon()
+
+
+# Abbreviations are matched case-insensitively against the whole name.
+ABBREV_UNI: Dict[str, str] = {
+    r"mcg(\.|ill)?": "McGill University",
+    r"ubc|u\.?b\.?c\.?": "University of British Columbia",
+    r"uoft": "University of Toronto",
+}
+# One alternation instead of a fullmatch per pattern; the named group that
+# matched identifies the expansion, and earlier entries still win.
+_ABBREV_RE = re.compile(
+    "|".join(f"(?P<abbrev{i}>{pat})" for i, pat in enumerate(ABBREV_UNI)), re.IGNORECASE
+)
+_ABBREV_FULL = dict(zip((f"abbrev{i}" for i in range(len(ABBREV_UNI))), ABBREV_UNI.values()))
+
+COMMON_UNI_FIXES: Dict[str, str] = {
+    "McGiill University": "McGill University",
+    "Mcgill University": "McGill University",
+    # Normalize 'Of' → 'of'
+    "University Of British Columbia": "University of British Columbia",
+}
+
+COMMON_PROG_FIXES: Dict[str, str] = {
+    "Mathematic": "Mathematics",
+    "Info Studies": "Information Studies",
+}
+
+# ---------------- Few-shot prompt ----------------
+SYSTEM_PROMPT = (
+    "You are a data cleaning assistant. Standardize degree program and university "
+    "names.\n\n"
+    "Rules:\n"
+    "- Input provides a single string under key `program` that may contain both "
+    "program and university.\n"
+    "- Split into (program name, university name).\n"
+    "- Trim extra spaces and commas.\n"
+    '- Expand obvious abbreviations (e.g., "McG" -> "McGill University", '
+    '"UBC" -> "University of British Columbia").\n'
+    "- Use Title Case for program; use official capitalization for university "
+    "names (e.g., \"University of X\").\n"
+    '- Ensure correct spelling (e.g., "McGill", not "McGiill").\n'
+    '- If university cannot be inferred, return "Unknown".\n\n'
+    "Return JSON ONLY with keys:\n"
+    "  standardized_program, standardized_university\n"
+)
+
+FEW_SHOTS: List[Tuple[Dict[str, str], Dict[str, str]]] = [
+    (
+        {"program": "Information Studies, McGill University"},
+        {
+            "standardized_program": "Information Studies",
+            "standardized_university": "McGill University",
+        },
+    ),
+    (
+        {"program": "Information, McG"},
+        {
+            "standardized_program": "Information Studies",
+            "standardized_university": "McGill University",
+        },
+    ),
+    (
+        {"program": "Mathematics, University Of British Columbia"},
+        {
+            "standardized_program": "Mathematics",
+            "standardized_university": "University of British Columbia",
+        },
+    ),
+]
+
+# Batched variant: several program strings go into one prompt as a JSON array
+# and the model answers with an array in the same order. The few-shots are
+# presented as a single batched exchange.
+BATCH_SYSTEM_PROMPT = SYSTEM_PROMPT.replace(
+    "- Input provides a single string under key `program` that may contain both "
+    "program and university.\n",
+    "- Input is a JSON array of objects, each with a string under key `program` "
+    "that may contain both program and university.\n",
+).replace(
+    "Return JSON ONLY with keys:\n",
+    "Return ONLY a JSON array with one object per input, in the same order, "
+    "each with keys:\n",
+)
+
+BATCH_SIZE = max(1, int(os.getenv("STANDARDIZE_BATCH_SIZE", "8")))
+
+# Reuse the evaluated system prompt + few-shot prefix across calls. After
+# the first call of each prompt shape, the llama.cpp state is saved. A call
+# restores it only when the previous call used the other shape; after a call
+# of the same shape llama.cpp already reuses the matching prefix tokens.
+PROMPT_PREFIX_CACHE = os.getenv("PROMPT_PREFIX_CACHE", "1") != "0"
+# Answer already-canonical "<Program>, <University>" rows without the model.
+RULES_FAST_PATH = os.getenv("RULES_FAST_PATH", "1") != "0"
+
+_LLM: Any = None
+# llama.cpp contexts are not thread-safe; the Flask server may run handlers
+# on several threads, so model load and every completion share this lock.
+_LLM_LOCK = threading.RLock()
+# Saved llama.cpp states keyed by prompt shape ("single" or "batch").
+_PREFIX_STATES: Dict[str, Any] = {}
+# Prompt shape of the last completion, i.e. whose prefix is in the context now.
+_LAST_SHAPE: str | None = None
+
+
+def _load_llm() -> Any:
+    """Download (or reuse) the GGUF file and initialize llama.cpp once."""
+    global _LLM, _LAST_SHAPE
+    with _LLM_LOCK:
+        if _LLM is not None:
+            return _LLM
+
+        from huggingface_hub import hf_hub_download
+        from llama_cpp import Llama
+
+        model_path = hf_hub_download(
+            repo_id=MODEL_REPO,
+            filename=MODEL_FILE,
+            local_dir=MODEL_DIR,
+            local_dir_use_symlinks=False,
+            force_filename=MODEL_FILE,
+        )
+
+        _LLM = Llama(
+            model_path=model_path,
+            n_ctx=N_CTX,
+            n_threads=N_THREADS,
+            n_gpu_layers=N_GPU_LAYERS,
+            verbose=False,
+        )
+        _PREFIX_STATES.clear()
+        _LAST_SHAPE = None
+        return _LLM
+
+
+_POOL: Any = None
+_POOL_LOCK = threading.Lock()
+
+
+def start_replicas(replicas: int | None = None) -> Any:
+    """Start the replica pool (once) and return it."""
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            from worker_pool import ReplicaPool
+
+            count = max(1, replicas or REPLICAS)
+            _POOL = ReplicaPool(
+                count, max(1, N_THREADS // count), _init_replica, _ask_llm_batch)
+            atexit.register(stop_replicas)
+        return _POOL
+
+
+def _init_replica(threads: int) -> None:
+    """Configure and load the model once per replica worker process."""
+    global N_THREADS, REPLICAS, CACHE_PATH
+    N_THREADS = threads
+    REPLICAS = 1
+    # The answer cache is consulted in the parent; workers only run the model.
+    CACHE_PATH = ""
+    warm_up()
+
+
+def stop_replicas() -> None:
+    """Shut down the replica pool if one is running."""
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is not None:
+            _POOL.close()
+            _POOL = None
+
+
+def warm_up() -> None:
+    """Load the model (or every replica) now so the first request does not pay for it."""
+    if REPLICAS > 1 or _POOL is not None:
+        start_replicas()
+    else:
+        _load_llm()
+
+
+def _split_parts(text: str) -> List[str]:
+    """Split raw text on commas, " at " and " @ " into trimmed, non-empty parts."""
+    s = re.sub(r"\s+", " ", (text or "")).strip().strip(",")
+    return [p.strip() for p in re.split(r",| at | @ ", s) if p.strip()]
+
+
+def _split_fallback(text: str) -> Tuple[str, str]:
+    """Simple, rules-first parser if the model returns non-JSON."""
+    parts = _split_parts(text)
+    prog = parts[0] if parts else ""
+    uni = parts[1] if len(parts) > 1 else ""
+
+    # High-signal expansions
+    if re.fullmatch(r"(?i)mcg(ill)?(\.)?", uni or ""):
+        uni = "McGill University"
+    if re.fullmatch(
+        r"(?i)(ubc|u\.?b\.?c\.?|university of british columbia)",
+        uni or "",
+    ):
+        uni = "University of British Columbia"
+
+    # Title-case program; normalize 'Of' → 'of' for universities
+    prog = prog.title()
+    if uni:
+        uni = re.sub(r"\bOf\b", "of", uni.title())
+    else:
+        uni = "Unknown"
+    return prog, uni
+
+
+def _best_match(name: str, index: FuzzyIndex, cutoff: float = 0.86) -> str | None:
+    """Fuzzy match against a canonical list (same answer as difflib.get_close_matches)."""
+    if not name:
+        return None
+    return index.best_match(name, cutoff=cutoff)
+
+
+def _canon_program(prog: str) -> Tuple[str, bool]:
+    """Normalize a program name; the flag says whether it landed on a canonical one."""
+    p = (prog or "").strip()
+    p = COMMON_PROG_FIXES.get(p, p)
+    p = p.title()
+    if p in _PROGS_SET:
+        return p, True
+    if p.casefold() in _PROGS_BY_FOLD:
+        return _PROGS_BY_FOLD[p.casefold()], True
+    match = _best_match(p, _PROGS_INDEX, cutoff=0.84)
+    return (match, True) if match else (p, False)
+
+
+def _post_normalize_program(prog: str) -> str:
+    """Apply common fixes, title case, then canonical/fuzzy mapping."""
+    return _canon_program(prog)[0]
+
+
+def _canon_university(uni: str) -> Tuple[str, bool]:
+    """Normalize a university name; the flag says whether it landed on a canonical one."""
+    u = (uni or "").strip()
+
+    # Abbreviations
+    abbrev = _ABBREV_RE.fullmatch(u)
+    if abbrev:
+        u = _ABBREV_FULL[abbrev.lastgroup]
+
+    # Common spelling fixes
+    u = COMMON_UNI_FIXES.get(u, u)
+
+    # Normalize 'Of' → 'of'
+    if u:
+        u = re.sub(r"\bOf\b", "of", u.title())
+
+    # Canonical or fuzzy map
+    if u in _UNIS_SET:
+        return u, True
+    if u.casefold() in _UNIS_BY_FOLD:
+        return _UNIS_BY_FOLD[u.casefold()], True
+    match = _best_match(u, _UNIS_INDEX, cutoff=0.86)
+    return (match, True) if match else (u or "Unknown", False)
+
+
+def _post_normalize_university(uni: str) -> str:
+    """Expand abbreviations, apply common fixes, capitalization, and canonical map."""
+    return _canon_university(uni)[0]
+
+
+def rules_answer(program_text: str) -> Dict[str, str] | None:
+    """Resolve "<Program>, <University>" without the model when both halves are canonical.
+
+    The text must split into exactly two parts, and each part must map to a
+    canonical name by exact, case-insensitive or fuzzy match. Anything else
+    (one part, extra commas, an unknown name) returns None for the model.
+    """
+    parts = _split_parts(program_text)
+    if len(parts) != 2:
+        return None
+    prog, prog_ok = _canon_program(parts[0])
+    uni, uni_ok = _canon_university(parts[1])
+    if not (prog_ok and uni_ok):
+        return None
+    return {"standardized_program": prog, "standardized_university": uni}
+
+
+def _single_messages(program_text: str) -> List[Dict[str, str]]:
+    """Build the chat for one single-row prompt."""
+    messages = [{"role": "system", "content": SYSTEM_PROMPT}]
+    for x_in, x_out in FEW_SHOTS:
+        messages.append(
+            {"role": "user", "content": json.dumps(x_in, ensure_ascii=False)}
+        )
+        messages.append(
+            {
+                "role": "assistant",
+                "content": json.dumps(x_out, ensure_ascii=False),
+            }
+        )
+    messages.append(
+        {
+            "role": "user",
+            "content": json.dumps({"program": program_text}, ensure_ascii=False),
+        }
+    )
+    return messages
+
+
+def _prefix_state(llm: Any, shape: str, prefix_messages: List[Dict[str, str]]) -> Any:
+    """Return the saved state for a prompt shape, evaluating its prefix on first use.
+
+    prefix_messages is the shape's prompt with an empty program. Its tokens
+    match every real prompt of that shape up to the first program character,
+    so restoring this state leaves only the row-specific tail to evaluate.
+    """
+    state = _PREFIX_STATES.get(shape)
+    if state is None:
+        llm.create_chat_completion(
+            messages=prefix_messages, temperature=0.0, max_tokens=1, top_p=1.0
+        )
+        state = _PREFIX_STATES[shape] = llm.save_state()
+    return state
+
+
+def _complete(
+    shape: str,
+    messages: List[Dict[str, str]],
+    prefix_messages: List[Dict[str, str]],
+    max_tokens: int,
+) -> Dict[str, Any]:
+    """Run one chat completion, restoring the saved prefix state when enabled
+    and the previous completion used a different prompt shape."""
+    global _LAST_SHAPE
+    llm = _load_llm()
+    with _LLM_LOCK:
+        if PROMPT_PREFIX_CACHE and shape != _LAST_SHAPE:
+            llm.load_state(_prefix_state(llm, shape, prefix_messages))
+        _LAST_SHAPE = shape
+        return llm.create_chat_completion(
+            messages=messages,
+            temperature=0.0,
+            max_tokens=max_tokens,
+            top_p=1.0,
+        )
+
+
+def _call_llm(program_text: str) -> Dict[str, str]:
+    """Query the tiny LLM and return standardized fields."""
+    return _finalize(_ask_llm(program_text))
+
+
+def _ask_llm(program_text: str) -> Dict[str, str]:
+    """Query the tiny LLM and return its raw answer, before post-normalization."""
+    out = _complete("single", _single_messages(program_text), _single_messages(""), 128)
+
+    text = (out["choices"][0]["message"]["content"] or "").strip()
+    try:
+        match = JSON_OBJ_RE.search(text)
+        obj = json.loads(match.group(0) if match else text)
+        std_prog = str(obj.get("standardized_program", "")).strip()
+        std_uni = str(obj.get("standardized_university", "")).strip()
+    except Exception:
+        std_prog, std_uni = _split_fallback(program_text)
+
+    return {"standardized_program": std_prog, "standardized_university": std_uni}
+
+
+def _finalize(raw: Dict[str, str]) -> Dict[str, str]:
+    """Apply the post-normalization rules to a raw model answer."""
+    return {
+        "standardized_program": _post_normalize_program(raw["standardized_program"]),
+        "standardized_university": _post_normalize_university(raw["standardized_university"]),
+    }
+
+
+def _batch_messages(program_texts: List[str]) -> List[Dict[str, str]]:
+    """Build the chat for one batched prompt."""
+    shot_in = [x_in for x_in, _x_out in FEW_SHOTS]
+    shot_out = [x_out for _x_in, x_out in FEW_SHOTS]
+    batch = [{"program": text} for text in program_texts]
+    return [
+        {"role": "system", "content": BATCH_SYSTEM_PROMPT},
+        {"role": "user", "content": json.dumps(shot_in, ensure_ascii=False)},
+        {"role": "assistant", "content": json.dumps(shot_out, ensure_ascii=False)},
+        {"role": "user", "content": json.dumps(batch, ensure_ascii=False)},
+    ]
+
+
+# A batched prompt holds the shared prefix plus, per row, its input and up to
+# ANSWER_TOKENS_PER_ROW answer tokens. Lengths are estimated at 3 characters
+# per token, which overcounts for the mostly ASCII text the model sees.
+ANSWER_TOKENS_PER_ROW = 64
+_ANSWER_TOKENS_EXTRA = 32
+_CHARS_PER_TOKEN = 3
+_ROW_INPUT_TOKENS = 24
+
+
+def max_batch_size() -> int:
+    """Largest batch whose prompt and reserved answer tokens fit in N_CTX (at least 1).
+
+    Past N_CTX llama.cpp cuts the answer short, the reply no longer parses as
+    one object per row, and the whole batch is redone one row at a time.
+    """
+    prefix = len(json.dumps(_batch_messages([""]), ensure_ascii=False)) // _CHARS_PER_TOKEN
+    room = N_CTX - prefix - _ANSWER_TOKENS_EXTRA
+    return max(1, room // (ANSWER_TOKENS_PER_ROW + _ROW_INPUT_TOKENS))
+
+
+def _run_batches(batches: List[List[str]]) -> List[List[Dict[str, str]]]:
+    """Run prompt batches on the replica pool when enabled, else in this process.
+
+    Answers come back raw; the caller post-normalizes them against its own
+    canon lists, so replica workers never need to reload them.
+    """
+    if REPLICAS > 1 or _POOL is not None:
+        return start_replicas().map_batches(batches)
+    return [_ask_llm_batch(batch) for batch in batches]
+
+
+def _call_llm_batch(program_texts: List[str]) -> List[Dict[str, str]]:
+    """Standardize several program strings with one completion."""
+    return [_finalize(raw) for raw in _ask_llm_batch(program_texts)]
+
+
+def _ask_llm_batch(program_texts: List[str]) -> List[Dict[str, str]]:
+    """Return the raw model answers for several program strings from one completion.
+
+    A reply that is not a JSON array with one object per input falls back to
+    the single-row path for every string in the batch.
+    """
+    if len(program_texts) == 1:
+        return [_ask_llm(program_texts[0])]
+
+    out = _complete(
+        "batch",
+        _batch_messages(program_texts),
+        _batch_messages([""]),
+        ANSWER_TOKENS_PER_ROW * len(program_texts) + _ANSWER_TOKENS_EXTRA,
+    )
+
+    text = (out["choices"][0]["message"]["content"] or "").strip()
+    try:
+        match = JSON_ARRAY_RE.search(text)
+        items = json.loads(match.group(0) if match else text)
+        if not isinstance(items, list) or len(items) != len(program_texts):
+            raise ValueError("batched reply does not match the request")
+        return [
+            {
+                "standardized_program": str(obj.get("standardized_program", "")).strip(),
+                "standardized_university": str(obj.get("standardized_university", "")).strip(),
+            }
+            for obj in items
+        ]
+    except Exception:
+        return [_ask_llm(program_text) for program_text in program_texts]
+
+
+_CACHE: StandardizeCache | None = None
+_CACHE_LOCK = threading.Lock()
+
+# The canon lists are loaded here, once every global reload_canon() touches exists.
+reload_canon()
+
+
+def cache_version() -> str:
+    """Fingerprint of everything that shapes a raw answer: model, prompt and rules.
+
+    The canon lists are left out because cached answers are post-normalized
+    on read, so editing them does not discard the cache.
+    """
+    parts = [MODEL_REPO, MODEL_FILE, SYSTEM_PROMPT, BATCH_SYSTEM_PROMPT, FEW_SHOTS,
+             RULES_VERSION]
+    blob = json.dumps(parts, ensure_ascii=False, sort_keys=True).encode("utf-8")
+    return hashlib.sha256(blob).hexdigest()[:16]
+
+
+def _get_cache() -> StandardizeCache | None:
+    """Open the answer cache on first use, or return None when it is disabled."""
+    global _CACHE
+    with _CACHE_LOCK:
+        if _CACHE is None and CACHE_PATH:
+            _CACHE = StandardizeCache(CACHE_PATH, cache_version())
+        return _CACHE
+
+
+def cache_stats() -> Dict[str, int]:
+    """Return cache hit/miss counters for this process."""
+    cache = _get_cache()
+    if cache is None:
+        return {"hits": 0, "misses": 0, "entries": 0}
+    return cache.stats()
+
+
+_PATH_COUNTS: Dict[str, int] = {"rules": 0, "cache": 0, "model": 0}
+_PATH_LOCK = threading.Lock()
+
+
+def _count_paths(paths: List[str]) -> None:
+    """Add one row per entry to the per-path counters."""
+    with _PATH_LOCK:
+        for path in paths:
+            _PATH_COUNTS[path] += 1
+
+
+def path_stats() -> Dict[str, Any]:
+    """Rows answered by the rules, the answer cache, and the model, with shares."""
+    with _PATH_LOCK:
+        counts = dict(_PATH_COUNTS)
+    rows = sum(counts.values())
+    stats: Dict[str, Any] = {"rows": rows, **counts}
+    for path, count in counts.items():
+        stats[f"{path}_share"] = round(count / rows, 4) if rows else 0.0
+    return stats
+
+
+def _rules_or_none(program_text: str) -> Dict[str, str] | None:
+    """rules_answer when the fast path is enabled, else None."""
+    return rules_answer(program_text) if RULES_FAST_PATH else None
+
+
+def standardize_texts(
+    program_texts: List[str], batch_size: int | None = None
+) -> List[Dict[str, str]]:
+    """Standardize many program strings, deduplicated and batched.
+
+    Inputs that normalize to the same cache key are resolved once: by the
+    rules when both halves are already canonical, else by the answer cache,
+    else by the model. Cache misses are grouped batch_size (default BATCH_SIZE) at a time into
+    one prompt each, and the prompts are spread over the replica pool when
+    one is running. batch_size is capped at max_batch_size() so every prompt
+    fits the context window. The cache stores raw model answers, and cached
+    and fresh answers alike are post-normalized here against the current
+    canon lists. Results come back in input order.
+    """
+    size = min(max(1, batch_size or BATCH_SIZE), max_batch_size())
+    _maybe_reload_canon()
+    cache = _get_cache()
+
+    unique: Dict[str, str] = {}
+    for text in program_texts:
+        unique.setdefault(normalize_key(text), text)
+
+    results: Dict[str, Dict[str, str]] = {}
+    paths: Dict[str, str] = {}
+    pending: List[Tuple[str, str]] = []
+    for key, text in unique.items():
+        answer = _rules_or_none(text)
+        if answer is not None:
+            results[key], paths[key] = answer, "rules"
+            continue
+        cached = cache.get(text) if cache is not None else None
+        if cached is not None:
+            results[key], paths[key] = _finalize(cached), "cache"
+        else:
+            pending.append((key, text))
+            paths[key] = "model"
+
+    chunks = [pending[start:start + size] for start in range(0, len(pending), size)]
+    batch_answers = _run_batches([[text for _key, text in chunk] for chunk in chunks])
+    for chunk, answers in zip(chunks, batch_answers):
+        for (key, _text), answer in zip(chunk, answers):
+            results[key] = _finalize(answer)
+        if cache is not None:
+            cache.put_many([(text, answer) for (_key, text), answer in zip(chunk, answers)])
+
+    keys = [normalize_key(text) for text in program_texts]
+    _count_paths([paths[key] for key in keys])
+    return [results[key] for key in keys]
+
+
+def standardize_rows(
+    rows: List[Dict[str, Any]], batch_size: int | None = None
+) -> List[Dict[str, Any]]:
+    """Standardize a list of rows in order, batching model calls."""
+    texts = [(row or {}).get("program") or "" for row in rows]
+    for row, result in zip(rows, standardize_texts(texts, batch_size)):
+        row["llm-generated-program"] = result["standardized_program"]
+        row["llm-generated-university"] = result["standardized_university"]
+    return rows
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+"""Process pool of model replicas for CPU-only hosts.
+
+llama.cpp scales poorly past a few threads for a 1.1B model, so instead of one
+``Llama`` using every core, ``ReplicaPool`` starts K worker processes, each
+loading its own replica with ``threads_per_replica`` threads. Prompt batches
+are handed out one at a time and results come back in submission order.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+from typing import Callable, Dict, List
+
+# Workers load the model in the initializer and standardize one batch per call.
+# Both come from standardizer.py, which imports this module, so they are passed
+# in rather than imported here.
+RunBatch = Callable[[List[str]], List[Dict[str, str]]]
+
+
+class ReplicaPool:
+    """K spawned worker processes, each holding a warm model replica."""
+
+    def __init__(
+        self,
+        replicas: int,
+        threads_per_replica: int,
+        init_replica: Callable[[int], None],
+        run_batch: RunBatch,
+    ) -> None:
+        self.replicas = replicas
+        self.threads_per_replica = threads_per_replica
+        self._run_batch = run_batch
+        # spawn, not fork: llama.cpp and the Flask server both own threads.
+        context = multiprocessing.get_context("spawn")
+        self._pool = context.Pool(
+            processes=replicas,
+            initializer=init_replica,
+            initargs=(threads_per_replica,),
+        )
+
+    def map_batches(self, batches: List[List[str]]) -> List[List[Dict[str, str]]]:
+        """Run each batch on the next free replica; results keep input order."""
+        return self._pool.map(self._run_batch, batches, chunksize=1)
+
+    def close(self) -> None:
+        """Let workers finish and exit."""
+        self._pool.close()
+        self._pool.join()
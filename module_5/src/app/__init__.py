@@ -1,7 +1,9 @@
 """Flask application factory and routes."""
 
+import atexit
 from dataclasses import dataclass
 from decimal import Decimal
+from itertools import islice
 import os
 import subprocess
 import sys
@@ -10,10 +12,13 @@ import threading
 from flask import Flask, jsonify, redirect, render_template, url_for
 import psycopg
 import config
+import query_data
 from query_data import question_sql_dict
 
 PULL_LOCK = threading.Lock()
 _pull_state = {"process": None}
+# The "llm_hosting/app.py --serve" process this app started for its pulls.
+_standardizer_state = {"process": None}
 
 
 @dataclass(frozen=True)
@@ -32,32 +37,46 @@ def _coerce_numeric(value):
     return value
 
 
+def _payload(columns, rows):
+    if not rows:
+        return None
+    if len(columns) == 1 and len(rows) == 1:
+        return _coerce_numeric(rows[0][0])
+    if len(columns) == 1:
+        return [_coerce_numeric(row[0]) for row in rows]
+    return [
+        {col: _coerce_numeric(value) for col, value in zip(columns, row)}
+        for row in rows
+    ]
+
+
 def _build_results(deps):
-    results = []
+    # Stock whole-table questions share one aggregate scan; the rest run their own query.
+    sql, folded = query_data.single_pass_plan(deps.question_map)
+    answers = {}
     with deps.connect_fn(**deps.db_kwargs_fn()) as conn:
         with conn.cursor() as cur:
+            if sql is not None:
+                cur.execute(sql)
+                values = iter(cur.fetchall()[0])
+                for question, columns in folded:
+                    answers[question] = (columns, [tuple(islice(values, len(columns)))])
             for question, query in deps.question_map.items():
+                if question in answers:
+                    continue
                 cur.execute(query)
                 rows = cur.fetchall()
                 columns = [desc.name for desc in cur.description] if cur.description else []
+                answers[question] = (columns, rows)
 
-                if not rows:
-                    payload = None
-                elif len(columns) == 1 and len(rows) == 1:
-                    payload = _coerce_numeric(rows[0][0])
-                elif len(columns) == 1:
-                    payload = [_coerce_numeric(row[0]) for row in rows]
-                else:
-                    payload = [
-                        {col: _coerce_numeric(value) for col, value in zip(columns, row)}
-                        for row in rows
-                    ]
-
-                results.append({
-                    "question": question,
-                    "columns": columns,
-                    "answer": payload,
-                })
+    results = []
+    for question in deps.question_map:
+        columns, rows = answers[question]
+        results.append({
+            "question": question,
+            "columns": columns,
+            "answer": _payload(columns, rows),
+        })
     return results
 
 
@@ -65,10 +84,45 @@ def _render_analysis_page(deps):
     return render_template("index.html", results=_build_results(deps))
 
 
+def _stop_standardizer_server():
+    process = _standardizer_state["process"]
+    if process is not None and process.poll() is None:
+        process.terminate()
+
+
+def _spawn_standardizer_server():
+    llm_dir = os.path.abspath(config.LLM_HOSTING_DIR)
+    return subprocess.Popen(
+        [sys.executable, os.path.join(llm_dir, "app.py"), "--serve"],
+        cwd=llm_dir,
+        env={**os.environ, "PORT": str(config.STANDARDIZER_PORT)},
+    )
+
+
+def _standardizer_url():
+    # An explicit STANDARDIZER_URL wins. Otherwise keep one warm server for the
+    # app's lifetime, restarting it if it exited, so each pull skips the model load.
+    if config.STANDARDIZER_URL:
+        return config.STANDARDIZER_URL
+    if not config.STANDARDIZER_AUTOSTART:
+        return None
+    process = _standardizer_state["process"]
+    if process is None or process.poll() is not None:
+        _standardizer_state["process"] = _spawn_standardizer_server()
+        if process is None:
+            atexit.register(_stop_standardizer_server)
+    return f"http://127.0.0.1:{config.STANDARDIZER_PORT}"
+
+
 def _default_start_pull(base_dir):
+    env = dict(os.environ)
+    url = _standardizer_url()
+    if url:
+        env["STANDARDIZER_URL"] = url
     return subprocess.Popen(
-        [sys.executable, os.path.join(base_dir, "scrape.py")],
+        [sys.executable, os.path.join(base_dir, "scrape.py"), "--incremental", "--pipeline"],
         cwd=base_dir,
+        env=env,
     )
 
 
@@ -0,0 +1,169 @@
+"""Atomic scrape and load checkpoints so long runs can resume after a crash or kill."""
+
+import hashlib
+import json
+import os
+import tempfile
+
+# Bytes of the data file hashed to tell an appended file from a rewritten one.
+LOAD_PREFIX_BYTES = 64 * 1024
+
+
+class AtomicJsonFile:
+    """A JSON state file that is replaced atomically on every save."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def load(self):
+        """Return the saved state, or None when there is no usable checkpoint"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Ignoring unreadable checkpoint {self.path}: {e}")
+            return None
+
+    def save(self, state):
+        """Write state to a temp file, fsync it, then rename it over the checkpoint"""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(prefix=".checkpoint-", dir=directory)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(state, f, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def clear(self):
+        """Remove the checkpoint file if it exists"""
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+class ScrapeCheckpoint(AtomicJsonFile):
+    """Persist scrape progress to a JSON file that is replaced atomically.
+
+    The saved state records the last fully saved page and, for a page that was
+    interrupted, its list HTML, the detail URLs still to be fetched and the
+    parsed records of the detail pages already fetched::
+
+        {"last_completed_page": 12,
+         "in_progress": {"page": 13, "list_html": "...", "pending_urls": [...],
+                         "done_records": {"<detail url>": {...}, ...}}}
+
+    The state is written once per page. Each parsed detail page is appended to
+    a JSON Lines log next to it (``<path>.details``) instead, and load() folds
+    the log back into ``in_progress``. The log is not fsynced: losing its tail
+    only means those detail pages are fetched again on resume.
+    """
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.details_path = path + ".details"
+        self._page = None
+
+    def load(self):
+        """Return the saved state with logged detail pages applied, or None"""
+        state = super().load()
+        in_progress = (state or {}).get("in_progress")
+        if in_progress:
+            pending, done = in_progress["pending_urls"], in_progress["done_records"]
+            for entry in self._read_details():
+                if entry["page"] != in_progress["page"]:
+                    continue
+                if entry["url"] in pending:
+                    pending.remove(entry["url"])
+                done[entry["url"]] = entry["record"]
+        return state
+
+    def start_page(self, page_num, list_html, pending_urls, done_records=None):
+        """Record a page whose list was parsed but whose details are not saved yet"""
+        self._page = page_num
+        self.save({
+            "last_completed_page": page_num - 1,
+            "in_progress": {
+                "page": page_num,
+                "list_html": list_html,
+                "pending_urls": list(pending_urls),
+                "done_records": dict(done_records or {}),
+            },
+        })
+        self._clear_details()
+
+    def detail_done(self, url, record):
+        """Append url and its parsed record to the detail log of the current page"""
+        entry = {"page": self._page, "url": url, "record": record}
+        with open(self.details_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    def complete_page(self, page_num):
+        """Record that every record for page_num has been written to the data file"""
+        self._page = None
+        self.save({"last_completed_page": page_num, "in_progress": None})
+        self._clear_details()
+
+    def _read_details(self):
+        """Entries of the detail log, stopping at a line cut short by a crash"""
+        entries = []
+        try:
+            with open(self.details_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entries.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        break
+        except FileNotFoundError:
+            pass
+        return entries
+
+    def _clear_details(self):
+        try:
+            os.remove(self.details_path)
+        except FileNotFoundError:
+            pass
+
+
+def _prefix_digest(data_path, length):
+    """SHA-1 of the first length bytes (capped at LOAD_PREFIX_BYTES) of data_path"""
+    with open(data_path, 'rb') as f:
+        return hashlib.sha1(f.read(min(length, LOAD_PREFIX_BYTES))).hexdigest()
+
+
+class LoadProgress(AtomicJsonFile):
+    """Byte offset of the last committed chunk of a JSON Lines load::
+
+        {"path": "/abs/applicant_data.json.jsonl", "offset": 1048576,
+         "rows": 5000, "prefix_sha1": "..."}
+
+    The hash of the file's leading bytes tells a file that was only appended
+    to (safe to resume) from one that was rewritten (start again).
+    """
+
+    def save_offset(self, data_path, offset, rows):
+        """Record that everything before offset in data_path is committed"""
+        self.save({
+            "path": os.path.abspath(data_path),
+            "offset": offset,
+            "rows": rows,
+            "prefix_sha1": _prefix_digest(data_path, offset),
+        })
+
+    def resume_point(self, data_path):
+        """Return (offset, rows) to continue loading data_path from, or (0, 0)"""
+        state = self.load()
+        if not state or state.get("path") != os.path.abspath(data_path):
+            return 0, 0
+        offset = state.get("offset", 0)
+        if offset > os.path.getsize(data_path):
+            return 0, 0
+        if state.get("prefix_sha1") != _prefix_digest(data_path, offset):
+            return 0, 0
+        return offset, state.get("rows", 0)
@@ -1,19 +1,23 @@
-"""Load and clean applicant data using the LLM cleaning script."""
+"""Load and clean applicant data using the LLM standardizer."""
 
+import importlib
 import json
-import subprocess
 import os
+import sys
+import time
+from urllib3 import PoolManager, Timeout
+from urllib3.exceptions import HTTPError
 import config
+from jsonl_store import JsonlWriter, iter_records
 
 
 def load_data(file_path=None):
-    """Load applicant data from JSON file"""
+    """Load applicant data from a JSON Lines (or legacy JSON array) file"""
     if file_path is None:
         file_path = config.DATA_FILE
 
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        data = list(iter_records(file_path))
         print(f"Loaded {len(data):,} records from {file_path}")
         return data
     except FileNotFoundError:
@@ -24,8 +28,95 @@ def load_data(file_path=None):
         return []
 
 
+class InProcessStandardizer:
+    """Call ``llm_hosting/standardizer.py`` directly in this process.
+
+    The module keeps one loaded model for the life of the process, so every
+    chunk after the first reuses the warm instance.
+    """
+
+    def __init__(self, llm_hosting_dir=None):
+        if llm_hosting_dir is None:
+            llm_hosting_dir = config.LLM_HOSTING_DIR
+        llm_hosting_dir = os.path.abspath(llm_hosting_dir)
+        # Appended, not prepended, so llm_hosting/app.py never shadows src/app.
+        if llm_hosting_dir not in sys.path:
+            sys.path.append(llm_hosting_dir)
+        self.module = importlib.import_module("standardizer")
+
+    def standardize(self, rows):
+        """Return rows with the llm-generated-program/university fields filled in"""
+        return self.module.standardize_rows(rows)
+
+    def close(self):
+        """Keep the model loaded; there is nothing to release per pull"""
+
+
+class HttpStandardizer:
+    """Send rows to a running ``llm_hosting/app.py --serve`` process.
+
+    The server loads the model once at startup, so pulls that reach it never
+    pay the model load at all. A server that was just started only accepts
+    connections once its model is loaded, so until the first reply connection
+    errors are retried for up to config.STANDARDIZER_STARTUP_TIMEOUT seconds.
+    """
+
+    def __init__(self, base_url):
+        self.url = base_url.rstrip("/") + "/standardize"
+        self.http = PoolManager(
+            timeout=Timeout(connect=config.HTTP_CONNECT_TIMEOUT,
+                            read=config.STANDARDIZER_READ_TIMEOUT))
+        self.answered = False
+
+    def _post(self, rows):
+        deadline = time.monotonic() + config.STANDARDIZER_STARTUP_TIMEOUT
+        while True:
+            try:
+                return self.http.request("POST", self.url, json={"rows": rows})
+            except HTTPError:
+                if self.answered or time.monotonic() >= deadline:
+                    raise
+                time.sleep(1)
+
+    def standardize(self, rows):
+        """POST one chunk of rows and return the standardized rows"""
+        response = self._post(rows)
+        self.answered = True
+        if response.status != 200:
+            raise RuntimeError(f"Standardizer server returned HTTP {response.status}")
+        return response.json()["rows"]
+
+    def close(self):
+        """Close pooled connections to the server"""
+        self.http.clear()
+
+
+def get_standardizer(llm_hosting_dir=None):
+    """Return the warm server client when STANDARDIZER_URL is set, else the in-process one"""
+    if config.STANDARDIZER_URL:
+        return HttpStandardizer(config.STANDARDIZER_URL)
+    return InProcessStandardizer(llm_hosting_dir)
+
+
+def _chunks(records, size):
+    """Yield lists of up to size records"""
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
 def clean_data(input_file=None, llm_script_path="../llm_hosting/app.py", output_file=None):
-    """Clean applicant data using LLM by calling external Python script"""
+    """Standardize applicant data with the LLM standardizer and write JSON Lines.
+
+    Rows are streamed from input_file in chunks of config.STANDARDIZE_CHUNK_ROWS
+    and each chunk is written as soon as it is standardized. The standardizer
+    lives next to llm_script_path and is called in-process, or through the
+    server at config.STANDARDIZER_URL when one is configured."""
     if input_file is None:
         input_file = config.DATA_FILE
     if output_file is None:
@@ -42,22 +133,21 @@ def clean_data(input_file=None, llm_script_path="../llm_hosting/app.py", output_
     print(f"Cleaning data from {input_file}...")
 
     try:
-        # Call the LLM cleaning script
-        command = ["python", llm_script_path, "--file", input_file, "--out", output_file]
-        result = subprocess.run(command, capture_output=True, text=True, check=True)
-
-        if result.stdout:
-            print(result.stdout)
+        standardizer = get_standardizer(os.path.dirname(llm_script_path))
+        try:
+            with JsonlWriter(output_file, truncate=True) as writer:
+                for chunk in _chunks(iter_records(input_file), config.STANDARDIZE_CHUNK_ROWS):
+                    writer.write_records(standardizer.standardize(chunk))
+        finally:
+            standardizer.close()
 
-        print("Data cleaning completed")
+        print(f"Data cleaning completed: {writer.records_written} records")
         return True
 
-    except subprocess.CalledProcessError as e:
-        print(f"Error running LLM script: {e}")
-        if e.stderr:
-            print(e.stderr)
+    except (ImportError, RuntimeError, HTTPError) as e:
+        print(f"Error running LLM standardizer: {e}")
         return False
-    except (OSError, subprocess.SubprocessError) as e:
+    except (OSError, ValueError, KeyError) as e:
         print(f"Error: {e}")
         return False
 
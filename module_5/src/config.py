@@ -33,7 +33,78 @@ def get_db_connect_kwargs():
 #Grad Cafe Configurations
 BASE_URL = "https://www.thegradcafe.com/survey/"
 LIST_URL_TEMPLATE = "https://www.thegradcafe.com/survey/?page={}"
+# Raw scrape output, written as JSON Lines (one record per line). fsync the
+# file every FSYNC_EVERY_N_PAGES pages; 0 leaves syncing to the OS.
 DATA_FILE = "applicant_data.json"
+FSYNC_EVERY_N_PAGES = 10
+
+# Raw HTML cache of detail pages, consulted by fetch_page before the network.
+# Entries are gzip-compressed and evicted least-recently-used beyond
+# HTML_CACHE_MAX_BYTES. "scrape.py --reparse" rebuilds DATA_FILE from this
+# cache alone and always opens it. Live pulls leave it off: a cached detail
+# page hides a changed decision for up to HTML_CACHE_DETAIL_TTL_SECONDS, so
+# enable it only for development runs. List pages are never cached.
+HTML_CACHE_ENABLED = False
+HTML_CACHE_DIR = "html_cache"
+HTML_CACHE_MAX_BYTES = 512 * 1024 * 1024
+HTML_CACHE_DETAIL_TTL_SECONDS = 30 * 24 * 60 * 60
+
+# Progress of the current pull, replaced atomically after each page so that
+# "scrape.py --resume" can continue after a crash.
+CHECKPOINT_FILE = "scrape_checkpoint.json"
+
+# BeautifulSoup tree builder used for list/detail pages: "lxml" (fast, C based)
+# or "html.parser" (pure Python, no extra dependency).
+PARSER_BACKEND = "lxml"
+
+# Detail pages for a list page are fetched in parallel by this many threads,
+# while each host is capped at MAX_REQUESTS_PER_SECOND (0 disables the cap).
+DETAIL_FETCH_WORKERS = 8
+MAX_REQUESTS_PER_SECOND = 10
+
+# Shared urllib3 pool: connections are kept alive between requests, and
+# 429/5xx responses are retried with exponential backoff.
+HTTP_NUM_POOLS = 4
+HTTP_POOL_MAXSIZE = DETAIL_FETCH_WORKERS
+HTTP_CONNECT_TIMEOUT = 5.0
+HTTP_READ_TIMEOUT = 15.0
+HTTP_RETRIES = 3
+HTTP_BACKOFF_FACTOR = 0.5
+HTTP_RETRY_STATUSES = (429, 500, 502, 503, 504)
 
 APPLICANT_DATA_JSON_FILE = "applicant_data.json.jsonl"
+
+# load_data.py streams APPLICANT_DATA_JSON_FILE into Postgres LOAD_CHUNK_ROWS
+# rows at a time and commits each chunk. The byte offset after the last
+# committed chunk is kept in LOAD_PROGRESS_FILE, so an interrupted load
+# continues from there instead of re-reading the whole history.
+LOAD_CHUNK_ROWS = 5000
+LOAD_PROGRESS_FILE = "load_progress.json"
+# Rows whose URL is already stored are skipped by default. With LOAD_UPSERT
+# (or "load_data.py --upsert") they are rewritten when their content hash
+# changed, e.g. after a decision or a better standardization arrives.
+LOAD_UPSERT = False
+
+# LLM standardizer. Scripts run llm_hosting/standardizer.py in-process, which
+# keeps its model loaded for the life of the process. Set STANDARDIZER_URL to
+# a running "llm_hosting/app.py --serve" to reuse a model that stays warm
+# between pulls. When it is unset, the Flask app starts one such server on
+# STANDARDIZER_PORT at the first Pull Data and points every pull at it, so
+# the model loads once per app lifetime (STANDARDIZER_AUTOSTART=0 turns this
+# off). Until a server first answers, connections are retried for up to
+# STANDARDIZER_STARTUP_TIMEOUT seconds while it loads the model. Rows are sent
+# in chunks of STANDARDIZE_CHUNK_ROWS.
+LLM_HOSTING_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "llm_hosting")
+STANDARDIZER_URL = os.getenv("STANDARDIZER_URL")
+STANDARDIZER_AUTOSTART = os.getenv("STANDARDIZER_AUTOSTART", "1") != "0"
+STANDARDIZER_PORT = int(os.getenv("STANDARDIZER_PORT", "8000"))
+STANDARDIZER_STARTUP_TIMEOUT = 600.0
+STANDARDIZER_READ_TIMEOUT = 300.0
+STANDARDIZE_CHUNK_ROWS = 100
 INITIAL_APPLICANT_DATA_JSON_FILE = "llm_extend_applicant_data.json"
+
+# "scrape.py --pipeline" streams each scraped page through the standardizer
+# and into Postgres on background threads. Each stage queue holds at most
+# PIPELINE_QUEUE_PAGES pages, so a slow stage backs up the scraper instead
+# of growing memory.
+PIPELINE_QUEUE_PAGES = 4
@@ -0,0 +1,134 @@
+"""On-disk, gzip-compressed cache of raw GradCafe HTML keyed by URL."""
+
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+
+class HtmlCache:
+    """Size-bounded LRU cache of fetched pages.
+
+    Each URL maps to ``<sha256(url)>.html.gz`` under a two-character fan-out
+    directory. The compressed payload stores the URL, the fetch time, the HTML
+    and optional ``meta`` fields. Freshness is checked against the stored fetch
+    time. A hit bumps the file's mtime, so eviction removes the least recently
+    used entries first once the cache grows past ``max_bytes``. Eviction trims down to
+    ``LOW_WATER`` of the budget, so a full cache rescans its directory once
+    per batch of puts instead of on every put.
+    """
+
+    SUFFIX = ".html.gz"
+    LOW_WATER = 0.8
+
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._size = None
+        self._lock = threading.Lock()
+
+    def path_for(self, url):
+        """Return the cache file path for a URL"""
+        digest = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, digest[:2], digest + self.SUFFIX)
+
+    def get(self, url, max_age=None):
+        """Return cached HTML for url, or None if missing or older than max_age seconds"""
+        path = self.path_for(url)
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, EOFError, ValueError) as e:
+            print(f"Discarding unreadable cache entry for {url}: {e}")
+            self._remove(path)
+            return None
+
+        if entry.get("url") != url:
+            return None
+        if max_age is not None and time.time() - entry["fetched_at"] > max_age:
+            return None
+
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return entry["html"]
+
+    def put(self, url, html, meta=None):
+        """Store html (and optional JSON-serializable meta) for url, then evict
+        old entries if the cache is over budget"""
+        path = self.path_for(url)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        payload = json.dumps({"url": url, "fetched_at": time.time(), "html": html, "meta": meta},
+                             ensure_ascii=False).encode("utf-8")
+
+        fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", dir=os.path.dirname(path))
+        try:
+            with os.fdopen(fd, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb") as f:
+                f.write(payload)
+            size = os.path.getsize(tmp_path)
+            with self._lock:
+                # Replacing an entry only adds the difference in size.
+                try:
+                    replaced = os.path.getsize(path)
+                except FileNotFoundError:
+                    replaced = 0
+                os.replace(tmp_path, path)
+                if self._size is None:
+                    self._size = self._scan_size()
+                else:
+                    self._size += size - replaced
+                if self._size > self.max_bytes:
+                    self._evict()
+        finally:
+            # A failed write must not leave its temp file behind.
+            self._remove(tmp_path)
+
+    def items(self):
+        """Yield (url, html, meta) for every readable entry, skipping unreadable files"""
+        for _mtime, _size, path in self._entries():
+            try:
+                with gzip.open(path, "rt", encoding="utf-8") as f:
+                    entry = json.load(f)
+            except (OSError, EOFError, ValueError):
+                continue
+            yield entry.get("url"), entry.get("html"), entry.get("meta")
+
+    def _entries(self):
+        """Yield (mtime, size, path) for every cache file"""
+        for root, _dirs, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(self.SUFFIX):
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    yield stat.st_mtime, stat.st_size, path
+
+    def _scan_size(self):
+        return sum(size for _mtime, size, _path in self._entries())
+
+    def _evict(self):
+        """Delete least recently used entries until the cache is back to its low-water mark"""
+        entries = sorted(self._entries())
+        total = sum(size for _mtime, size, _path in entries)
+        target = int(self.max_bytes * self.LOW_WATER)
+        for _mtime, size, path in entries:
+            if total <= target:
+                break
+            self._remove(path)
+            total -= size
+        self._size = total
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,77 @@
+"""Append-only JSON Lines storage for scraped applicant records."""
+
+import json
+import os
+
+
+class JsonlWriter:
+    """Append records to a JSON Lines file, one record per line.
+
+    Each call to ``write_records`` is flushed so a crash never leaves a partial
+    batch buffered in memory. When ``fsync_every`` is positive, the file is also
+    fsynced after that many batches (and on close).
+    """
+
+    def __init__(self, path, fsync_every=0, truncate=False):
+        self.path = path
+        self.fsync_every = fsync_every
+        self.records_written = 0
+        self._unsynced_batches = 0
+        # The writer owns the handle across write_records calls; close() releases it.
+        self._file = open(path, "w" if truncate else "a",  # pylint: disable=consider-using-with
+                          encoding="utf-8")
+
+    def write_records(self, records):
+        """Append an iterable of dicts and return how many were written"""
+        lines = [json.dumps(record, ensure_ascii=False) + "\n" for record in records]
+        self._file.writelines(lines)
+        self._file.flush()
+        self.records_written += len(lines)
+
+        self._unsynced_batches += 1
+        if self.fsync_every and self._unsynced_batches >= self.fsync_every:
+            self._fsync()
+        return len(lines)
+
+    def _fsync(self):
+        os.fsync(self._file.fileno())
+        self._unsynced_batches = 0
+
+    def close(self):
+        """Flush, fsync any pending batches (when enabled), and close the file"""
+        if self._file.closed:
+            return
+        self._file.flush()
+        if self.fsync_every and self._unsynced_batches:
+            self._fsync()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+def iter_records(path):
+    """Yield records from a JSON Lines file or a legacy JSON array file.
+
+    JSON Lines input is streamed line by line. A file whose first non-blank
+    character is ``[`` is treated as the older single JSON array format.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        first_char = ""
+        while True:
+            first_char = f.read(1)
+            if not first_char or not first_char.isspace():
+                break
+        f.seek(0)
+
+        if first_char == "[":
+            yield from json.load(f)
+            return
+
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
@@ -1,130 +1,299 @@
 """Load applicant JSONL data and insert into PostgreSQL."""
 
+import argparse
 from datetime import datetime
+from functools import lru_cache
+from itertools import islice
 import json
+import os
 import re
 import psycopg
 import config
+import migrate
+from checkpoint import LoadProgress
+from migrate import error_table_name
 
 # Database connection parameters are provided via config.get_db_connect_kwargs().
 
+RESULT_ID_RE = re.compile(r"/result/(\d+)$")
+NUMBER_RE = re.compile(r"[-+]?\d*\.?\d+(?:[eE][-+]?\d+)?")
+
+# Insertable applicant columns, in record_to_row order.
+COLUMN_NAMES = [
+    "program", "comments", "date_added", "url", "status", "term",
+    "us_or_international", "gpa", "gre", "gre_v", "gre_aw", "degree",
+    "llm_generated_program", "llm_generated_university"
+]
+# PostgreSQL types of COLUMN_NAMES, for binary COPY into the staging table.
+COLUMN_TYPES = [
+    "text", "text", "date", "text", "text", "text",
+    "text", "float8", "float8", "float8", "float8", "text",
+    "text", "text"
+]
+
 
 def create_table_if_not_exists(conn):
-    """Create the applicant table if it doesn't exist"""
-    create_table_query = f"""
-    CREATE TABLE IF NOT EXISTS {config.TABLE_NAME} (
-        p_id SERIAL PRIMARY KEY,
-        program TEXT,
-        comments TEXT,
-        date_added DATE,
-        url TEXT UNIQUE,
-        status TEXT,
-        term TEXT,
-        us_or_international TEXT,
-        gpa FLOAT,
-        gre FLOAT,
-        gre_v FLOAT,
-        gre_aw FLOAT,
-        degree TEXT,
-        llm_generated_program TEXT,
-        llm_generated_university TEXT
-    );
+    """Create the applicant table if needed and bring it to the latest schema.
+
+    The schema is owned by migrate.py; see MIGRATIONS there for its history.
     """
-    with conn.cursor() as cursor:
-        cursor.execute(create_table_query)
-    cursor.close()
+    migrate.upgrade(conn)
     print("Table 'applicant' created or already exists.")
 
 
-def parse_date(date_string):
-    """Parse date string like 'January 31, 2026' to date object"""
+@lru_cache(maxsize=4096)
+def _parse_date_text(date_string):
+    """strptime one date string; repeated strings are served from the cache"""
     try:
         return datetime.strptime(date_string, "%B %d, %Y").date()
-    except (ValueError, TypeError):
+    except ValueError:
         return None
 
 
+def parse_date(date_string):
+    """Parse date string like 'January 31, 2026' to date object"""
+    if not isinstance(date_string, str):
+        return None
+    return _parse_date_text(date_string)
+
+
+@lru_cache(maxsize=4096)
+def _parse_float_text(text):
+    """Convert one numeric string; plain numbers skip the regex"""
+    if text.isascii() and text.replace(".", "", 1).isdigit():
+        return float(text)
+    match = NUMBER_RE.search(text)
+    return float(match.group()) if match else None
+
+
 def parse_float(value):
     """Extract first numeric value from mixed strings (e.g., 'GPA 3.89')."""
     if value is None:
         return None
     if isinstance(value, (int, float)):
         return float(value)
-    match = re.search(r"[-+]?\d*\.?\d+(?:[eE][-+]?\d+)?", str(value))
-    return float(match.group()) if match else None
+    return _parse_float_text(str(value))
+
+
+# Record key and converter for each of COLUMN_NAMES, in order.
+RECORD_FIELDS = [
+    ('program', None),
+    ('comments', None),
+    ('date_added', parse_date),
+    ('url', None),
+    ('applicant_status', None),
+    ('semester_year_start', None),
+    ('citizenship', None),
+    ('gpa', parse_float),
+    ('gre', parse_float),
+    ('gre_v', parse_float),
+    ('gre_aw', parse_float),
+    ('masters_or_phd', None),
+    ('llm-generated-program', None),
+    ('llm-generated-university', None),
+]
+
+
+def record_to_row(record):
+    """Map one cleaned applicant record to an insert tuple for the applicant table"""
+    return tuple(
+        convert(record.get(key)) if convert else record.get(key)
+        for key, convert in RECORD_FIELDS
+    )
+
+
+def records_to_rows(records):
+    """Convert many records to insert tuples, one column at a time.
+
+    Each column is pulled out and converted with map(), so the per-field
+    work is one C-level loop per column. Dates and numeric strings repeat
+    across rows, and the converters' caches answer those repeats.
+    """
+    columns = []
+    for key, convert in RECORD_FIELDS:
+        values = [record.get(key) for record in records]
+        columns.append(list(map(convert, values)) if convert else values)
+    return list(zip(*columns))
+
+
+def iter_jsonl_records(filepath, offset=0):
+    """Yield (end_offset, record) for each record in a JSONL file, from a byte offset"""
+    with open(filepath, "rb") as f:
+        f.seek(offset)
+        for line in f:
+            offset += len(line)
+            if line.strip():
+                yield offset, json.loads(line)
 
 
 def load_jsonl_data(filepath):
     """Load and parse JSONL file with correct field mapping"""
-    records = []
-    with open(filepath, "r", encoding="utf-8") as f:
-        for line in f:
-            record = json.loads(line)
-            records.append((
-                record.get('program'),
-                record.get('comments'),
-                parse_date(record.get('date_added')),
-                record.get('url'),
-                record.get('applicant_status'),
-                record.get('semester_year_start'),
-                record.get('citizenship'),
-                parse_float(record.get('gpa')),
-                parse_float(record.get('gre')),
-                parse_float(record.get('gre_v')),
-                parse_float(record.get('gre_aw')),
-                record.get('masters_or_phd'),
-                record.get('llm-generated-program'),
-                record.get('llm-generated-university')
-            ))
-    return records
-
-
-def bulk_insert_with_skip_duplicates(conn, records):
-    """Bulk insert data with ON CONFLICT DO NOTHING"""
-    insert_query = f"""
-    INSERT INTO {config.TABLE_NAME} (
-        program, comments, date_added, url, status, term,
-        us_or_international, gpa, gre, gre_v, gre_aw, degree,
-        llm_generated_program, llm_generated_university
-    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-    ON CONFLICT (url) DO NOTHING;
+    return records_to_rows([record for _offset, record in iter_jsonl_records(filepath)])
+
+
+def load_jsonl_in_chunks(conn, filepath, chunk_rows=None, progress_path=None, upsert=False):
+    """Stream a JSONL file into the applicant table in committed chunks.
+
+    Records are parsed, converted column-wise (records_to_rows) and inserted
+    chunk_rows (default config.LOAD_CHUNK_ROWS) at a time, so memory stays bounded by one chunk.
+    After each chunk commits, its end offset is saved to the progress file
+    (default config.LOAD_PROGRESS_FILE). A later call resumes from that
+    offset, and the progress file is removed once the whole file is loaded.
+    upsert is passed on to bulk_insert_with_skip_duplicates. Returns the number
+    of rows read, including rows from a resumed run.
     """
-    column_names = [
-        "program", "comments", "date_added", "url", "status", "term",
-        "us_or_international", "gpa", "gre", "gre_v", "gre_aw", "degree",
-        "llm_generated_program", "llm_generated_university"
+    chunk_rows = chunk_rows or config.LOAD_CHUNK_ROWS
+    progress = LoadProgress(progress_path or config.LOAD_PROGRESS_FILE)
+    offset, total = progress.resume_point(filepath)
+    size = os.path.getsize(filepath)
+    if offset:
+        print(f"Resuming load at byte {offset} of {size} ({total} rows already committed).")
+
+    records = iter_jsonl_records(filepath, offset)
+    chunk_num = 0
+    while True:
+        chunk = list(islice(records, chunk_rows))
+        if not chunk:
+            break
+        chunk_num += 1
+        bulk_insert_with_skip_duplicates(
+            conn, records_to_rows([record for _end, record in chunk]), upsert=upsert)
+        offset, total = chunk[-1][0], total + len(chunk)
+        progress.save_offset(filepath, offset, total)
+        print(f"Chunk {chunk_num}: {total} rows committed, "
+              f"byte {offset} of {size} ({offset / size:.0%}).")
+    progress.clear()
+    return total
+
+
+def fetch_known_result_ids():
+    """Return the GradCafe result IDs already stored in the applicant table"""
+    query = f"SELECT url FROM {config.TABLE_NAME} WHERE url IS NOT NULL;"
+    try:
+        with psycopg.connect(**config.get_db_connect_kwargs()) as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(query)
+                urls = [row[0] for row in cursor.fetchall()]
+    except psycopg.Error as e:
+        print(f"Could not read stored results: {e}")
+        return set()
+
+    known_ids = set()
+    for url in urls:
+        match = RESULT_ID_RE.search(url)
+        if match:
+            known_ids.add(int(match.group(1)))
+    return known_ids
+
+
+def find_nul_fields(row):
+    """Return (index, column) pairs whose string value contains a NUL byte"""
+    return [
+        (idx, COLUMN_NAMES[idx])
+        for idx, value in enumerate(row)
+        if isinstance(value, str) and "\x00" in value
     ]
 
-    def find_nul_fields(row):
-        nul_fields = []
-        for idx, value in enumerate(row):
-            if isinstance(value, str) and "\x00" in value:
-                nul_fields.append((idx, column_names[idx]))
-        return nul_fields
+
+def _upsert_sql(stage, columns):
+    """INSERT ... ON CONFLICT DO UPDATE that rewrites only rows whose hash changed"""
+    updates = ", ".join(f"{name} = EXCLUDED.{name}" for name in [*COLUMN_NAMES, "content_hash"])
+    # DO UPDATE may touch each url once per statement, so keep its last occurrence.
+    return (
+        f"INSERT INTO {config.TABLE_NAME} ({columns}, content_hash) "
+        f"SELECT {columns}, md5(ROW({columns})::text) FROM ("
+        f"SELECT * FROM (SELECT DISTINCT ON (url) * FROM {stage} WHERE url IS NOT NULL "
+        "ORDER BY url, load_ord DESC) AS latest "
+        f"UNION ALL SELECT * FROM {stage} WHERE url IS NULL"
+        ") AS source ORDER BY load_ord "
+        f"ON CONFLICT (url) DO UPDATE SET {updates} "
+        f"WHERE {config.TABLE_NAME}.content_hash IS DISTINCT FROM EXCLUDED.content_hash "
+        "RETURNING (xmax = 0);"
+    )
+
+
+def bulk_insert_with_skip_duplicates(conn, records, upsert=False):
+    """Bulk insert rows via COPY into a staging table, skipping duplicate URLs.
+
+    Rows are streamed with binary COPY FROM STDIN into a temp table that is dropped on
+    commit, then moved into the applicant table with one INSERT ... SELECT ...
+    ON CONFLICT (url) DO NOTHING, in input order. PostgreSQL text cannot hold
+    NUL bytes, so such rows are written to the load-errors table instead.
+    records may be any iterable of record_to_row tuples.
+
+    Every stored row carries content_hash, an md5 of its column values. With
+    upsert=True, a row whose URL is already stored is rewritten only when that
+    hash differs (a new decision, GRE scores, or standardization), so a refresh
+    touches just the changed rows. Returns the number of rows written.
+    """
+    columns = ", ".join(COLUMN_NAMES)
+    stage = f"{config.TABLE_NAME}_stage"
+    rejected = []
+    total = 0
+    updated = 0
 
     with conn.cursor() as cursor:
         try:
-            cursor.executemany(insert_query, records)
+            cursor.execute(
+                f"CREATE TEMP TABLE {stage} ON COMMIT DROP AS "
+                f"SELECT 0::BIGINT AS load_ord, {columns} FROM {config.TABLE_NAME} WITH NO DATA;"
+            )
+            with cursor.copy(
+                f"COPY {stage} (load_ord, {columns}) FROM STDIN (FORMAT BINARY)"
+            ) as copy:
+                copy.set_types(["int8", *COLUMN_TYPES])
+                for total, row in enumerate(records, start=1):
+                    if find_nul_fields(row):
+                        rejected.append(row)
+                        continue
+                    copy.write_row((total, *row))
+            if upsert:
+                cursor.execute(_upsert_sql(stage, columns))
+                written = [is_insert for (is_insert,) in cursor.fetchall()]
+                inserted = sum(written)
+                updated = len(written) - inserted
+            else:
+                cursor.execute(
+                    f"INSERT INTO {config.TABLE_NAME} ({columns}, content_hash) "
+                    f"SELECT {columns}, md5(ROW({columns})::text) FROM {stage} ORDER BY load_ord "
+                    "ON CONFLICT (url) DO NOTHING;"
+                )
+                inserted = cursor.rowcount
+            if rejected:
+                cursor.executemany(
+                    f"INSERT INTO {error_table_name()} (url, error, row_data) VALUES (%s, %s, %s);",
+                    [
+                        (
+                            None if "\x00" in str(row[3]) else row[3],
+                            f"NUL bytes in fields: {find_nul_fields(row)}",
+                            json.dumps(row, default=str),
+                        )
+                        for row in rejected
+                    ],
+                )
         except psycopg.Error as e:
+            cursor.connection.rollback()
             print(f"Bulk insert failed: {e}")
-            print("Scanning rows to locate the offending record...")
-            for i, row in enumerate(records, start=1):
-                try:
-                    cursor.execute(insert_query, row)
-                except psycopg.Error as row_err:
-                    nul_fields = find_nul_fields(row)
-                    if nul_fields:
-                        print(f"Row {i} contains NUL bytes in fields: {nul_fields}")
-                    print(f"Row {i} error: {row_err}")
-                    print(f"Row {i} data: {row}")
-                    raise
+            raise
         cursor.connection.commit()
     cursor.close()
-    print(f"Successfully processed {len(records)} records (duplicates skipped).")
+    skipped = total - inserted - updated - len(rejected)
+    print(
+        f"Successfully processed {total} records ({inserted} inserted, "
+        + (f"{updated} updated, {skipped} unchanged, " if upsert
+           else f"{skipped} duplicates skipped, ")
+        + f"{len(rejected)} rejected to {error_table_name()})."
+    )
+    return inserted + updated
 
 
-def main():
-    """Main function to load data from JSONL to PostgreSQL"""
+def main(upsert=None):
+    """Main function to load data from JSONL to PostgreSQL
+
+    upsert defaults to config.LOAD_UPSERT; when true, stored rows whose
+    content changed are refreshed instead of skipped.
+    """
+    upsert = config.LOAD_UPSERT if upsert is None else upsert
     try:
         # Connect to PostgreSQL
         print("Connecting to database...")
@@ -133,14 +302,10 @@ def main():
             # Create table if not exists
             create_table_if_not_exists(conn)
 
-            # Load JSONL data
-            print("Loading JSONL data...")
-            records = load_jsonl_data(config.APPLICANT_DATA_JSON_FILE)
-            print(f"Loaded {len(records)} records from JSON file.")
-
-            # Bulk insert with duplicate handling
-            print("Inserting data into database...")
-            bulk_insert_with_skip_duplicates(conn, records)
+            # Stream JSONL data into the table in committed chunks
+            print("Loading JSONL data into database...")
+            total = load_jsonl_in_chunks(conn, config.APPLICANT_DATA_JSON_FILE, upsert=upsert)
+            print(f"Loaded {total} records from JSON file.")
 
             print("Data loading completed successfully!")
             conn.close()
@@ -152,4 +317,7 @@ def main():
     except json.JSONDecodeError as e:
         print(f"Error parsing JSON: {e}")
 if __name__ == "__main__":
-    main()
+    cli = argparse.ArgumentParser(description="Load applicant JSONL data into PostgreSQL.")
+    cli.add_argument("--upsert", action="store_true",
+                     help="Refresh stored rows whose content changed instead of skipping them.")
+    main(upsert=cli.parse_args().upsert or None)
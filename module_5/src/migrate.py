@@ -0,0 +1,256 @@
+"""Versioned schema migrations for the applicant table.
+
+Each migration has a number and is recorded in the ``schema_version`` table
+once applied, so every database converges on the same schema. Usage::
+
+    python src/migrate.py status
+    python src/migrate.py upgrade [--target N]
+
+Index builds use ``CREATE INDEX CONCURRENTLY`` and run outside a transaction,
+so a live database keeps serving reads and writes while they build.
+"""
+
+import argparse
+from collections.abc import Callable
+from dataclasses import dataclass
+
+import psycopg
+
+import config
+
+SCHEMA_VERSION_TABLE = "schema_version"
+# The four-digit year of term. Queries must spell it exactly like this to use its index.
+TERM_YEAR_EXPR = "substring(term FROM '[0-9]{4}')::INTEGER"
+
+
+@dataclass(frozen=True)
+class Migration:
+    """One numbered schema change.
+
+    ``apply(cursor)`` issues the change. A transactional migration commits
+    together with its schema_version row. A concurrent one runs in autocommit,
+    as ``CREATE INDEX CONCURRENTLY`` requires, and must be safe to re-run.
+    An optional migration that cannot run on this server returns False; it
+    is not recorded, so the next upgrade tries it again.
+    """
+    version: int
+    description: str
+    apply: Callable
+    concurrent: bool = False
+
+
+def error_table_name():
+    """Name of the side table that collects rows the loader rejected"""
+    return f"{config.TABLE_NAME}_load_errors"
+
+
+def btree_index_columns():
+    """Index name -> column list for the analysis questions' equality filters"""
+    table = config.TABLE_NAME
+    return {
+        f"{table}_term_status_idx": "term, status",
+        f"{table}_us_or_international_idx": "us_or_international",
+        f"{table}_degree_idx": "degree",
+    }
+
+
+def trigram_index_columns():
+    """Index name -> column for the analysis questions' LIKE '%...%' searches"""
+    table = config.TABLE_NAME
+    return {
+        f"{table}_{column}_trgm_idx": column
+        for column in ("program", "llm_generated_program", "llm_generated_university")
+    }
+
+
+def create_index_concurrently(cursor, name, definition):
+    """Build one index without blocking writers, replacing an invalid leftover.
+
+    An interrupted concurrent build leaves an INVALID index behind that
+    IF NOT EXISTS would keep, so it is dropped before retrying.
+    """
+    cursor.execute(
+        "SELECT i.indisvalid FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+        "WHERE c.relname = %s;",
+        (name,),
+    )
+    found = cursor.fetchone()
+    if found is not None and not found[0]:
+        cursor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name};")
+    cursor.execute(
+        f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {config.TABLE_NAME} {definition};"
+    )
+
+
+def _create_tables(cursor):
+    cursor.execute(f"""
+    CREATE TABLE IF NOT EXISTS {config.TABLE_NAME} (
+        p_id SERIAL PRIMARY KEY,
+        program TEXT,
+        comments TEXT,
+        date_added DATE,
+        url TEXT UNIQUE,
+        status TEXT,
+        term TEXT,
+        us_or_international TEXT,
+        gpa FLOAT,
+        gre FLOAT,
+        gre_v FLOAT,
+        gre_aw FLOAT,
+        degree TEXT,
+        llm_generated_program TEXT,
+        llm_generated_university TEXT
+    );
+    """)
+    cursor.execute(f"""
+    CREATE TABLE IF NOT EXISTS {error_table_name()} (
+        id SERIAL PRIMARY KEY,
+        logged_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+        url TEXT,
+        error TEXT NOT NULL,
+        row_data TEXT NOT NULL
+    );
+    """)
+
+
+def _add_content_hash(cursor):
+    cursor.execute(f"ALTER TABLE {config.TABLE_NAME} ADD COLUMN IF NOT EXISTS content_hash TEXT;")
+
+
+def _index_term_year(cursor):
+    # An expression index instead of a stored column: no table rewrite, no exclusive lock.
+    create_index_concurrently(cursor, f"{config.TABLE_NAME}_term_year_status_idx",
+                              f"(({TERM_YEAR_EXPR}), status)")
+
+
+def _create_btree_indexes(cursor):
+    for name, columns in btree_index_columns().items():
+        create_index_concurrently(cursor, name, f"({columns})")
+
+
+def _create_trigram_indexes(cursor):
+    # Substring searches need pg_trgm; without it those questions keep scanning.
+    try:
+        cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm;")
+    except psycopg.Error as e:
+        print(f"pg_trgm unavailable, skipping trigram indexes: {e}")
+        return False
+    for name, column in trigram_index_columns().items():
+        create_index_concurrently(cursor, name, f"USING gin ({column} gin_trgm_ops)")
+    return True
+
+
+# Append new migrations with the next number; never renumber or edit applied ones.
+MIGRATIONS = [
+    Migration(1, "Create the applicant and load-error tables", _create_tables),
+    Migration(2, "Add content_hash for upsert loads", _add_content_hash),
+    Migration(3, "Index the year of term with status", _index_term_year, concurrent=True),
+    Migration(4, "Index term, status, citizenship and degree", _create_btree_indexes,
+              concurrent=True),
+    Migration(5, "Trigram-index program and university names", _create_trigram_indexes,
+              concurrent=True),
+]
+
+
+def _ensure_version_table(cursor):
+    cursor.execute(f"""
+    CREATE TABLE IF NOT EXISTS {SCHEMA_VERSION_TABLE} (
+        table_name TEXT NOT NULL,
+        version INTEGER NOT NULL,
+        description TEXT NOT NULL,
+        applied_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+        PRIMARY KEY (table_name, version)
+    );
+    """)
+
+
+def _applied(cursor):
+    cursor.execute(
+        f"SELECT version, applied_at FROM {SCHEMA_VERSION_TABLE} WHERE table_name = %s;",
+        (config.TABLE_NAME,),
+    )
+    return dict(cursor.fetchall())
+
+
+def _apply_and_record(cursor, migration):
+    """Run one migration and record it; False if it asked to stay pending"""
+    if migration.apply(cursor) is False:
+        return False
+    cursor.execute(
+        f"INSERT INTO {SCHEMA_VERSION_TABLE} (table_name, version, description) "
+        "VALUES (%s, %s, %s);",
+        (config.TABLE_NAME, migration.version, migration.description),
+    )
+    return True
+
+
+def upgrade(conn, target=None):
+    """Apply pending migrations up to target (default: all); return the versions applied.
+
+    Any open transaction on conn is committed first. A session advisory lock
+    keeps two loaders from migrating the same table at once.
+    """
+    autocommit = conn.autocommit
+    conn.commit()
+    conn.autocommit = True
+    applied = []
+    try:
+        with conn.cursor() as cursor:
+            lock_key = f"{SCHEMA_VERSION_TABLE}:{config.TABLE_NAME}"
+            cursor.execute("SELECT pg_advisory_lock(hashtext(%s));", (lock_key,))
+            try:
+                _ensure_version_table(cursor)
+                done = _applied(cursor)
+                for migration in MIGRATIONS:
+                    if migration.version in done:
+                        continue
+                    if target is not None and migration.version > target:
+                        continue
+                    print(f"Applying migration {migration.version}: {migration.description}")
+                    if migration.concurrent:
+                        recorded = _apply_and_record(cursor, migration)
+                    else:
+                        with conn.transaction():
+                            recorded = _apply_and_record(cursor, migration)
+                    if not recorded:
+                        print(f"Migration {migration.version} left pending")
+                        continue
+                    applied.append(migration.version)
+            finally:
+                cursor.execute("SELECT pg_advisory_unlock(hashtext(%s));", (lock_key,))
+    finally:
+        conn.autocommit = autocommit
+    return applied
+
+
+def status(conn):
+    """Return (version, description, applied_at or None) for every migration"""
+    with conn.cursor() as cursor:
+        _ensure_version_table(cursor)
+        done = _applied(cursor)
+    conn.commit()
+    return [(m.version, m.description, done.get(m.version)) for m in MIGRATIONS]
+
+
+def main(argv=None):
+    """Run the status or upgrade command against the configured database"""
+    parser = argparse.ArgumentParser(description="Manage the applicant table schema.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("status", help="List migrations and whether each is applied.")
+    upgrade_parser = commands.add_parser("upgrade", help="Apply pending migrations.")
+    upgrade_parser.add_argument("--target", type=int, default=None,
+                                help="Stop after this migration number.")
+    args = parser.parse_args(argv)
+
+    with psycopg.connect(**config.get_db_connect_kwargs()) as conn:
+        if args.command == "upgrade":
+            applied = upgrade(conn, target=args.target)
+            print(f"Applied {len(applied)} migration(s) to {config.TABLE_NAME}.")
+        else:
+            for version, description, applied_at in status(conn):
+                state = f"applied {applied_at:%Y-%m-%d %H:%M}" if applied_at else "pending"
+                print(f"{version:>4}  {state:<24} {description}")
+
+
+if __name__ == "__main__":
+    main()
@@ -46,3 +46,11 @@ class ApplicantData:
     def to_dict(self):
         """Convert to dictionary for JSON serialization."""
         return dict(self._data)
+
+    @classmethod
+    def from_dict(cls, record):
+        """Rebuild an applicant from a to_dict() record; unknown keys are ignored."""
+        applicant = cls()
+        for field in cls.FIELDS:
+            applicant._data[field] = record.get(field)
+        return applicant
@@ -0,0 +1,120 @@
+"""Streaming scrape -> standardize -> load pipeline connected by bounded queues."""
+
+import os
+import queue
+import threading
+
+import psycopg
+
+from clean import get_standardizer
+from jsonl_store import JsonlWriter
+import load_data
+import config
+
+_DONE = object()
+
+
+class PullPipeline:
+    """Run the standardize and load stages on background threads.
+
+    The scraper calls ``submit`` once per page. Each page travels through two
+    bounded queues::
+
+        scraper -> [standardize queue] -> standardize_fn -> [load queue] -> load_fn
+
+    When a stage falls behind, its queue fills up and ``submit`` blocks, so at
+    most a few pages are held in memory no matter how long the pull runs.
+    After a stage fails, it drains and drops later pages. The first error
+    is re-raised by ``close``. Pages that already passed the failed stage are
+    still loaded.
+    """
+
+    def __init__(self, standardize_fn, load_fn, queue_size=None, cleanup=None):
+        if queue_size is None:
+            queue_size = config.PIPELINE_QUEUE_PAGES
+        self.standardize_queue = queue.Queue(maxsize=queue_size)
+        self.load_queue = queue.Queue(maxsize=queue_size)
+        self.errors = []
+        self.pages_loaded = 0
+        self._cleanup = cleanup
+        self._threads = [
+            threading.Thread(target=self._run_stage, name="pipeline-standardize",
+                             args=(self.standardize_queue, standardize_fn, self.load_queue),
+                             daemon=True),
+            threading.Thread(target=self._run_stage, name="pipeline-load",
+                             args=(self.load_queue, load_fn, None), daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    @property
+    def failed(self):
+        """True once any stage has raised"""
+        return bool(self.errors)
+
+    def submit(self, rows):
+        """Queue one page of raw records, blocking while the first stage is full"""
+        self.standardize_queue.put(rows)
+
+    def close(self):
+        """Flush every queued page through both stages and stop the threads"""
+        self.standardize_queue.put(_DONE)
+        for thread in self._threads:
+            thread.join()
+        if self._cleanup is not None:
+            self._cleanup()
+        if self.errors:
+            raise self.errors[0]
+
+    def _run_stage(self, inbox, stage_fn, outbox):
+        stage_failed = False
+        while True:
+            rows = inbox.get()
+            if rows is _DONE:
+                if outbox is not None:
+                    outbox.put(_DONE)
+                return
+            if stage_failed:
+                continue
+            try:
+                result = stage_fn(rows)
+            # Any stage error is kept for close() to re-raise in the scraper thread.
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                self.errors.append(e)
+                stage_failed = True
+                continue
+            if outbox is not None:
+                outbox.put(result)
+            else:
+                self.pages_loaded += 1
+
+
+def build_pull_pipeline(llm_script_path, output_file, truncate=True):
+    """Wire the standardizer, the cleaned JSONL file and Postgres into a pipeline"""
+    # pylint cannot infer the Connection that psycopg.connect returns outside a with block.
+    # pylint: disable=no-member
+    conn = psycopg.connect(**config.get_db_connect_kwargs())
+    try:
+        load_data.create_table_if_not_exists(conn)
+        conn.commit()
+        standardizer = get_standardizer(os.path.dirname(llm_script_path))
+    except BaseException:
+        conn.close()
+        raise
+    writer = JsonlWriter(output_file, truncate=truncate)
+
+    def standardize(rows):
+        cleaned = standardizer.standardize(rows)
+        writer.write_records(cleaned)
+        return cleaned
+
+    def load(rows):
+        load_data.bulk_insert_with_skip_duplicates(
+            conn, load_data.records_to_rows(rows), upsert=config.LOAD_UPSERT)
+
+    def cleanup():
+        standardizer.close()
+        writer.close()
+        conn.close()
+
+    return PullPipeline(standardize, load, cleanup=cleanup)
@@ -2,57 +2,77 @@
 
 import psycopg
 import config
+from migrate import TERM_YEAR_EXPR
 
 # Database connection parameters are provided via config.get_db_connect_kwargs().
 
 # Question and sql dic
 question_sql_dict = {}
-
-question_sql_dict["How many entries do you have in your database who have applied for Fall 2026?"]\
-    = f"""
+# Whole-table questions rewritten as aggregates, as question -> [(column name,
+# aggregate)], so the dashboard can answer them all in one scan. Column names
+# match what each question's own query returns. Questions narrowed by term,
+# school or program stay out: their own queries use the indexes, while a
+# FILTER aggregate would drag them through the full scan.
+question_aggregate_dict = {}
+
+_question = "How many entries do you have in your database who have applied for Fall 2026?"
+question_sql_dict[_question] = f"""
         SELECT COUNT(*) 
         FROM {config.TABLE_NAME}
         WHERE term = 'Fall 2026';"""
 
-question_sql_dict["What percentage of entries are from international students (not American\
-    or Other) (to two decimal places)?"] = \
+_question = "What percentage of entries are from international students (not American\
+    or Other) (to two decimal places)?"
+question_sql_dict[_question] = \
     f"""
         SELECT ROUND(COUNT(CASE WHEN us_or_international NOT IN ('American', 'Other') THEN 1 END) * 100.0 / COUNT(*), 2)
         FROM {config.TABLE_NAME};
     """
+question_aggregate_dict[_question] = [
+    ("round", "ROUND(COUNT(*) FILTER (WHERE us_or_international "
+              "NOT IN ('American', 'Other')) * 100.0 / COUNT(*), 2)")]
 
-question_sql_dict["What is the average GPA, GRE, GRE V, GRE AW of applicants who provide\
-    these metrics?"] = f"""
+_question = "What is the average GPA, GRE, GRE V, GRE AW of applicants who provide\
+    these metrics?"
+question_sql_dict[_question] = f"""
         SELECT ROUND(AVG(gpa)::numeric, 2)   AS avg_gpa, ROUND(AVG(gre)::numeric,2) AS avg_gre, 
             ROUND(AVG(gre_v)::numeric, 2) AS avg_gre_v, ROUND(AVG(gre_aw)::numeric, 2) AS avg_gre_aw
         FROM {config.TABLE_NAME}
         WHERE gpa IS NOT NULL OR gre IS NOT NULL OR gre_v IS NOT NULL OR gre_aw IS NOT NULL;
     """
+# AVG skips NULLs and every non-NULL score passes the "provides a metric"
+# filter, so the aggregate needs no FILTER clause.
+question_aggregate_dict[_question] = [
+    (f"avg_{col}", f"ROUND(AVG({col})::numeric, 2)") for col in ("gpa", "gre", "gre_v", "gre_aw")]
 
-question_sql_dict["What is their average GPA of American students in Fall 2026?"] = \
+_question = "What is their average GPA of American students in Fall 2026?"
+question_sql_dict[_question] = \
     f"""
         SELECT ROUND(AVG(gpa)::numeric, 2) AS avg_gpa
         FROM {config.TABLE_NAME}
         WHERE us_or_international = 'American' AND term = 'Fall 2026';
     """
 
-question_sql_dict["What percent of entries for Fall 2026 are Acceptances (to two \
-    decimal places)?"] = f"""
+_question = "What percent of entries for Fall 2026 are Acceptances (to two \
+    decimal places)?"
+question_sql_dict[_question] = f"""
         SELECT ROUND(COUNT(CASE WHEN status = 'Accepted' THEN 1 END) * 100.0 / COUNT(*), 2)
         FROM {config.TABLE_NAME}
         WHERE term = 'Fall 2026';
     """
 
-question_sql_dict["What is the average GPA of applicants who applied for Fall 2026 \
-    who are Acceptances?"] = \
+_question = "What is the average GPA of applicants who applied for Fall 2026 \
+    who are Acceptances?"
+question_sql_dict[_question] = \
     f"""
         SELECT ROUND(AVG(gpa)::numeric, 2) AS avg_gpa
         FROM {config.TABLE_NAME}
         WHERE term = 'Fall 2026' AND status = 'Accepted';
     """
 
-question_sql_dict["How many entries are from applicants who applied to JHU for \
-    a masters degrees in Computer Science?"] = \
+_question = "How many entries are from applicants who applied to JHU for \
+    a masters degrees in Computer Science?"
+question_sql_dict[_question] = \
     f"""
         SELECT COUNT(*) 
         FROM {config.TABLE_NAME}
@@ -64,13 +84,15 @@ question_sql_dict["How many entries are from applicants who applied to JHU for \
             OR llm_generated_university like '%JHU%');
     """
 
-question_sql_dict[("How many entries from 2026 are acceptances from applicants who applied \
+
+_question = "How many entries from 2026 are acceptances from applicants who applied \
     to Georgetown University, MIT, Stanford University, or Carnegie Mellon University for \
-    a PhD in Computer Science?")] = \
+    a PhD in Computer Science?"
+question_sql_dict[_question] = \
     f"""
         SELECT COUNT(*) AS phd_cs_acceptances_count
         FROM {config.TABLE_NAME}
-        WHERE term LIKE '%2026%'
+        WHERE {TERM_YEAR_EXPR} = 2026
           AND status = 'Accepted'
           AND (program LIKE '%Computer Science%')
           AND (degree LIKE '%PhD%')
@@ -83,12 +105,13 @@ question_sql_dict[("How many entries from 2026 are acceptances from applicants w
 
     """
 
-question_sql_dict[("Do you numbers for question 8 change if you use LLM Generated Fields \
-    (rather than your downloaded fields)?")] = \
+_question = "Do you numbers for question 8 change if you use LLM Generated Fields \
+    (rather than your downloaded fields)?"
+question_sql_dict[_question] = \
     f"""
         SELECT COUNT(*) AS phd_cs_acceptances_count
         FROM {config.TABLE_NAME}
-        WHERE term LIKE '%2026%'
+        WHERE {TERM_YEAR_EXPR} = 2026
           AND status = 'Accepted'
           AND (llm_generated_program LIKE '%Computer Science%')
           AND (degree LIKE '%PhD%')
@@ -101,7 +124,8 @@ question_sql_dict[("Do you numbers for question 8 change if you use LLM Generate
 
     """
 
-question_sql_dict["Which top 5 universities have the highest acceptance rates in Fall 2026?"] = \
+_question = "Which top 5 universities have the highest acceptance rates in Fall 2026?"
+question_sql_dict[_question] = \
     f"""
         SELECT llm_generated_university as University, ROUND(COUNT(CASE WHEN status = 'Accepted' THEN 1 END) * 100.0 / COUNT(*), 2) AS acceptance_rate
         FROM {config.TABLE_NAME}
@@ -111,7 +135,8 @@ question_sql_dict["Which top 5 universities have the highest acceptance rates in
         LIMIT 5;
     """
 
-question_sql_dict["What are the top 10 distinct programs applied for Fall 2026?"] = \
+_question = "What are the top 10 distinct programs applied for Fall 2026?"
+question_sql_dict[_question] = \
     f"""
         SELECT DISTINCT program
         FROM {config.TABLE_NAME}
@@ -122,12 +147,34 @@ question_sql_dict["What are the top 10 distinct programs applied for Fall 2026?"
 
 
 
-question_sql_dict["How many total applicants you have in your db?"] = \
+_question = "How many total applicants you have in your db?"
+question_sql_dict[_question] = \
     f"""
         SELECT count(*)
         FROM {config.TABLE_NAME};
     """
+question_aggregate_dict[_question] = [("count", "COUNT(*)")]
+
 
+def single_pass_plan(question_map):
+    """Fold the foldable questions of question_map into one aggregate query.
+
+    A question folds when its SQL in question_map is exactly the stock query
+    from question_sql_dict, so custom maps keep their own queries. Returns
+    (sql, folded): sql selects every folded question's columns in one scan,
+    and folded lists (question, columns) in SELECT order. sql is None when
+    nothing folds.
+    """
+    folded = [
+        (question, question_aggregate_dict[question])
+        for question, query in question_map.items()
+        if question in question_aggregate_dict and query == question_sql_dict.get(question)
+    ]
+    if not folded:
+        return None, []
+    select = ",\n    ".join(expr for _q, aggregates in folded for _col, expr in aggregates)
+    sql = f"SELECT\n    {select}\nFROM {config.TABLE_NAME};"
+    return sql, [(question, [col for col, _expr in aggregates]) for question, aggregates in folded]
 
 
 def main():
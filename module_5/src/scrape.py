@@ -1,46 +1,180 @@
 """Scrape applicant data from The Grad Cafe."""
 
-import json
 import time
 import re
 import os
-from urllib.parse import urljoin
-from urllib3 import request
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin, urlsplit
+from urllib3 import PoolManager, Retry, Timeout
 from urllib3.exceptions import HTTPError
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
+import soupsieve
+import psycopg
 
+from checkpoint import ScrapeCheckpoint
 from clean import clean_data
+from html_cache import HtmlCache
 import load_data
+import pipeline
+from jsonl_store import JsonlWriter
 from model import ApplicantData
 import config
 
 
-class GradCafeScraper:
+# ==================== Precompiled Patterns ====================
+# Compiled once at import so per-row parsing never re-enters the regex compiler.
+
+RESULT_HREF_RE = re.compile(r'^/result/\d+$')
+SEMESTER_RE = re.compile(r'(Fall|Spring|Summer)\s+(\d{4})')
+GPA_RE = re.compile(r'GPA\s+(\d+\.?\d*)')
+AMERICAN_RE = re.compile(r'\bAmerican\b')
+INTERNATIONAL_RE = re.compile(r'\bInternational\b')
+NUMERIC_RE = re.compile(r"\d+(\.\d+)?")
+WHITESPACE_RE = re.compile(r'\s+')
+NOTIFICATION_RE = re.compile(r'Notification\s+on[:\s]+(\d{1,2}/\d{1,2}/\d{4})', re.IGNORECASE)
+COUNTRY_OF_ORIGIN_RE = re.compile(r"Degree'?s\s+Country\s+of\s+Origin", re.IGNORECASE)
+
+# One alternation finds the decision and its date in a single pass over the badge.
+STATUS_RE = re.compile(
+    r'(?P<status>Accepted|Rejected|Interview|Wait\s*listed)\s+on\s+'
+    r'(?P<date>.+?)(?=Fall|Spring|Summer|American|International|GPA|$)',
+    re.IGNORECASE,
+)
+STATUS_VALUES = {
+    'accepted': 'Accepted',
+    'rejected': 'Rejected',
+    'interview': 'Interview',
+    'waitlisted': 'Wait listed',
+}
+
+# List pages only need the results table, so the tree builder skips everything else.
+LIST_TABLE_STRAINER = SoupStrainer('table')
+
+# Precompiled CSS selectors for the detail page GRE list. ``[class*=...]`` matches
+# a substring of any class, the same as the former ``class_=re.compile(...)``.
+GRE_ITEM_SELECTOR = soupsieve.compile('li[class*="tw-flex"]')
+GRE_LABEL_SELECTOR = soupsieve.compile('span[class*="tw-font-medium"]')
+GRE_VALUE_SELECTOR = soupsieve.compile('span[class*="tw-text-gray-400"]')
+
+
+def _parse_numeric_value(text):
+    """Return the first number in text as a float, or None"""
+    match = NUMERIC_RE.search(text)
+    if not match:
+        return None
+    try:
+        return float(match.group(0))
+    except ValueError:
+        return None
+
+
+def build_http_pool():
+    """Create the shared keep-alive connection pool used for every page fetch"""
+    return PoolManager(
+        num_pools=config.HTTP_NUM_POOLS,
+        maxsize=config.HTTP_POOL_MAXSIZE,
+        block=True,
+        timeout=Timeout(connect=config.HTTP_CONNECT_TIMEOUT, read=config.HTTP_READ_TIMEOUT),
+        retries=Retry(
+            total=config.HTTP_RETRIES,
+            backoff_factor=config.HTTP_BACKOFF_FACTOR,
+            status_forcelist=config.HTTP_RETRY_STATUSES,
+            allowed_methods=["GET"],
+        ),
+    )
+
+
+# A single-method class keeps the per-host slots and their lock together.
+class HostRateLimiter:  # pylint: disable=too-few-public-methods
+    """Space out requests so each host sees at most ``rate`` requests per second"""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next_slot = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url):
+        """Block until the next request slot for the URL's host is available"""
+        if not self.interval:
+            return
+
+        host = urlsplit(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.interval
+
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+# The scraper owns its HTTP, parsing, output, cache and resume state.
+class GradCafeScraper:  # pylint: disable=too-many-instance-attributes
     """Scraper for The Grad Cafe applicant data"""
 
-    def __init__(self):
+    def __init__(self, use_cache=None):
         self.base_url = config.BASE_URL.rstrip('/')
         self.list_url_template = config.LIST_URL_TEMPLATE
         self.data_file = config.DATA_FILE
+        self.detail_workers = max(1, config.DETAIL_FETCH_WORKERS)
+        self.rate_limiter = HostRateLimiter(config.MAX_REQUESTS_PER_SECOND)
+        self.http = build_http_pool()
+        self.parser_backend = config.PARSER_BACKEND
+        self.writer = None
+        self.checkpoint = ScrapeCheckpoint(config.CHECKPOINT_FILE)
+        self.cache = None
+        if config.HTML_CACHE_ENABLED if use_cache is None else use_cache:
+            self.cache = HtmlCache(config.HTML_CACHE_DIR, config.HTML_CACHE_MAX_BYTES)
+        self.known_result_ids = None
+        self.caught_up = False
 
     # ==================== Fetching Methods ====================
 
-    def fetch_page(self, url):
-        """Fetch HTML content from URL using urllib3"""
+    def fetch_page(self, url, meta=None):
+        """Fetch HTML content from URL through the HTML cache and shared urllib3 pool.
+        Only detail pages go through the cache: a cached list page would hide
+        new results and end an incremental pull early. meta is stored with a
+        freshly cached page (see reparse_cache)."""
+        cache = self.cache if self._is_detail_url(url) else None
+        if cache:
+            cached = cache.get(url, max_age=config.HTML_CACHE_DETAIL_TTL_SECONDS)
+            if cached is not None:
+                return cached
+
+        self.rate_limiter.wait(url)
         try:
-            resp = request("GET", url)
+            resp = self.http.request("GET", url)
             html = resp.data.decode("utf-8")
-            return html
 
         except (HTTPError, OSError, UnicodeDecodeError) as e:
             print(f"Error fetching {url}: {e}")
             return None
 
+        # A full or read-only cache must not lose a page that was fetched fine.
+        if cache and resp.status == 200:
+            try:
+                cache.put(url, html, meta)
+            except OSError as e:
+                print(f"Could not cache {url}: {e}")
+        return html
+
+    @staticmethod
+    def _is_detail_url(url):
+        """Detail pages rarely change; list pages change as results are posted"""
+        return "/result/" in url
+
     # ==================== Parsing Methods ====================
 
+    def make_soup(self, html, parse_only=None):
+        """Build a BeautifulSoup tree with the configured parser backend"""
+        return BeautifulSoup(html, self.parser_backend, parse_only=parse_only)
+
     def parse_list_page(self, html):
         """Extract result IDs and basic info from list page"""
-        soup = BeautifulSoup(html, 'html.parser')
+        soup = self.make_soup(html, parse_only=LIST_TABLE_STRAINER)
         table = soup.find('table')
 
         if not table:
@@ -58,7 +192,7 @@ class GradCafeScraper:
             # Look for the main data row (has 5 cells with "See More" link)
             if len(cells) == 5:
                 # This is a main data row
-                see_more_link = cells[-1].find('a', href=re.compile(r'^/result/\d+$'))
+                see_more_link = cells[-1].find('a', href=RESULT_HREF_RE)
 
                 if see_more_link:
                     # Create ApplicantData object
@@ -105,8 +239,7 @@ class GradCafeScraper:
                                         continue
 
                                     # Parse semester/year
-                                    semester_match = re.search(r'(Fall|Spring|Summer)\s+(\d{4})',
-                                                               badge_text)
+                                    semester_match = SEMESTER_RE.search(badge_text)
                                     if semester_match:
                                         applicant.semester_year_start = \
                                             f"{semester_match.group(1)} {semester_match.group(2)}"
@@ -118,7 +251,7 @@ class GradCafeScraper:
                                         continue
 
                                     # Parse GPA
-                                    gpa_match = re.search(r'GPA\s+(\d+\.?\d*)', badge_text)
+                                    gpa_match = GPA_RE.search(badge_text)
                                     if gpa_match:
                                         applicant.gpa = gpa_match.group(1)
                                         continue
@@ -134,7 +267,7 @@ class GradCafeScraper:
 
     def parse_detail_page(self, html, applicant):
         """Extract detailed info from individual result page"""
-        soup = BeautifulSoup(html, 'html.parser')
+        soup = self.make_soup(html)
 
         try:
             # Extract Notes/Comments
@@ -146,26 +279,17 @@ class GradCafeScraper:
                     if notes_text and len(notes_text) > 5:
                         applicant.comments = notes_text
 
-            def parse_numeric_value(text):
-                match = re.search(r"\d+(\.\d+)?", text)
-                if not match:
-                    return None
-                try:
-                    return float(match.group(0))
-                except ValueError:
-                    return None
-
             # Extract GRE scores using the list item structure
-            gre_items = soup.find_all("li", class_=re.compile(r"tw-flex"))
+            gre_items = GRE_ITEM_SELECTOR.select(soup)
             for item in gre_items:
-                label_span = item.find("span", class_=re.compile(r"tw-font-medium"))
-                value_span = item.find("span", class_=re.compile(r"tw-text-gray-400"))
+                label_span = GRE_LABEL_SELECTOR.select_one(item)
+                value_span = GRE_VALUE_SELECTOR.select_one(item)
                 if not label_span or not value_span:
                     continue
 
                 label_text = label_span.get_text(strip=True)
                 value_text = value_span.get_text(strip=True)
-                numeric_value = parse_numeric_value(value_text)
+                numeric_value = _parse_numeric_value(value_text)
                 if numeric_value is None or numeric_value <= 0:
                     continue
 
@@ -181,16 +305,13 @@ class GradCafeScraper:
             # Extract notification date (if not already set)
             if not applicant.decision_date:
                 page_text = soup.get_text()
-                notification_match = re.search(r'Notification\s+on[:\s]+(\d{1,2}/\d{1,2}/\d{4})',
-                                               page_text,
-                                               re.IGNORECASE)
+                notification_match = NOTIFICATION_RE.search(page_text)
                 if notification_match:
                     applicant.decision_date = notification_match.group(1)
 
             # Extract student type (Degree's Country of Origin) if not already set
             if not applicant.citizenship:
-                origin_dt = soup.find("dt", string=re.compile(r"Degree'?s\s+Country\s+of\s+Origin",
-                                                              re.IGNORECASE))
+                origin_dt = soup.find("dt", string=COUNTRY_OF_ORIGIN_RE)
                 if origin_dt:
                     origin_dd = origin_dt.find_next_sibling("dd")
                     if origin_dd:
@@ -207,76 +328,86 @@ class GradCafeScraper:
         """Parse status, dates, semester, student type from status text"""
 
         # Extract status and status date
-        status_patterns = [
-            (r'Accepted\s+on\s+(.+?)(?=Fall|Spring|Summer|American|International|GPA|$)',
-             'Accepted'),
-            (r'Rejected\s+on\s+(.+?)(?=Fall|Spring|Summer|American|International|GPA|$)',
-             'Rejected'),
-            (r'Interview\s+on\s+(.+?)(?=Fall|Spring|Summer|American|International|GPA|$)',
-             'Interview'),
-            (r'Wait\s*listed\s+on\s+(.+?)(?=Fall|Spring|Summer|American|International|GPA|$)',
-             'Wait listed'),
-        ]
-
-        for pattern, status_value in status_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                applicant.status = status_value
-                applicant.decision_date = match.group(1).strip()
-                break
+        status_match = STATUS_RE.search(text)
+        if status_match:
+            status_key = WHITESPACE_RE.sub('', status_match.group('status')).lower()
+            applicant.status = STATUS_VALUES[status_key]
+            applicant.decision_date = status_match.group('date').strip()
 
         # Extract semester and year
-        semester_match = re.search(r'(Fall|Spring|Summer)\s+(\d{4})', text)
+        semester_match = SEMESTER_RE.search(text)
         if semester_match:
             applicant.semester_year_start = f"{semester_match.group(1)} {semester_match.group(2)}"
 
         # Extract student type
-        if re.search(r'\bAmerican\b', text):
+        if AMERICAN_RE.search(text):
             applicant.citizenship = 'American'
-        elif re.search(r'\bInternational\b', text):
+        elif INTERNATIONAL_RE.search(text):
             applicant.citizenship = 'International'
 
         # Extract GPA from status text
-        gpa_match = re.search(r'GPA\s+(\d+\.?\d*)', text)
+        gpa_match = GPA_RE.search(text)
         if gpa_match:
             applicant.gpa = gpa_match.group(1)
 
+    def _is_known(self, applicant):
+        """Return True when the applicant's result ID is already stored"""
+        try:
+            return int(applicant.result_id) in self.known_result_ids
+        except (TypeError, ValueError):
+            return False
+
     # ==================== Data Persistence ====================
 
     def save_data(self, applicant_list):
-        """Append applicant data to JSON file"""
+        """Append applicant records to the JSONL data file"""
         try:
-            # Read existing data
-            try:
-                with open(self.data_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-            except FileNotFoundError:
-                data = []
+            if self.writer is None:
+                self.writer = JsonlWriter(self.data_file, fsync_every=config.FSYNC_EVERY_N_PAGES)
+            saved = self.writer.write_records(applicant.to_dict() for applicant in applicant_list)
+            print(f"Saved {saved} records. Total: {self.writer.records_written}")
 
-            # Append new records
-            for applicant in applicant_list:
-                data.append(applicant.to_dict())
-
-            # Write back to file
-            with open(self.data_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-
-            print(f"Saved {len(applicant_list)} records. Total: {len(data)}")
-
-        except Exception as e:
+        except (OSError, TypeError, ValueError) as e:
             print(f"Error saving data: {e}")
 
     # ==================== Main Scraping Method ====================
 
-    def scrape_page(self, page_num):
-        """Scrape a single page (list + all detail pages)"""
+    def fetch_details(self, applicants, on_parsed=None):
+        """Fetch all detail pages concurrently and parse them in list order.
+        on_parsed, if given, is called with each applicant whose detail page was parsed.
+        Each detail page is cached with its list-row fields so it can be reparsed alone."""
+        urls = [applicant.url for applicant in applicants]
+        list_rows = [applicant.to_dict() for applicant in applicants]
+        with ThreadPoolExecutor(max_workers=self.detail_workers) as executor:
+            detail_pages = executor.map(lambda url, row: self.fetch_page(url, meta=row),
+                                        urls, list_rows)
+            for i, (applicant, detail_html) in enumerate(zip(applicants, detail_pages), 1):
+                print(f"    [{i}/{len(applicants)}] Fetching details for result "
+                      f"{applicant.result_id}...", end=' ')
+                if detail_html:
+                    self.parse_detail_page(detail_html, applicant)
+                    if on_parsed is not None:
+                        on_parsed(applicant)
+                    print("Success")
+                else:
+                    print("Failed")
+
+    def scrape_page(self, page_num, resume_state=None):
+        """Scrape a single page (list + all detail pages).
+        resume_state is the checkpoint of an interrupted attempt at this page; its
+        saved list HTML is reused, records of detail pages it already parsed are
+        restored, and only its pending detail URLs are fetched. Each parsed detail
+        page is recorded in the checkpoint as soon as it finishes."""
         print(f"{'=' * 60}")
         print(f"Scraping page {page_num}")
         print(f"{'=' * 60}")
 
-        # Fetch list page
-        list_url = self.list_url_template.format(page_num)
-        html = self.fetch_page(list_url)
+        # Fetch list page (or reuse the copy saved in the checkpoint)
+        if resume_state:
+            print(f"Resuming page {page_num} from checkpoint")
+            html = resume_state["list_html"]
+        else:
+            html = self.fetch_page(self.list_url_template.format(page_num))
         if not html:
             print(f"Failed to fetch page {page_num}")
             return []
@@ -288,44 +419,124 @@ class GradCafeScraper:
         if not applicants:
             return []
 
-        # Fetch detail pages
-        for i, applicant in enumerate(applicants, 1):
-            print(f"    [{i}/{len(applicants)}] Fetching details for result \
-                    {applicant.result_id}...", end=' ')
-
-            detail_html = self.fetch_page(applicant.url)
-            if detail_html:
-                self.parse_detail_page(detail_html, applicant)
-                print("Success")
-            else:
-                print("Failed")
+        # In incremental mode, skip results that are already stored
+        if self.known_result_ids is not None:
+            new_applicants = [a for a in applicants if not self._is_known(a)]
+            if not new_applicants:
+                print(f"All results on page {page_num} are already stored")
+                self.caught_up = True
+                return []
+            applicants = new_applicants
+
+        to_fetch = applicants
+        done_records = {}
+        if resume_state:
+            pending = set(resume_state["pending_urls"])
+            done_records = resume_state.get("done_records") or {}
+            applicants = [
+                ApplicantData.from_dict(done_records[a.url]) if a.url in done_records else a
+                for a in applicants
+                if a.url in pending or a.url in done_records
+            ]
+            to_fetch = [a for a in applicants if a.url in pending]
+
+        self.checkpoint.start_page(page_num, html, [a.url for a in to_fetch], done_records)
+        self.fetch_details(
+            to_fetch,
+            on_parsed=lambda a: self.checkpoint.detail_done(a.url, a.to_dict()),
+        )
 
         return applicants
 
-    def pull_data(self, max_seconds=10):
+    def _load_checkpoint(self):
+        """Return the saved pull state, or None (with a notice) to start fresh"""
+        state = self.checkpoint.load()
+        if state is None:
+            print("No checkpoint found. Starting a fresh pull.")
+        return state
+
+    def _load_known_result_ids(self):
+        """Read the stored result IDs that an incremental pull skips"""
+        self.known_result_ids = load_data.fetch_known_result_ids()
+        print(f"Incremental pull: {len(self.known_result_ids)} results stored, "
+              f"high-water mark {max(self.known_result_ids, default=0)}")
+
+    @staticmethod
+    def _start_pipeline(llm_script_path, truncate):
+        """Build the page pipeline, or return None to pull in batch mode.
+        With the database down, pages are scraped to the data file now and
+        cleaned and loaded afterwards."""
+        try:
+            return pipeline.build_pull_pipeline(
+                llm_script_path, config.APPLICANT_DATA_JSON_FILE, truncate=truncate)
+        except psycopg.Error as e:
+            print(f"Database unavailable, falling back to a batch pull: {e}")
+            return None
+
+    def pull_data(self, max_seconds=10, incremental=False, resume=False, pipelined=False):
         """Scrape list pages starting from page 1 for up to max_seconds.
-        Once pull is complete, run clean_data.py to clean and save data to JSON file."""
+        Each page is appended to the JSONL data file as it is scraped. With
+        incremental=True, results already in the database are skipped and paging
+        stops at the first page that has no new results. With resume=True, the
+        pull continues after the last page recorded in the checkpoint file and
+        keeps the existing data file. Once pull is complete, run clean_data.py
+        to clean and save data to JSON file. With pipelined=True, each page is
+        instead standardized and loaded into the database on background threads
+        while the next page is being scraped; if the database cannot be reached,
+        the pull falls back to the batch steps."""
         start_time = time.time()
-        page_num = 1
+        state = self._load_checkpoint() if resume else None
+        page_num = state["last_completed_page"] + 1 if state else 1
+        interrupted_page = state.get("in_progress") if state else None
         total_records = 0
-        with open(self.data_file, 'w', encoding='utf-8') as f:
-            json.dump([], f)
+        self.caught_up = False
+        if incremental:
+            self._load_known_result_ids()
+        llm_script_path = os.path.join(os.path.dirname(__file__), "../llm_hosting", "app.py")
+        page_pipeline = None
+        if pipelined:
+            page_pipeline = self._start_pipeline(llm_script_path, truncate=state is None)
+        self.writer = JsonlWriter(self.data_file, fsync_every=config.FSYNC_EVERY_N_PAGES,
+                                  truncate=state is None)
+        if state is None:
+            self.checkpoint.complete_page(0)
 
-        while time.time() - start_time < max_seconds:
-            applicants = self.scrape_page(page_num)
-            if not applicants:
-                print(f"No results found on page {page_num}. Continuing.")
-                page_num += 1
-                continue
+        try:
+            while time.time() - start_time < max_seconds:
+                resume_state = None
+                if interrupted_page and interrupted_page["page"] == page_num:
+                    resume_state = interrupted_page
+                interrupted_page = None
+
+                applicants = self.scrape_page(page_num, resume_state)
+                if self.caught_up:
+                    break
+                if not applicants:
+                    print(f"No results found on page {page_num}. Continuing.")
+                    self.checkpoint.complete_page(page_num)
+                    page_num += 1
+                    continue
 
-            self.save_data(applicants)
-            total_records += len(applicants)
-            page_num += 1
+                self.save_data(applicants)
+                self.checkpoint.complete_page(page_num)
+                total_records += len(applicants)
+                page_num += 1
+                if page_pipeline is not None:
+                    if page_pipeline.failed:
+                        print("Pipeline stage failed; stopping the scrape.")
+                        break
+                    page_pipeline.submit([applicant.to_dict() for applicant in applicants])
+        finally:
+            self.writer.close()
+            self.writer = None
+            if page_pipeline is not None:
+                self._close_pipeline(page_pipeline)
 
         elapsed = time.time() - start_time
         print(f"Pull complete. Pages scraped: {page_num - 1},"
               f"records saved: {total_records}, time: {elapsed:.1f}s")
-        llm_script_path = os.path.join(os.path.dirname(__file__), "../llm_hosting", "app.py")
+        if page_pipeline is not None:
+            return
         clean_data(
             input_file=self.data_file,
             llm_script_path=llm_script_path,
@@ -334,5 +545,67 @@ class GradCafeScraper:
         load_data.main()
 
 
+    @staticmethod
+    def _close_pipeline(page_pipeline):
+        """Drain the pipeline and report a failed stage without masking other errors"""
+        try:
+            page_pipeline.close()
+        except Exception as e:
+            print(f"Pipeline error: {e}")
+        else:
+            print(f"Pipeline loaded {page_pipeline.pages_loaded} pages into the database")
+
+    def reparse_cache(self):
+        """Rebuild the data file from cached HTML with no network calls.
+        Every cached detail page carries the list-row fields it was fetched with,
+        so each record is rebuilt from its own entry. Records are written newest
+        result first, as the list pages order them."""
+        if not self.cache:
+            print("HTML cache is disabled; nothing to reparse")
+            return 0
+
+        applicants = []
+        for _url, html, list_row in self.cache.items():
+            if list_row is None:
+                continue
+            applicant = ApplicantData.from_dict(list_row)
+            self.parse_detail_page(html, applicant)
+            applicants.append(applicant)
+        applicants.sort(key=lambda applicant: int(applicant.result_id), reverse=True)
+
+        self.writer = JsonlWriter(self.data_file, fsync_every=config.FSYNC_EVERY_N_PAGES,
+                                  truncate=True)
+        try:
+            if applicants:
+                self.save_data(applicants)
+        finally:
+            self.writer.close()
+            self.writer = None
+
+        print(f"Reparse complete. Records: {len(applicants)}")
+        return len(applicants)
+
+
+def main(argv=None):
+    """Command-line entry point used by the Flask Pull Data button"""
+    parser = argparse.ArgumentParser(description="Scrape applicant data from The Grad Cafe.")
+    parser.add_argument("--max-seconds", type=float, default=10,
+                        help="Time budget for scraping list pages.")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Skip stored results and stop at the first page with none new.")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue from the checkpoint file instead of page 1.")
+    parser.add_argument("--reparse", action="store_true",
+                        help="Rebuild the data file from cached HTML only (no network).")
+    parser.add_argument("--pipeline", action="store_true",
+                        help="Standardize and load each page while scraping continues.")
+    args = parser.parse_args(argv)
+    if args.reparse:
+        GradCafeScraper(use_cache=True).reparse_cache()
+        return
+    GradCafeScraper().pull_data(max_seconds=args.max_seconds, incremental=args.incremental,
+                                resume=args.resume, pipelined=args.pipeline)
+
+
 if __name__ == "__main__":
-    GradCafeScraper().pull_data()
+    main()
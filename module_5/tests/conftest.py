@@ -10,12 +10,43 @@ PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 SRC_ROOT = os.path.join(PROJECT_ROOT, "src")
 if SRC_ROOT not in sys.path:
     sys.path.insert(0, SRC_ROOT)
+# The LLM standardizer is appended so llm_hosting/app.py never shadows src/app.
+LLM_HOSTING_ROOT = os.path.join(PROJECT_ROOT, "llm_hosting")
+if LLM_HOSTING_ROOT not in sys.path:
+    sys.path.append(LLM_HOSTING_ROOT)
 
 
 import app as app_module
+import config
+import standardizer
 from app import create_app
 
 
+# Keep every file the pipeline writes out of the working tree.
+@pytest.fixture(autouse=True)
+def isolated_state(tmp_path, monkeypatch):
+    # Point checkpoints, load progress and both caches at per-test temporary paths.
+    paths = SimpleNamespace(
+        checkpoint=tmp_path / "scrape_checkpoint.json",
+        load_progress=tmp_path / "load_progress.json",
+        html_cache=tmp_path / "html_cache",
+        standardize_cache=tmp_path / "standardize_cache.sqlite3",
+    )
+    monkeypatch.setattr(config, "CHECKPOINT_FILE", str(paths.checkpoint))
+    monkeypatch.setattr(config, "LOAD_PROGRESS_FILE", str(paths.load_progress))
+    monkeypatch.setattr(config, "HTML_CACHE_DIR", str(paths.html_cache))
+    monkeypatch.setattr(standardizer, "CACHE_PATH", str(paths.standardize_cache))
+    monkeypatch.setattr(standardizer, "_CACHE", None)
+    # Model stand-ins in tests do not implement llama.cpp state save/restore.
+    monkeypatch.setattr(standardizer, "PROMPT_PREFIX_CACHE", False)
+    monkeypatch.setattr(standardizer, "_PREFIX_STATES", {})
+    monkeypatch.setattr(standardizer, "_LAST_SHAPE", None)
+    monkeypatch.setattr(standardizer, "_PATH_COUNTS", {"rules": 0, "cache": 0, "model": 0})
+    yield paths
+    if standardizer._CACHE is not None:
+        standardizer._CACHE.close()
+
+
 # Factory fixture to build a client for /analysis with stubbed DB rows.
 @pytest.fixture
 def analysis_client():
@@ -12,6 +12,37 @@ class BusyProcess:
         return None
 
 
+class DoneProcess:
+    def poll(self):
+        # Indicate the fake process has exited.
+        return 0
+
+    def terminate(self):
+        # An exited process must not be terminated again.
+        raise AssertionError("terminated an exited process")
+
+
+def _install_fake_popen(monkeypatch):
+    # Record every Popen call; the standardizer server stays up, pulls finish at once.
+    calls = []
+    registered = []
+
+    def fake_popen(args, cwd, env):
+        # Record the arguments of the started process.
+        calls.append({"args": args, "cwd": cwd, "env": env})
+        return BusyProcess() if args[-1] == "--serve" else DoneProcess()
+
+    _set_pull_process(monkeypatch, None)
+    monkeypatch.setattr(app_module, "_standardizer_state", {"process": None})
+    monkeypatch.setattr(app_module.config, "STANDARDIZER_URL", None)
+    monkeypatch.setattr(app_module.config, "STANDARDIZER_AUTOSTART", True)
+    monkeypatch.setattr(app_module.config, "STANDARDIZER_PORT", 8123)
+    monkeypatch.delenv("STANDARDIZER_URL", raising=False)
+    monkeypatch.setattr(app_module.subprocess, "Popen", fake_popen)
+    monkeypatch.setattr(app_module.atexit, "register", registered.append)
+    return calls, registered
+
+
 def _set_pull_process(monkeypatch, process):
     # Replace the module-level pull state for a clean test setup.
     monkeypatch.setattr(app_module, "_pull_state", {"process": process})
@@ -106,20 +137,69 @@ def test_pull_status_reflects_running_process(monkeypatch):
 
 @pytest.mark.buttons
 def test_pull_data_uses_default_start(monkeypatch, post_request):
-    # Default start path should use subprocess.Popen when no DI hook is provided.
-    started = {}
-
-    def fake_popen(args, cwd):
-        # Record the default args used to start the scraper.
-        started["args"] = args
-        started["cwd"] = cwd
-        return BusyProcess()
-
-    _set_pull_process(monkeypatch, None)
-    monkeypatch.setattr(app_module.subprocess, "Popen", fake_popen)
+    # The default start runs the scraper against a standardizer server the app owns.
+    calls, registered = _install_fake_popen(monkeypatch)
 
     response = post_request("/pull-data")
 
     assert response.status_code == 200
     assert response.get_json() == {"ok": True}
-    assert started["args"][0] == sys.executable
+    server, scrape = calls
+    assert server["args"][0] == sys.executable
+    assert server["args"][-2:] == [os.path.join(server["cwd"], "app.py"), "--serve"]
+    assert server["env"]["PORT"] == "8123"
+    assert scrape["args"][0] == sys.executable
+    assert scrape["args"][-2:] == ["--incremental", "--pipeline"]
+    assert scrape["env"]["STANDARDIZER_URL"] == "http://127.0.0.1:8123"
+    assert registered == [app_module._stop_standardizer_server]
+
+
+@pytest.mark.buttons
+def test_standardizer_server_is_reused_and_restarted_if_it_exits(monkeypatch, post_request):
+    # Later pulls reuse the running server; one that exited is started again.
+    calls, registered = _install_fake_popen(monkeypatch)
+
+    post_request("/pull-data")
+    app_module._pull_state["process"] = DoneProcess()
+    post_request("/pull-data")
+    app_module._standardizer_state["process"] = DoneProcess()
+    app_module._pull_state["process"] = DoneProcess()
+    post_request("/pull-data")
+
+    assert [call["args"][-1] for call in calls] == [
+        "--serve", "--pipeline", "--pipeline", "--serve", "--pipeline"]
+    assert len(registered) == 1
+
+
+@pytest.mark.buttons
+@pytest.mark.parametrize("url,autostart,expected", [
+    ("http://llm.example:9000", True, "http://llm.example:9000"),
+    (None, False, None),
+])
+def test_configured_or_disabled_standardizer_starts_no_server(
+        monkeypatch, post_request, url, autostart, expected):
+    # An explicit STANDARDIZER_URL is passed through; with autostart off none is set.
+    calls, _registered = _install_fake_popen(monkeypatch)
+    monkeypatch.setattr(app_module.config, "STANDARDIZER_URL", url)
+    monkeypatch.setattr(app_module.config, "STANDARDIZER_AUTOSTART", autostart)
+
+    post_request("/pull-data")
+
+    (scrape,) = calls
+    assert scrape["env"].get("STANDARDIZER_URL") == expected
+
+
+@pytest.mark.buttons
+def test_stop_standardizer_server_terminates_only_a_running_server(monkeypatch):
+    # Shutting down the app terminates its server if it is still running.
+    server = BusyProcess()
+    server.terminate = lambda: setattr(server, "terminated", True)
+    monkeypatch.setattr(app_module, "_standardizer_state", {"process": server})
+
+    app_module._stop_standardizer_server()
+    monkeypatch.setattr(app_module, "_standardizer_state", {"process": DoneProcess()})
+    app_module._stop_standardizer_server()
+    monkeypatch.setattr(app_module, "_standardizer_state", {"process": None})
+    app_module._stop_standardizer_server()
+
+    assert server.terminated is True
\ No newline at end of file
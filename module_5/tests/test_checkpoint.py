@@ -0,0 +1,81 @@
+import json
+
+import pytest
+
+import checkpoint
+
+
+@pytest.mark.db
+def test_checkpoint_round_trip(tmp_path):
+    # Saved state should load back unchanged, with no temp files left behind.
+    store = checkpoint.ScrapeCheckpoint(str(tmp_path / "cp.json"))
+
+    assert store.load() is None
+    store.start_page(3, "<html>é</html>", ["u1", "u2"])
+    store.detail_done("u1", {"result_id": "1"})
+    assert store.load() == {
+        "last_completed_page": 2,
+        "in_progress": {"page": 3, "list_html": "<html>é</html>", "pending_urls": ["u2"],
+                        "done_records": {"u1": {"result_id": "1"}}},
+    }
+    store.complete_page(3)
+    assert store.load() == {"last_completed_page": 3, "in_progress": None}
+    assert [p.name for p in tmp_path.iterdir()] == ["cp.json"]
+
+
+@pytest.mark.db
+def test_checkpoint_detail_log_skips_other_pages_and_torn_lines(tmp_path):
+    # Details are appended, not rewritten; stale pages and a cut-off last line are ignored.
+    path = tmp_path / "cp.json"
+    store = checkpoint.ScrapeCheckpoint(str(path))
+    store.start_page(3, "<html></html>", ["u1", "u2", "u3"])
+    saved = path.read_text(encoding="utf-8")
+    store.detail_done("u1", {"result_id": "1"})
+    with open(store.details_path, "a", encoding="utf-8") as f:
+        f.write(json.dumps({"page": 2, "url": "u2", "record": {}}) + "\n")
+        f.write('{"page": 3, "url": "u3", "rec')
+
+    assert path.read_text(encoding="utf-8") == saved
+    assert store.load()["in_progress"]["pending_urls"] == ["u2", "u3"]
+    assert list(store.load()["in_progress"]["done_records"]) == ["u1"]
+
+
+@pytest.mark.db
+def test_checkpoint_ignores_corrupt_file(tmp_path, capsys):
+    # A truncated checkpoint should be reported and treated as missing.
+    path = tmp_path / "cp.json"
+    path.write_text('{"last_completed', encoding="utf-8")
+
+    assert checkpoint.ScrapeCheckpoint(str(path)).load() is None
+    assert "Ignoring unreadable checkpoint" in capsys.readouterr().out
+
+
+@pytest.mark.db
+def test_checkpoint_save_failure_keeps_previous_state(tmp_path, monkeypatch):
+    # A failed write must leave the old checkpoint intact and clean up the temp file.
+    path = tmp_path / "cp.json"
+    path.write_text(json.dumps({"last_completed_page": 1, "in_progress": None}), encoding="utf-8")
+    store = checkpoint.ScrapeCheckpoint(str(path))
+
+    def _boom(_fd):
+        # Simulate the disk failing during fsync.
+        raise OSError("disk full")
+
+    monkeypatch.setattr(checkpoint.os, "fsync", _boom)
+
+    with pytest.raises(OSError):
+        store.complete_page(2)
+    assert store.load() == {"last_completed_page": 1, "in_progress": None}
+    assert [p.name for p in tmp_path.iterdir()] == ["cp.json"]
+
+
+@pytest.mark.db
+def test_checkpoint_clear_is_idempotent(tmp_path):
+    # Clearing removes the file, and clearing again is a no-op.
+    store = checkpoint.LoadProgress(str(tmp_path / "progress.json"))
+    store.save({"offset": 1})
+
+    store.clear()
+    store.clear()
+
+    assert store.load() is None
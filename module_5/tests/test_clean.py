@@ -1,10 +1,13 @@
 from types import SimpleNamespace
+import json
+import os
 import runpy
-import subprocess
+import sys
 
 import config
 
 import pytest
+from urllib3.exceptions import HTTPError
 
 import clean
 
@@ -20,6 +23,17 @@ def test_load_data_reads_json(tmp_path):
     assert data == [{"key": "value"}]
 
 
+@pytest.mark.db
+def test_load_data_reads_jsonl(tmp_path):
+    # JSON Lines files should load one record per non-blank line.
+    data_path = tmp_path / "data.json"
+    data_path.write_text('{"key": 1}\n\n{"key": 2}\n', encoding="utf-8")
+
+    data = clean.load_data(str(data_path))
+
+    assert data == [{"key": 1}, {"key": 2}]
+
+
 @pytest.mark.db
 def test_load_data_uses_default_path(tmp_path, monkeypatch):
     # Default file path should be taken from config.DATA_FILE.
@@ -53,22 +67,54 @@ def test_load_data_invalid_json_returns_empty_list(tmp_path):
     assert data == []
 
 
-@pytest.mark.db
-def test_clean_data_missing_input_returns_false(tmp_path, monkeypatch):
-    # Missing input should short-circuit without invoking subprocess.
-    missing_input = tmp_path / "missing.json"
+class FakeStandardizer:
+    # Record chunks and closes instead of running the LLM.
+    def __init__(self, error=None):
+        self.chunks = []
+        self.closed = False
+        self.error = error
+
+    def standardize(self, rows):
+        # Tag each row like the real standardizer would.
+        if self.error:
+            raise self.error
+        self.chunks.append(len(rows))
+        return [dict(row, **{"llm-generated-program": "P"}) for row in rows]
+
+    def close(self):
+        # Remember that the standardizer was released.
+        self.closed = True
+
+
+def _install_fake_standardizer(monkeypatch, fake):
+    # Route clean_data to a fake standardizer and record the directory it asked for.
+    requested = {}
+
+    def _get(llm_hosting_dir=None):
+        # Return the shared fake.
+        requested["dir"] = llm_hosting_dir
+        return fake
+
+    monkeypatch.setattr(clean, "get_standardizer", _get)
+    return requested
+
+
+def _stub_script(tmp_path):
+    # Create a placeholder app.py so the existence check passes.
     llm_script = tmp_path / "llm.py"
     llm_script.write_text("# stub", encoding="utf-8")
+    return llm_script
 
-    def fail_run(*_args, **_kwargs):
-        # Guard against unexpected subprocess execution.
-        raise AssertionError("subprocess.run should not be called")
 
-    monkeypatch.setattr(clean.subprocess, "run", fail_run)
+@pytest.mark.db
+def test_clean_data_missing_input_returns_false(tmp_path, monkeypatch):
+    # Missing input should short-circuit without loading the standardizer.
+    monkeypatch.setattr(clean, "get_standardizer",
+                        lambda *_a: pytest.fail("standardizer should not load"))
 
     result = clean.clean_data(
-        input_file=str(missing_input),
-        llm_script_path=str(llm_script),
+        input_file=str(tmp_path / "missing.json"),
+        llm_script_path=str(_stub_script(tmp_path)),
         output_file=str(tmp_path / "out.jsonl"),
     )
 
@@ -77,20 +123,15 @@ def test_clean_data_missing_input_returns_false(tmp_path, monkeypatch):
 
 @pytest.mark.db
 def test_clean_data_missing_llm_script_returns_false(tmp_path, monkeypatch):
-    # Missing LLM script should short-circuit without invoking subprocess.
+    # Missing LLM script should short-circuit without loading the standardizer.
     input_path = tmp_path / "input.json"
     input_path.write_text("[]", encoding="utf-8")
-    missing_script = tmp_path / "missing_llm.py"
-
-    def fail_run(*_args, **_kwargs):
-        # Guard against unexpected subprocess execution.
-        raise AssertionError("subprocess.run should not be called")
-
-    monkeypatch.setattr(clean.subprocess, "run", fail_run)
+    monkeypatch.setattr(clean, "get_standardizer",
+                        lambda *_a: pytest.fail("standardizer should not load"))
 
     result = clean.clean_data(
         input_file=str(input_path),
-        llm_script_path=str(missing_script),
+        llm_script_path=str(tmp_path / "missing_llm.py"),
         output_file=str(tmp_path / "out.jsonl"),
     )
 
@@ -101,118 +142,74 @@ def test_clean_data_missing_llm_script_returns_false(tmp_path, monkeypatch):
 def test_clean_data_uses_default_paths(tmp_path, monkeypatch):
     # Default input/output paths should come from config.
     input_path = tmp_path / "input.json"
-    input_path.write_text("[]", encoding="utf-8")
+    input_path.write_text('{"program": "a"}\n', encoding="utf-8")
     output_path = tmp_path / "out.jsonl"
-    llm_script = tmp_path / "llm.py"
-    llm_script.write_text("# stub", encoding="utf-8")
-
     monkeypatch.setattr(config, "DATA_FILE", str(input_path))
     monkeypatch.setattr(config, "APPLICANT_DATA_JSON_FILE", str(output_path))
+    fake = FakeStandardizer()
+    requested = _install_fake_standardizer(monkeypatch, fake)
 
-    calls = {}
-
-    def fake_run(args, capture_output, text, check):
-        # Capture subprocess arguments without executing the script.
-        calls["args"] = args
-        return SimpleNamespace(stdout="")
-
-    monkeypatch.setattr(clean.subprocess, "run", fake_run)
-
-    result = clean.clean_data(llm_script_path=str(llm_script))
+    result = clean.clean_data(llm_script_path=str(_stub_script(tmp_path)))
 
     assert result is True
-    assert calls["args"] == [
-        "python",
-        str(llm_script),
-        "--file",
-        str(input_path),
-        "--out",
-        str(output_path),
-    ]
+    assert requested["dir"] == str(tmp_path)
+    assert json.loads(output_path.read_text(encoding="utf-8")) == {
+        "program": "a", "llm-generated-program": "P"}
 
 
 @pytest.mark.db
-def test_clean_data_runs_subprocess_success(tmp_path, monkeypatch):
-    # Successful subprocess execution should return True.
+def test_clean_data_streams_rows_in_chunks(tmp_path, monkeypatch):
+    # Rows should be standardized chunk by chunk and written in input order.
     input_path = tmp_path / "input.json"
-    input_path.write_text("[]", encoding="utf-8")
-    llm_script = tmp_path / "llm.py"
-    llm_script.write_text("# stub", encoding="utf-8")
+    input_path.write_text("".join(f'{{"id": {i}}}\n' for i in range(5)), encoding="utf-8")
     output_path = tmp_path / "out.jsonl"
-
-    calls = {}
-
-    def fake_run(args, capture_output, text, check):
-        # Capture subprocess arguments without executing the script.
-        calls["args"] = args
-        calls["capture_output"] = capture_output
-        calls["text"] = text
-        calls["check"] = check
-        return SimpleNamespace(stdout="ok")
-
-    monkeypatch.setattr(clean.subprocess, "run", fake_run)
+    output_path.write_text('{"stale": true}\n', encoding="utf-8")
+    monkeypatch.setattr(config, "STANDARDIZE_CHUNK_ROWS", 2)
+    fake = FakeStandardizer()
+    _install_fake_standardizer(monkeypatch, fake)
 
     result = clean.clean_data(
         input_file=str(input_path),
-        llm_script_path=str(llm_script),
+        llm_script_path=str(_stub_script(tmp_path)),
         output_file=str(output_path),
     )
 
     assert result is True
-    assert calls["args"] == [
-        "python",
-        str(llm_script),
-        "--file",
-        str(input_path),
-        "--out",
-        str(output_path),
-    ]
-    assert calls["capture_output"] is True
-    assert calls["text"] is True
-    assert calls["check"] is True
-
-
-@pytest.mark.db
-def test_clean_data_subprocess_failure_returns_false(tmp_path, monkeypatch):
-    # Subprocess failures should return False.
-    input_path = tmp_path / "input.json"
-    input_path.write_text("[]", encoding="utf-8")
-    llm_script = tmp_path / "llm.py"
-    llm_script.write_text("# stub", encoding="utf-8")
+    assert fake.chunks == [2, 2, 1]
+    assert fake.closed is True
+    lines = output_path.read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["id"] for line in lines] == [0, 1, 2, 3, 4]
 
-    def fail_run(*_args, **_kwargs):
-        # Simulate a subprocess failure.
-        raise subprocess.CalledProcessError(1, ["python", "llm.py"], stderr="boom")
 
-    monkeypatch.setattr(clean.subprocess, "run", fail_run)
+@pytest.mark.db
+def test_clean_data_standardizer_failure_returns_false(tmp_path, monkeypatch):
+    # Standardizer errors should return False and still release the standardizer.
+    input_path = tmp_path / "input.json"
+    input_path.write_text('{"program": "a"}\n', encoding="utf-8")
+    fake = FakeStandardizer(error=RuntimeError("model failed"))
+    _install_fake_standardizer(monkeypatch, fake)
 
     result = clean.clean_data(
         input_file=str(input_path),
-        llm_script_path=str(llm_script),
+        llm_script_path=str(_stub_script(tmp_path)),
         output_file=str(tmp_path / "out.jsonl"),
     )
 
     assert result is False
+    assert fake.closed is True
 
 
 @pytest.mark.db
 def test_clean_data_unexpected_exception_returns_false(tmp_path, monkeypatch):
-    # Generic exceptions should return False.
+    # I/O errors from the output file should return False.
     input_path = tmp_path / "input.json"
-    input_path.write_text("[]", encoding="utf-8")
-    llm_script = tmp_path / "llm.py"
-    llm_script.write_text("# stub", encoding="utf-8")
-
-    def fail_run(*_args, **_kwargs):
-        # Simulate an unexpected exception.
-        raise OSError("boom")
-
-    monkeypatch.setattr(clean.subprocess, "run", fail_run)
+    input_path.write_text('{"program": "a"}\n', encoding="utf-8")
+    _install_fake_standardizer(monkeypatch, FakeStandardizer())
 
     result = clean.clean_data(
         input_file=str(input_path),
-        llm_script_path=str(llm_script),
-        output_file=str(tmp_path / "out.jsonl"),
+        llm_script_path=str(_stub_script(tmp_path)),
+        output_file=str(tmp_path / "missing_dir" / "out.jsonl"),
     )
 
     assert result is False
@@ -220,15 +217,14 @@ def test_clean_data_unexpected_exception_returns_false(tmp_path, monkeypatch):
 
 @pytest.mark.db
 def test_clean_module_main_runs(monkeypatch, tmp_path):
-    # Execute the __main__ block without running external scripts.
+    # Execute the __main__ block with a stand-in standardizer module.
     data_path = tmp_path / "data.json"
-    data_path.write_text("[1]", encoding="utf-8")
+    data_path.write_text('[{"program": "a"}]', encoding="utf-8")
+    output_path = tmp_path / "out.jsonl"
     monkeypatch.setattr(config, "DATA_FILE", str(data_path))
-    monkeypatch.setattr(config, "APPLICANT_DATA_JSON_FILE", str(tmp_path / "out.jsonl"))
-
-    def fake_run(*_args, **_kwargs):
-        # Stub subprocess execution during main.
-        return SimpleNamespace(stdout="")
+    monkeypatch.setattr(config, "APPLICANT_DATA_JSON_FILE", str(output_path))
+    monkeypatch.setitem(sys.modules, "standardizer",
+                        SimpleNamespace(standardize_rows=lambda rows: rows))
 
     real_exists = clean.os.path.exists
 
@@ -238,7 +234,124 @@ def test_clean_module_main_runs(monkeypatch, tmp_path):
             return True
         return real_exists(path)
 
-    monkeypatch.setattr(subprocess, "run", fake_run)
     monkeypatch.setattr(clean.os.path, "exists", fake_exists)
 
     runpy.run_module("clean", run_name="__main__")
+
+    assert json.loads(output_path.read_text(encoding="utf-8")) == {"program": "a"}
+
+
+class FakeLlama:
+    # Answer every chat completion with a fixed standardized pair.
+    def __init__(self):
+        self.calls = 0
+
+    def create_chat_completion(self, **_kwargs):
+        # Return the JSON the prompt asks for.
+        self.calls += 1
+        content = ('{"standardized_program": "Computer Science", '
+                   '"standardized_university": "McGill University"}')
+        return {"choices": [{"message": {"content": content}}]}
+
+
+@pytest.mark.db
+def test_in_process_standardizer_reuses_warm_model(monkeypatch):
+    # The in-process standardizer should call the module's loaded model directly.
+    standardizer = clean.InProcessStandardizer()
+    llm = FakeLlama()
+    monkeypatch.setattr(standardizer.module, "_LLM", llm)
+
+    first = standardizer.standardize([{"program": "CS, McGill"}])
+    second = clean.InProcessStandardizer().standardize([{"program": "cs mcg"}])
+    standardizer.close()
+
+    assert first[0]["llm-generated-university"] == "McGill University"
+    assert second[0]["llm-generated-program"] == "Computer Science"
+    assert llm.calls == 2
+    assert sys.path.count(os.path.abspath(config.LLM_HOSTING_DIR)) == 1
+
+
+@pytest.mark.db
+def test_get_standardizer_prefers_configured_server(monkeypatch):
+    # STANDARDIZER_URL should select the HTTP client over the in-process module.
+    monkeypatch.setattr(config, "STANDARDIZER_URL", "http://127.0.0.1:8000/")
+
+    standardizer = clean.get_standardizer()
+
+    assert isinstance(standardizer, clean.HttpStandardizer)
+    assert standardizer.url == "http://127.0.0.1:8000/standardize"
+
+    monkeypatch.setattr(config, "STANDARDIZER_URL", None)
+    assert isinstance(clean.get_standardizer(), clean.InProcessStandardizer)
+
+
+@pytest.mark.db
+def test_http_standardizer_posts_rows(monkeypatch):
+    # Rows should be POSTed as {"rows": [...]} and the response rows returned.
+    standardizer = clean.HttpStandardizer("http://llm.local")
+    sent = {}
+
+    def fake_request(method, url, json):
+        # Capture the request and answer like the llm_hosting server.
+        sent.update(method=method, url=url, body=json)
+        return SimpleNamespace(status=200, json=lambda: {"rows": [{"program": "x", "ok": 1}]})
+
+    monkeypatch.setattr(standardizer.http, "request", fake_request)
+
+    rows = standardizer.standardize([{"program": "x"}])
+    standardizer.close()
+
+    assert sent == {"method": "POST", "url": "http://llm.local/standardize",
+                    "body": {"rows": [{"program": "x"}]}}
+    assert rows == [{"program": "x", "ok": 1}]
+
+
+@pytest.mark.db
+def test_http_standardizer_raises_on_error_status(monkeypatch):
+    # Non-200 replies should surface as RuntimeError.
+    standardizer = clean.HttpStandardizer("http://llm.local")
+    monkeypatch.setattr(standardizer.http, "request",
+                        lambda *_a, **_k: SimpleNamespace(status=503))
+
+    with pytest.raises(RuntimeError, match="HTTP 503"):
+        standardizer.standardize([{"program": "x"}])
+
+
+@pytest.mark.db
+def test_http_standardizer_waits_for_a_starting_server(monkeypatch):
+    # Connection errors are retried until the server first answers, then raised at once.
+    standardizer = clean.HttpStandardizer("http://llm.local")
+    replies = [HTTPError("refused"), HTTPError("refused"),
+               SimpleNamespace(status=200, json=lambda: {"rows": []}), HTTPError("gone")]
+
+    def fake_request(*_args, **_kwargs):
+        # Fail until the model is loaded, then answer once and go away.
+        reply = replies.pop(0)
+        if isinstance(reply, Exception):
+            raise reply
+        return reply
+
+    sleeps = []
+    monkeypatch.setattr(standardizer.http, "request", fake_request)
+    monkeypatch.setattr(clean.time, "sleep", sleeps.append)
+
+    assert standardizer.standardize([]) == []
+    with pytest.raises(HTTPError, match="gone"):
+        standardizer.standardize([])
+    assert sleeps == [1, 1]
+
+
+@pytest.mark.db
+def test_http_standardizer_gives_up_after_startup_timeout(monkeypatch):
+    # A server that never comes up fails the call once the startup timeout passes.
+    standardizer = clean.HttpStandardizer("http://llm.local")
+    monkeypatch.setattr(config, "STANDARDIZER_STARTUP_TIMEOUT", 0)
+
+    def refuse(*_args, **_kwargs):
+        # Nothing is listening yet.
+        raise HTTPError("refused")
+
+    monkeypatch.setattr(standardizer.http, "request", refuse)
+
+    with pytest.raises(HTTPError, match="refused"):
+        standardizer.standardize([])
@@ -1,11 +1,17 @@
+import psycopg
 import pytest
 
+import app as app_module
+import config
+import load_data
+import query_data
 from tests.utils.db_test_utils import (
     REQUIRED_FIELDS,
     count_required_fields,
     count_rows,
     fetch_one_as_dict,
     install_fake_popen,
+    install_query_data,
     set_sample_jsonl,
     set_test_table,
     truncate_table,
@@ -103,3 +109,60 @@ def test_query_returns_required_keys(monkeypatch, post_request):
         assert set(row.keys()) == set(REQUIRED_FIELDS)
     finally:
         truncate_table(table_name)
+
+
+@pytest.mark.db
+def test_single_pass_answers_match_per_question_queries(monkeypatch):
+    # Folded FILTER aggregates must give the same payloads as each question's own query.
+    table_name = "applicant_test"
+    set_test_table(monkeypatch, table_name)
+
+    truncate_table(table_name)
+    try:
+        set_sample_jsonl(monkeypatch)
+        load_data.main()
+        # Add rows that satisfy the predicates the sample file never reaches.
+        with psycopg.connect(**config.get_db_connect_kwargs()) as conn:
+            conn.execute(
+                f"""
+                INSERT INTO {table_name} (
+                    program, url, status, term, us_or_international, gpa, gre, gre_v, gre_aw,
+                    degree, llm_generated_program, llm_generated_university)
+                VALUES
+                ('Computer Science, Stanford University', 'p1', 'Accepted', 'Fall 2026',
+                 'American', 3.91, 331, 163, 4.5, 'PhD', 'Computer Science', 'Stanford University'),
+                ('Computer Science, JHU', 'p2', 'Rejected', 'Fall 2026', 'International',
+                 3.52, 318, NULL, NULL, 'Masters', 'Computer Science', 'Johns Hopkins University'),
+                ('Computer Science, CMU', 'p3', 'Accepted', 'Spring 2026', 'International',
+                 NULL, NULL, 158, NULL, 'PhD', 'Computer Science', 'Carnegie Mellon University');
+                """
+            )
+        install_query_data(monkeypatch)
+        stock = app_module.question_sql_dict
+        # A trailing newline keeps the SQL equivalent but stops it from folding.
+        unfolded = {question: query + "\n" for question, query in stock.items()}
+
+        _sql, folded = query_data.single_pass_plan(stock)
+        assert len(folded) == 3
+        assert query_data.single_pass_plan(unfolded) == (None, [])
+
+        def build(question_map):
+            # Answer question_map against the test table.
+            deps = app_module.AppDeps(
+                base_dir="",
+                question_map=question_map,
+                connect_fn=psycopg.connect,
+                db_kwargs_fn=config.get_db_connect_kwargs,
+                start_pull_fn=None,
+            )
+            return app_module._build_results(deps)
+
+        single_pass = build(stock)
+        per_question = build(unfolded)
+        assert [r["question"] for r in single_pass] == list(stock)
+        assert single_pass[7]["answer"] == 2
+        assert [(r["columns"], r["answer"]) for r in single_pass] == [
+            (r["columns"], r["answer"]) for r in per_question
+        ]
+    finally:
+        truncate_table(table_name)
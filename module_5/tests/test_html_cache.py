@@ -0,0 +1,160 @@
+import gzip
+import os
+
+import pytest
+
+import html_cache
+
+
+@pytest.mark.db
+def test_put_and_get_round_trip_compressed(tmp_path):
+    # Entries are stored gzip-compressed under a hashed path and read back intact.
+    cache = html_cache.HtmlCache(str(tmp_path), max_bytes=10_000_000)
+    html = "<html>" + "é" * 2000 + "</html>"
+
+    cache.put("http://x/result/1", html)
+
+    path = cache.path_for("http://x/result/1")
+    assert path.endswith(".html.gz")
+    assert os.path.getsize(path) < len(html.encode("utf-8"))
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        assert "http://x/result/1" in f.read()
+    assert cache.get("http://x/result/1") == html
+    assert cache.get("http://x/result/2") is None
+
+
+@pytest.mark.db
+def test_get_respects_max_age(tmp_path, monkeypatch):
+    # Entries older than max_age are treated as misses.
+    cache = html_cache.HtmlCache(str(tmp_path), max_bytes=10_000_000)
+    monkeypatch.setattr(html_cache.time, "time", lambda: 1000.0)
+    cache.put("http://x/a", "a")
+    monkeypatch.setattr(html_cache.time, "time", lambda: 1100.0)
+
+    assert cache.get("http://x/a", max_age=200) == "a"
+    assert cache.get("http://x/a", max_age=50) is None
+    assert cache.get("http://x/a") == "a"
+
+
+@pytest.mark.db
+def test_corrupt_or_mismatched_entries_are_misses(tmp_path, monkeypatch, capsys):
+    # Unreadable files are discarded; a hash collision on URL is not returned.
+    cache = html_cache.HtmlCache(str(tmp_path), max_bytes=10_000_000)
+    cache.put("http://x/a", "a")
+    with open(cache.path_for("http://x/a"), "wb") as f:
+        f.write(b"not gzip")
+
+    assert cache.get("http://x/a") is None
+    assert "Discarding unreadable cache entry" in capsys.readouterr().out
+    assert not os.path.exists(cache.path_for("http://x/a"))
+
+    cache.put("http://x/b", "b")
+    monkeypatch.setattr(cache, "path_for", lambda _url: html_cache.HtmlCache.path_for(cache, "http://x/b"))
+    assert cache.get("http://x/other") is None
+
+
+@pytest.mark.db
+def test_get_tolerates_touch_failure(tmp_path, monkeypatch):
+    # Failing to bump the LRU timestamp should not turn a hit into a miss.
+    cache = html_cache.HtmlCache(str(tmp_path), max_bytes=10_000_000)
+    cache.put("http://x/a", "a")
+
+    def _fail(_path):
+        # Simulate a read-only cache directory.
+        raise OSError("read-only")
+
+    monkeypatch.setattr(html_cache.os, "utime", _fail)
+    assert cache.get("http://x/a") == "a"
+
+
+@pytest.mark.db
+def test_eviction_removes_least_recently_used(tmp_path):
+    # Once over budget, least recently used entries go first, down to the low-water mark.
+    cache = html_cache.HtmlCache(str(tmp_path), max_bytes=10_000_000)
+    for n in range(3):
+        cache.put(f"http://x/{n}", f"page {n} " * 50)
+        os.utime(cache.path_for(f"http://x/{n}"), (n, n))
+    one_entry = os.path.getsize(cache.path_for("http://x/0"))
+
+    os.utime(cache.path_for("http://x/0"), (10, 10))
+    cache.max_bytes = one_entry * 3 - 1
+    cache.put("http://x/3", "page 3 " * 50)
+
+    remaining = [n for n in range(4) if os.path.exists(cache.path_for(f"http://x/{n}"))]
+    assert remaining == [0, 3]
+
+
+@pytest.mark.db
+def test_entries_skip_files_removed_during_scan(tmp_path, monkeypatch):
+    # Files deleted between listing and stat (e.g. by another thread) are skipped.
+    cache = html_cache.HtmlCache(str(tmp_path), max_bytes=10_000_000)
+    cache.put("http://x/a", "a")
+    (tmp_path / "notes.txt").write_text("ignored", encoding="utf-8")
+    real_stat = html_cache.os.stat
+
+    def _vanishing_stat(path):
+        # The cache entry disappears right before it is stat'ed.
+        if str(path).endswith(".html.gz"):
+            raise FileNotFoundError(path)
+        return real_stat(path)
+
+    monkeypatch.setattr(html_cache.os, "stat", _vanishing_stat)
+    assert not list(cache._entries())
+    html_cache.HtmlCache._remove(str(tmp_path / "missing.html.gz"))
+
+
+@pytest.mark.db
+def test_full_cache_rescans_once_per_batch_of_puts(tmp_path, monkeypatch):
+    # Eviction leaves headroom, and replacing an entry does not count as growth.
+    cache = html_cache.HtmlCache(str(tmp_path), max_bytes=10_000_000)
+    cache.put("http://x/probe", "page " * 200)
+    entry = os.path.getsize(cache.path_for("http://x/probe"))
+    cache.max_bytes = entry * 20
+    scans = []
+    real_entries = html_cache.HtmlCache._entries
+
+    def _counting_entries(self):
+        # Count full directory scans made by eviction.
+        scans.append(1)
+        return real_entries(self)
+
+    monkeypatch.setattr(html_cache.HtmlCache, "_entries", _counting_entries)
+    for n in range(100):
+        cache.put(f"http://x/{n}", "page " * 200)
+    assert len(scans) <= 100 // 4
+
+    scans.clear()
+    for _ in range(50):
+        cache.put("http://x/0", "page " * 200)
+    assert not scans
+
+
+@pytest.mark.db
+def test_failed_put_removes_its_temp_file(tmp_path, monkeypatch):
+    # A write that fails midway leaves neither an entry nor a temp file.
+    cache = html_cache.HtmlCache(str(tmp_path), max_bytes=10_000_000)
+
+    def _fail(_src, _dst):
+        # Simulate the rename failing, e.g. on a full disk.
+        raise OSError("no space left on device")
+
+    monkeypatch.setattr(html_cache.os, "replace", _fail)
+    with pytest.raises(OSError):
+        cache.put("http://x/a", "a")
+
+    assert not [name for _root, _dirs, files in os.walk(tmp_path) for name in files]
+
+
+@pytest.mark.db
+def test_items_yield_readable_entries_with_meta(tmp_path):
+    # items() returns every readable entry with its meta and skips corrupt files.
+    cache = html_cache.HtmlCache(str(tmp_path), max_bytes=10_000_000)
+    cache.put("http://x/a", "a", {"result_id": "1"})
+    cache.put("http://x/b", "b")
+    os.makedirs(os.path.dirname(cache.path_for("http://x/c")), exist_ok=True)
+    with open(cache.path_for("http://x/c"), "wb") as f:
+        f.write(b"not gzip")
+
+    assert sorted(cache.items()) == [
+        ("http://x/a", "a", {"result_id": "1"}), ("http://x/b", "b", None)
+    ]
@@ -0,0 +1,63 @@
+import json
+
+import pytest
+
+import jsonl_store
+
+
+@pytest.mark.db
+def test_writer_appends_one_line_per_record(tmp_path):
+    # Each batch should be appended as JSON Lines and counted.
+    path = tmp_path / "data.jsonl"
+    path.write_text('{"n": 0}\n', encoding="utf-8")
+
+    with jsonl_store.JsonlWriter(str(path)) as writer:
+        assert writer.write_records([{"n": 1}, {"n": 2}]) == 2
+        assert writer.write_records(iter([{"n": "é"}])) == 1
+        assert writer.records_written == 3
+
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["n"] for line in lines] == [0, 1, 2, "é"]
+
+
+@pytest.mark.db
+def test_writer_truncate_starts_empty_file(tmp_path):
+    # truncate=True should discard any previous content.
+    path = tmp_path / "data.jsonl"
+    path.write_text('{"old": true}\n', encoding="utf-8")
+
+    writer = jsonl_store.JsonlWriter(str(path), truncate=True)
+    writer.close()
+    writer.close()
+
+    assert path.read_text(encoding="utf-8") == ""
+
+
+@pytest.mark.db
+def test_writer_fsyncs_in_batches(tmp_path, monkeypatch):
+    # fsync should run every N batches and once more on close for leftovers.
+    synced = []
+    monkeypatch.setattr(jsonl_store.os, "fsync", synced.append)
+
+    writer = jsonl_store.JsonlWriter(str(tmp_path / "data.jsonl"), fsync_every=2)
+    for n in range(3):
+        writer.write_records([{"n": n}])
+    assert len(synced) == 1
+
+    writer.close()
+    assert len(synced) == 2
+
+
+@pytest.mark.db
+def test_iter_records_streams_jsonl_and_reads_legacy_arrays(tmp_path):
+    # Both JSON Lines and the older JSON array format should be readable.
+    jsonl_path = tmp_path / "data.jsonl"
+    jsonl_path.write_text('{"n": 1}\n\n{"n": 2}\n', encoding="utf-8")
+    array_path = tmp_path / "data.json"
+    array_path.write_text('\n  [{"n": 1}, {"n": 2}]', encoding="utf-8")
+    empty_path = tmp_path / "empty.json"
+    empty_path.write_text("", encoding="utf-8")
+
+    assert list(jsonl_store.iter_records(str(jsonl_path))) == [{"n": 1}, {"n": 2}]
+    assert list(jsonl_store.iter_records(str(array_path))) == [{"n": 1}, {"n": 2}]
+    assert not list(jsonl_store.iter_records(str(empty_path)))
@@ -1,25 +1,64 @@
+from contextlib import nullcontext
 from types import SimpleNamespace
 import json
 import runpy
+import sys
 
 import pytest
 
+import checkpoint
 import config
 import load_data
+import migrate
 import psycopg
+from tests.utils.db_test_utils import connect_db, count_rows, set_test_table, truncate_table
 
 
 class FakeError(Exception):
     pass
 
 
+class FakeCopy:
+    def __init__(self, cursor):
+        # Collect rows written through COPY on the owning cursor.
+        self.cursor = cursor
+
+    def __enter__(self):
+        # Support context manager usage.
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # Do not suppress exceptions.
+        return False
+
+    def set_types(self, types):
+        # Accept the binary COPY column types.
+        self.types = types
+
+    def write_row(self, row):
+        # Optionally raise to simulate a COPY failure.
+        if self.cursor.raise_on_copy:
+            raise FakeError("copy error")
+        self.cursor.copied.append(row)
+
+
 class FakeCursor:
-    def __init__(self, raise_on_executemany=False, raise_on_execute=False, raise_on_execute_if=None):
-        # Configure whether to raise on executemany or execute calls.
+    def __init__(self, raise_on_executemany=False, raise_on_execute=False, raise_on_execute_if=None,
+                 raise_on_copy=False):
+        # Configure whether to raise on executemany, execute or COPY calls.
         self.raise_on_executemany = raise_on_executemany
         self.raise_on_execute = raise_on_execute
         self.raise_on_execute_if = raise_on_execute_if
-        self.connection = SimpleNamespace(commit=lambda: None)
+        self.raise_on_copy = raise_on_copy
+        self.copied = []
+        self.many = []
+        self.rolled_back = False
+        self.rowcount = 0
+        self.connection = SimpleNamespace(commit=lambda: None, rollback=self._rollback)
+
+    def _rollback(self):
+        # Record that the transaction was rolled back.
+        self.rolled_back = True
 
     def __enter__(self):
         # Support context manager usage.
@@ -41,6 +80,19 @@ class FakeCursor:
         # Optionally raise to simulate bulk insert failure.
         if self.raise_on_executemany:
             raise FakeError("bulk error")
+        self.many.append(list(_records))
+        return None
+
+    def copy(self, _statement):
+        # Hand out a COPY writer that records rows.
+        return FakeCopy(self)
+
+    def fetchall(self):
+        # No rows come back from the fake upsert's RETURNING clause.
+        return []
+
+    def fetchone(self):
+        # No catalog rows exist for the fake migration queries.
         return None
 
     def close(self):
@@ -52,6 +104,7 @@ class FakeConnection:
     def __init__(self, cursor):
         # Store the cursor to return for DB operations.
         self._cursor = cursor
+        self.autocommit = False
 
     def __enter__(self):
         # Support context manager usage.
@@ -65,6 +118,14 @@ class FakeConnection:
         # Provide the configured fake cursor.
         return self._cursor
 
+    def transaction(self):
+        # Stand in for psycopg's transaction block.
+        return nullcontext()
+
+    def commit(self):
+        # Nothing is pending on the fake connection.
+        return None
+
     def close(self):
         # Mirror psycopg connection close.
         return None
@@ -84,25 +145,61 @@ def test_parse_float_handles_numeric_types():
     assert load_data.parse_float(2.5) == 2.5
 
 
+def _row(program, url):
+    # Build an insert tuple with only program and url set.
+    return (program, None, None, url, None, None, None, None, None, None, None, None, None, None)
+
+
 @pytest.mark.db
-def test_bulk_insert_reports_nul_fields(monkeypatch, capsys):
-    # NUL bytes should be detected during row-level insert retry.
-    records = [
-        ("ok", None, None, "url-1", None, None, None, None, None, None, None, None, None, None),
-        ("bad\x00value", None, None, "url-2", None, None, None, None, None, None, None, None, None, None),
-    ]
-    cursor = FakeCursor(
-        raise_on_executemany=True,
-        raise_on_execute_if=lambda params: any(isinstance(value, str) and "\x00" in value for value in params),
-    )
-    conn = FakeConnection(cursor)
+def test_bulk_insert_sends_nul_rows_to_error_table(capsys):
+    # NUL rows should skip COPY and be logged to the side table instead.
+    cursor = FakeCursor()
+    records = [_row("ok", "url-1"), _row("bad\x00value", "url-2"), _row("x", "url\x00-3")]
+
+    load_data.bulk_insert_with_skip_duplicates(FakeConnection(cursor), iter(records))
+
+    assert cursor.copied == [(1, *records[0])]
+    logged = cursor.many[0]
+    assert [entry[0] for entry in logged] == ["url-2", None]
+    assert "NUL bytes in fields: [(0, 'program')]" in logged[0][1]
+    assert "2 rejected to applicant_load_errors" in capsys.readouterr().out
 
+
+@pytest.mark.db
+def test_bulk_insert_rolls_back_and_raises_on_copy_error(monkeypatch, capsys):
+    # A failed COPY should roll back the transaction instead of replaying rows.
     monkeypatch.setattr(load_data.psycopg, "Error", FakeError)
+    cursor = FakeCursor(raise_on_copy=True)
 
     with pytest.raises(FakeError):
-        load_data.bulk_insert_with_skip_duplicates(conn, records)
-    captured = capsys.readouterr()
-    assert "contains NUL bytes" in captured.out
+        load_data.bulk_insert_with_skip_duplicates(FakeConnection(cursor), [_row("ok", "url-1")])
+
+    assert cursor.rolled_back is True
+    assert "Bulk insert failed: copy error" in capsys.readouterr().out
+
+
+@pytest.mark.db
+def test_bulk_insert_copies_into_postgres(monkeypatch):
+    # COPY + INSERT ... SELECT should skip duplicate URLs and log NUL rows.
+    table_name = "applicant_test"
+    set_test_table(monkeypatch, table_name)
+    truncate_table(table_name)
+    records = [_row("first", "url-1"), _row("bad\x00", "url-2"), _row("dup", "url-1"),
+               _row("third", "url-3")]
+    try:
+        with connect_db() as conn:
+            conn.execute(f"TRUNCATE TABLE {load_data.error_table_name()};")
+            inserted = load_data.bulk_insert_with_skip_duplicates(conn, records)
+            again = load_data.bulk_insert_with_skip_duplicates(conn, records[:1])
+            (in_order,) = conn.execute(
+                f"SELECT array_agg(url ORDER BY p_id) = ARRAY['url-1', 'url-3'] FROM {table_name};"
+            ).fetchone()
+
+        assert (inserted, again) == (2, 0)
+        assert in_order is True
+        assert count_rows(load_data.error_table_name()) == 1
+    finally:
+        truncate_table(table_name)
 
 
 @pytest.mark.db
@@ -118,7 +215,7 @@ def test_main_handles_psycopg_error(monkeypatch):
 def test_main_handles_file_not_found(monkeypatch, capsys):
     # Missing input data should be handled without raising.
     monkeypatch.setattr(load_data.psycopg, "connect", lambda **_kwargs: FakeConnection(FakeCursor()))
-    monkeypatch.setattr(load_data, "load_jsonl_data", lambda _path: (_ for _ in ()).throw(FileNotFoundError()))
+    monkeypatch.setattr(config, "APPLICANT_DATA_JSON_FILE", "/nonexistent/applicant_data.json.jsonl")
 
     load_data.main()
     captured = capsys.readouterr()
@@ -131,8 +228,8 @@ def test_main_handles_json_decode_error(monkeypatch, capsys):
     monkeypatch.setattr(load_data.psycopg, "connect", lambda **_kwargs: FakeConnection(FakeCursor()))
     monkeypatch.setattr(
         load_data,
-        "load_jsonl_data",
-        lambda _path: (_ for _ in ()).throw(json.JSONDecodeError("bad", "doc", 0)),
+        "load_jsonl_in_chunks",
+        lambda _conn, _path, **_kwargs: (_ for _ in ()).throw(json.JSONDecodeError("bad", "doc", 0)),
     )
 
     load_data.main()
@@ -141,11 +238,214 @@ def test_main_handles_json_decode_error(monkeypatch, capsys):
 
 
 @pytest.mark.db
-def test_module_main_executes_with_fake_db(monkeypatch, tmp_path):
+def test_module_main_executes_with_fake_db(monkeypatch, tmp_path, capsys):
     # Execute the __main__ block with a fake database connection.
     data_path = tmp_path / "data.json.jsonl"
     data_path.write_text("{}", encoding="utf-8")
     monkeypatch.setattr(config, "APPLICANT_DATA_JSON_FILE", str(data_path))
     monkeypatch.setattr(psycopg, "connect", lambda **_kwargs: FakeConnection(FakeCursor()))
+    monkeypatch.setattr(sys, "argv", ["load_data.py", "--upsert"])
 
     runpy.run_module("load_data", run_name="__main__")
+
+    assert "1 updated" not in capsys.readouterr().out
+
+
+@pytest.mark.db
+def test_fetch_known_result_ids_parses_urls(monkeypatch):
+    # Stored URLs should be reduced to their numeric result IDs.
+    class UrlCursor(FakeCursor):
+        def fetchall(self):
+            # Return stored URLs, including one that is not a result URL.
+            return [("https://www.thegradcafe.com/result/7",),
+                    ("https://www.thegradcafe.com/result/12",),
+                    ("https://example.com/other",)]
+
+    monkeypatch.setattr(load_data.psycopg, "connect", lambda **_kwargs: FakeConnection(UrlCursor()))
+
+    assert load_data.fetch_known_result_ids() == {7, 12}
+
+
+@pytest.mark.db
+def test_fetch_known_result_ids_returns_empty_on_db_error(monkeypatch, capsys):
+    # Database errors should fall back to an empty set (a full pull).
+    monkeypatch.setattr(load_data.psycopg, "Error", FakeError)
+    monkeypatch.setattr(load_data.psycopg, "connect", lambda **_kwargs: (_ for _ in ()).throw(FakeError("down")))
+
+    assert load_data.fetch_known_result_ids() == set()
+    assert "Could not read stored results" in capsys.readouterr().out
+
+
+def _write_jsonl(path, start, stop):
+    # Append records with result URLs start..stop-1 to a JSONL file.
+    with open(path, "a", encoding="utf-8") as f:
+        for i in range(start, stop):
+            f.write(json.dumps({"program": f"P{i}", "url": f"u{i}", "gpa": "3.5"}) + "\n")
+
+
+@pytest.mark.db
+def test_iter_jsonl_records_reports_offsets_and_skips_blank_lines(tmp_path):
+    # Offsets should point just past each record so a reader can seek back.
+    path = tmp_path / "data.jsonl"
+    _write_jsonl(path, 0, 2)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write("\n")
+    _write_jsonl(path, 2, 3)
+
+    rows = list(load_data.iter_jsonl_records(str(path)))
+    resumed = list(load_data.iter_jsonl_records(str(path), rows[0][0]))
+
+    assert [record["url"] for _offset, record in rows] == ["u0", "u1", "u2"]
+    assert rows[-1][0] == path.stat().st_size
+    assert resumed == rows[1:]
+    assert load_data.load_jsonl_data(str(path))[0][7] == 3.5
+
+
+@pytest.mark.db
+def test_load_in_chunks_commits_each_chunk_and_resumes(tmp_path, monkeypatch, capsys,
+                                                       isolated_state):
+    # A crash mid-load should leave committed chunks and resume after them.
+    path = tmp_path / "data.jsonl"
+    _write_jsonl(path, 0, 7)
+    batches = []
+
+    def failing_insert(_conn, rows, **_kwargs):
+        # Accept two chunks, then simulate a crash.
+        if len(batches) == 2:
+            raise RuntimeError("killed")
+        batches.append([row[3] for row in rows])
+
+    monkeypatch.setattr(load_data, "bulk_insert_with_skip_duplicates", failing_insert)
+    with pytest.raises(RuntimeError):
+        load_data.load_jsonl_in_chunks(None, str(path), chunk_rows=3)
+    assert json.loads(isolated_state.load_progress.read_text())["rows"] == 6
+
+    _write_jsonl(path, 7, 8)
+    monkeypatch.setattr(load_data, "bulk_insert_with_skip_duplicates",
+                        lambda _conn, rows, **_kwargs: batches.append([row[3] for row in rows]))
+    total = load_data.load_jsonl_in_chunks(None, str(path), chunk_rows=3)
+
+    assert batches == [["u0", "u1", "u2"], ["u3", "u4", "u5"], ["u6", "u7"]]
+    assert total == 8
+    assert not isolated_state.load_progress.exists()
+    out = capsys.readouterr().out
+    assert "Resuming load at byte" in out and "(6 rows already committed)" in out
+    assert "Chunk 1: 8 rows committed" in out
+
+
+@pytest.mark.db
+def test_load_in_chunks_restarts_when_file_was_rewritten(tmp_path, monkeypatch):
+    # Saved progress for different leading bytes must not skip rows of a new file.
+    path = tmp_path / "data.jsonl"
+    _write_jsonl(path, 0, 4)
+    progress = checkpoint.LoadProgress(config.LOAD_PROGRESS_FILE)
+    progress.save_offset(str(path), path.stat().st_size // 2, 2)
+    path.write_text("", encoding="utf-8")
+    _write_jsonl(path, 10, 14)
+    loaded = []
+    monkeypatch.setattr(load_data, "bulk_insert_with_skip_duplicates",
+                        lambda _conn, rows, **_kwargs: loaded.extend(row[3] for row in rows))
+
+    assert load_data.load_jsonl_in_chunks(None, str(path)) == 4
+    assert loaded == ["u10", "u11", "u12", "u13"]
+    assert progress.resume_point(str(tmp_path / "other.jsonl")) == (0, 0)
+    progress.save_offset(str(path), path.stat().st_size, 4)
+    path.write_text("", encoding="utf-8")
+    assert progress.resume_point(str(path)) == (0, 0)
+
+
+@pytest.mark.db
+@pytest.mark.parametrize("value,expected", [
+    ("3.50", 3.5), ("320", 320.0), (".5", 0.5), ("3.", 3.0), ("GPA 3.89", 3.89),
+    ("1_000", 1.0), ("inf", None), ("²", None), ("-2.5e1", -25.0), (True, 1.0), ([1], 1.0),
+])
+def test_parse_float_fast_path_matches_regex(value, expected):
+    # Plain numbers skip the regex but must agree with it on every input shape.
+    assert load_data.parse_float(value) == expected
+
+
+@pytest.mark.db
+def test_parse_date_is_memoized_and_rejects_non_strings():
+    # Repeated date strings should be parsed once.
+    load_data._parse_date_text.cache_clear()
+    dates = [load_data.parse_date("January 31, 2026") for _ in range(3)]
+
+    assert dates[0].isoformat() == "2026-01-31" and len(set(dates)) == 1
+    assert load_data._parse_date_text.cache_info().hits == 2
+    assert load_data.parse_date(20260131) is None
+
+
+@pytest.mark.db
+def test_records_to_rows_matches_record_to_row():
+    # Column-wise conversion must produce the same tuples as the per-record path.
+    records = [
+        {"program": "CS", "date_added": "March 2, 2026", "url": "u1", "gpa": "GPA 3.9",
+         "gre": 320, "gre_aw": "4.5", "llm-generated-university": "X"},
+        {},
+        {"date_added": "bad", "gpa": "n/a", "gre_v": "160"},
+    ]
+
+    assert load_data.records_to_rows(records) == [load_data.record_to_row(r) for r in records]
+    assert load_data.records_to_rows([]) == []
+
+
+@pytest.mark.db
+def test_upsert_rewrites_only_changed_rows(monkeypatch, capsys):
+    # A refresh should update changed rows, insert new ones and leave the rest alone.
+    table_name = "applicant_test"
+    set_test_table(monkeypatch, table_name)
+    truncate_table(table_name)
+    first = [_row("a", "url-1"), _row("b", "url-2"), _row("c", "url-3")]
+    changed = list(_row("b", "url-2"))
+    changed[7] = 3.9
+    try:
+        with connect_db() as conn:
+            load_data.bulk_insert_with_skip_duplicates(conn, first)
+            versions = dict(conn.execute(f"SELECT p_id, xmin::text FROM {table_name};").fetchall())
+            written = load_data.bulk_insert_with_skip_duplicates(
+                conn, [first[0], tuple(changed), _row("stale", "url-3"), first[2],
+                       _row("d", "url-4")], upsert=True)
+            after = dict(conn.execute(f"SELECT p_id, xmin::text FROM {table_name};").fetchall())
+            (gpa,) = conn.execute(f"SELECT gpa FROM {table_name} WHERE url = 'url-2';").fetchone()
+
+        assert written == 2
+        assert gpa == 3.9
+        assert after[1] == versions[1] and after[3] == versions[3]
+        assert after[2] != versions[2]
+        assert count_rows(table_name) == 4
+        assert "1 inserted, 1 updated, 3 unchanged" in capsys.readouterr().out
+    finally:
+        truncate_table(table_name)
+
+
+@pytest.mark.db
+def test_main_uses_configured_upsert_mode(monkeypatch):
+    # main() should take its default load mode from config.LOAD_UPSERT.
+    modes = []
+    monkeypatch.setattr(config, "LOAD_UPSERT", True)
+    monkeypatch.setattr(load_data.psycopg, "connect", lambda **_kwargs: FakeConnection(FakeCursor()))
+    monkeypatch.setattr(load_data, "load_jsonl_in_chunks",
+                        lambda _conn, _path, upsert: modes.append(upsert) or 0)
+
+    load_data.main()
+    load_data.main(upsert=False)
+
+    assert modes == [True, False]
+
+
+
+@pytest.mark.db
+def test_term_year_expression_reads_the_year_from_term(monkeypatch):
+    # The indexed term-year expression gives the four-digit year, or NULL without one.
+    set_test_table(monkeypatch, "applicant_test")
+    truncate_table("applicant_test")
+    with connect_db() as conn:
+        conn.execute(
+            "INSERT INTO applicant_test (url, term) VALUES "
+            "('u1', 'Fall 2026'), ('u2', 'Spring 2025'), ('u3', 'Fall'), ('u4', NULL);"
+        )
+        years = conn.execute(
+            f"SELECT {migrate.TERM_YEAR_EXPR} FROM applicant_test ORDER BY url;"
+        ).fetchall()
+        conn.commit()
+    assert years == [(2026,), (2025,), (None,), (None,)]
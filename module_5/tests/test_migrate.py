@@ -0,0 +1,205 @@
+import runpy
+import sys
+
+import pytest
+
+import migrate
+from tests.utils.db_test_utils import connect_db, set_test_table
+
+MIGRATE_TABLE = "applicant_migrate_test"
+
+
+class FakeError(Exception):
+    pass
+
+
+class RecordingCursor:
+    def __init__(self, trgm_available=True):
+        # Record statements and optionally fail the pg_trgm extension install.
+        self.trgm_available = trgm_available
+        self.statements = []
+
+    def execute(self, query, _params=None):
+        # Fail CREATE EXTENSION when pg_trgm is not installed on the server.
+        if "CREATE EXTENSION" in query and not self.trgm_available:
+            raise FakeError('extension "pg_trgm" is not available')
+        self.statements.append(" ".join(query.split()))
+
+    def fetchone(self):
+        # No leftover index exists.
+        return None
+
+
+def _reset(conn):
+    # Drop the scratch tables and forget their applied migrations.
+    migrate.status(conn)
+    with conn.cursor() as cur:
+        cur.execute(f"DROP TABLE IF EXISTS {MIGRATE_TABLE};")
+        cur.execute(f"DROP TABLE IF EXISTS {migrate.error_table_name()};")
+        cur.execute(
+            f"DELETE FROM {migrate.SCHEMA_VERSION_TABLE} WHERE table_name = %s;", (MIGRATE_TABLE,)
+        )
+    conn.commit()
+
+
+@pytest.fixture
+def scratch_table(monkeypatch):
+    # Give each test an applicant table with no schema history.
+    set_test_table(monkeypatch, MIGRATE_TABLE)
+    with connect_db() as conn:
+        _reset(conn)
+        yield conn
+        _reset(conn)
+
+
+def _trgm_available(conn):
+    # Whether this server can install the pg_trgm extension.
+    return conn.execute(
+        "SELECT count(*) FROM pg_available_extensions WHERE name = 'pg_trgm';"
+    ).fetchone()[0] == 1
+
+
+def _index_names(conn):
+    # Names of the valid indexes on the scratch table.
+    rows = conn.execute(
+        "SELECT c.relname::text FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+        "WHERE i.indrelid = %s::regclass AND i.indisvalid;",
+        (MIGRATE_TABLE,),
+    ).fetchall()
+    return {name.decode() if isinstance(name, bytes) else name for (name,) in rows}
+
+
+@pytest.mark.db
+def test_migrations_are_numbered_in_order():
+    # Versions must run 1..N with no gaps or repeats.
+    assert [m.version for m in migrate.MIGRATIONS] == list(range(1, len(migrate.MIGRATIONS) + 1))
+
+
+@pytest.mark.db
+def test_upgrade_applies_pending_migrations_once(scratch_table, capsys):
+    # A fresh table gets every migration; a second upgrade is a no-op.
+    conn = scratch_table
+
+    assert migrate.upgrade(conn, target=2) == [1, 2]
+    assert [applied is not None for _v, _d, applied in migrate.status(conn)] == [
+        True, True, False, False, False
+    ]
+    # Without pg_trgm, migration 5 stays pending instead of being recorded.
+    assert migrate.upgrade(conn) == ([3, 4, 5] if _trgm_available(conn) else [3, 4])
+    assert migrate.upgrade(conn) == []
+    assert (migrate.status(conn)[4][2] is not None) is _trgm_available(conn)
+
+    assert set(migrate.btree_index_columns()) <= _index_names(conn)
+    assert conn.autocommit is False
+    assert "Applying migration 3: Index the year of term" in capsys.readouterr().out
+
+
+@pytest.mark.db
+def test_upgrade_adopts_a_table_created_before_migrations(scratch_table):
+    # Tables from the old CREATE TABLE gain the new column and indexes and keep their rows.
+    conn = scratch_table
+    with conn.cursor() as cur:
+        # Migration 1 is the original CREATE TABLE, run here without a version row.
+        migrate.MIGRATIONS[0].apply(cur)
+    conn.execute(f"INSERT INTO {MIGRATE_TABLE} (url, term) VALUES ('u1', 'Fall 2026');")
+    conn.commit()
+
+    migrate.upgrade(conn)
+
+    row = conn.execute(f"SELECT url, content_hash FROM {MIGRATE_TABLE};").fetchone()
+    assert row == (b"u1", None)
+    assert f"{MIGRATE_TABLE}_term_year_status_idx" in _index_names(conn)
+
+
+@pytest.mark.db
+def test_failed_migration_rolls_back_and_is_not_recorded(scratch_table, monkeypatch):
+    # A transactional migration that raises leaves neither changes nor a version row.
+    conn = scratch_table
+
+    def broken(cursor):
+        # Create a table, then fail before the migration finishes.
+        cursor.execute(f"CREATE TABLE {MIGRATE_TABLE} (id INTEGER);")
+        cursor.execute("SELECT 1 / 0;")
+
+    monkeypatch.setattr(migrate, "MIGRATIONS", [migrate.Migration(1, "Broken", broken)])
+
+    with pytest.raises(migrate.psycopg.Error):
+        migrate.upgrade(conn)
+
+    assert conn.execute("SELECT to_regclass(%s) IS NULL;", (MIGRATE_TABLE,)).fetchone()[0]
+    assert migrate.status(conn)[0][2] is None
+    # The advisory lock was released, so a new session can take it at once.
+    with connect_db() as other:
+        lock_key = f"{migrate.SCHEMA_VERSION_TABLE}:{MIGRATE_TABLE}"
+        assert other.execute(
+            "SELECT pg_try_advisory_lock(hashtext(%s));", (lock_key,)
+        ).fetchone()[0]
+
+
+@pytest.mark.db
+@pytest.mark.parametrize("concurrent", [True, False])
+def test_migration_returning_false_stays_pending(scratch_table, monkeypatch, capsys, concurrent):
+    # A migration that cannot run yet is not recorded and is retried next time.
+    conn = scratch_table
+    attempts = []
+
+    def not_yet(_cursor):
+        # Report that the server cannot run this migration.
+        attempts.append(1)
+        return False
+
+    monkeypatch.setattr(migrate, "MIGRATIONS",
+                        [migrate.Migration(1, "Optional", not_yet, concurrent=concurrent)])
+
+    assert migrate.upgrade(conn) == []
+    assert migrate.upgrade(conn) == []
+    assert len(attempts) == 2
+    assert migrate.status(conn)[0][2] is None
+    assert "Migration 1 left pending" in capsys.readouterr().out
+
+
+@pytest.mark.db
+def test_concurrent_index_build_replaces_invalid_leftover(scratch_table):
+    # An INVALID index from an interrupted build is dropped and rebuilt.
+    conn = scratch_table
+    migrate.upgrade(conn, target=2)
+    name = f"{MIGRATE_TABLE}_degree_idx"
+    conn.execute(f"CREATE INDEX {name} ON {MIGRATE_TABLE} (degree);")
+    conn.execute(
+        "UPDATE pg_index SET indisvalid = false WHERE indexrelid = %s::regclass;", (name,)
+    )
+    conn.commit()
+    assert name not in _index_names(conn)
+
+    migrate.upgrade(conn, target=4)
+
+    assert name in _index_names(conn)
+
+
+@pytest.mark.db
+@pytest.mark.parametrize("trgm_available", [True, False])
+def test_trigram_migration_skips_without_pg_trgm(monkeypatch, capsys, trgm_available):
+    # Trigram indexes are built only when the pg_trgm extension installs.
+    monkeypatch.setattr(migrate.psycopg, "Error", FakeError)
+    cursor = RecordingCursor(trgm_available)
+
+    assert migrate.MIGRATIONS[4].apply(cursor) is trgm_available
+
+    built = [stmt for stmt in cursor.statements if "gin_trgm_ops" in stmt]
+    assert len(built) == (3 if trgm_available else 0)
+    assert all("CONCURRENTLY" in stmt for stmt in built)
+    assert ("skipping trigram indexes" in capsys.readouterr().out) is not trgm_available
+
+
+@pytest.mark.db
+def test_cli_upgrade_and_status(scratch_table, monkeypatch, capsys):
+    # The upgrade and status commands report against the configured table.
+    migrate.main(["upgrade", "--target", "2"])
+    assert f"Applied 2 migration(s) to {MIGRATE_TABLE}." in capsys.readouterr().out
+
+    monkeypatch.setattr(sys, "argv", ["migrate.py", "status"])
+    runpy.run_module("migrate", run_name="__main__")
+
+    lines = capsys.readouterr().out.splitlines()
+    assert len(lines) == len(migrate.MIGRATIONS)
+    assert "applied" in lines[1] and "pending" in lines[2]
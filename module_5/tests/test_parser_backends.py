@@ -0,0 +1,52 @@
+import os
+
+import pytest
+
+import scrape
+from model import ApplicantData
+
+RESOURCES = os.path.join(os.path.dirname(__file__), "resources")
+BACKENDS = ["html.parser", "lxml"]
+
+
+def _read_fixture(name):
+    # Load a saved GradCafe HTML page from tests/resources.
+    with open(os.path.join(RESOURCES, name), encoding="utf-8") as f:
+        return f.read()
+
+
+def _parse_fixtures(monkeypatch, backend):
+    # Parse the saved list page, then the saved detail page for every result.
+    monkeypatch.setattr(scrape.config, "PARSER_BACKEND", backend)
+    scraper = scrape.GradCafeScraper()
+    applicants = scraper.parse_list_page(_read_fixture("list_page.html"))
+    for applicant in applicants:
+        scraper.parse_detail_page(_read_fixture("detail_page.html"), applicant)
+
+    fresh = ApplicantData()
+    scraper.parse_detail_page(_read_fixture("detail_page.html"), fresh)
+    return [a.to_dict() for a in applicants] + [fresh.to_dict()]
+
+
+@pytest.mark.db
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_backend_parses_saved_fixtures(monkeypatch, backend):
+    # Every backend should extract the expected fields from the saved pages.
+    records = _parse_fixtures(monkeypatch, backend)
+
+    assert [r["result_id"] for r in records[:-1]] == ["1002051", "1002042", "1002017", "1002009"]
+    assert [r["status"] for r in records[:-1]] == ["Accepted", "Rejected", "Wait listed", "Interview"]
+    assert records[2]["semester_year_start"] == "Spring 2027"
+    assert records[2]["citizenship"] == "American"
+    assert records[3]["gpa"] == "3.71"
+    assert records[-1]["decision_date"] == "06/02/2026"
+    assert records[-1]["citizenship"] == "International"
+    assert (records[-1]["gre"], records[-1]["gre_v"], records[-1]["gre_aw"]) == ("328.0", "162.0", "4.5")
+
+
+@pytest.mark.db
+def test_backends_produce_identical_records(monkeypatch):
+    # All backends must yield byte-for-byte identical ApplicantData output.
+    outputs = {backend: _parse_fixtures(monkeypatch, backend) for backend in BACKENDS}
+
+    assert outputs["lxml"] == outputs["html.parser"]
@@ -0,0 +1,175 @@
+import json
+import threading
+
+import pytest
+
+import config
+import load_data
+import pipeline
+from tests.utils.db_test_utils import (
+    count_rows,
+    fetch_one_as_dict,
+    set_test_table,
+    truncate_table,
+)
+
+class TitleCaseStandardizer:
+    # Stand in for the LLM by title-casing the program text.
+    def __init__(self):
+        self.closed = False
+
+    def standardize(self, rows):
+        # Fill in the LLM fields the loader maps.
+        return [dict(row, **{"llm-generated-program": row["program"].title(),
+                             "llm-generated-university": "Stub University"}) for row in rows]
+
+    def close(self):
+        # Record that the pipeline released the standardizer.
+        self.closed = True
+
+
+def _record(result_id):
+    # Build a raw scraped record with the fields the loader maps.
+    return {
+        "program": "computer science",
+        "url": f"https://www.thegradcafe.com/result/{result_id}",
+        "applicant_status": "Accepted",
+        "date_added": "January 31, 2026",
+        "gpa": "GPA 3.80",
+    }
+
+
+@pytest.mark.integration
+def test_pipeline_runs_pages_through_both_stages_in_order():
+    # Pages should reach the load stage in submission order, after standardizing.
+    loaded = []
+    pipe = pipeline.PullPipeline(
+        lambda rows: [row.upper() for row in rows],
+        loaded.append,
+        queue_size=1,
+    )
+
+    for page in (["a"], ["b", "c"], ["d"]):
+        pipe.submit(page)
+    pipe.close()
+
+    assert loaded == [["A"], ["B", "C"], ["D"]]
+    assert pipe.pages_loaded == 3
+    assert pipe.failed is False
+
+
+@pytest.mark.integration
+def test_pipeline_blocks_scraper_when_stage_is_full():
+    # A stalled load stage should hold at most the queued pages in memory.
+    release = threading.Event()
+    pipe = pipeline.PullPipeline(lambda rows: rows, lambda _rows: release.wait(), queue_size=1)
+
+    # One page in each stage and one in each queue; the fifth must wait.
+    for page in ("1", "2", "3", "4"):
+        pipe.submit([page])
+    blocked = threading.Thread(target=pipe.submit, args=(["5"],))
+    blocked.start()
+    blocked.join(timeout=0.2)
+
+    assert blocked.is_alive()
+    release.set()
+    blocked.join(timeout=5)
+    pipe.close()
+    assert pipe.pages_loaded == 5
+
+
+@pytest.mark.integration
+def test_pipeline_reraises_first_stage_error_and_runs_cleanup():
+    # A failing stage should drain later pages, run cleanup, and surface its error.
+    cleaned_up = []
+    loaded = []
+
+    def failing_standardize(rows):
+        # Fail on the second page only.
+        if rows == ["bad"]:
+            raise RuntimeError("worker exited")
+        return rows
+
+    pipe = pipeline.PullPipeline(failing_standardize, loaded.append,
+                                 cleanup=lambda: cleaned_up.append(True))
+    pipe.submit(["ok"])
+    pipe.submit(["bad"])
+    pipe.submit(["after"])
+
+    with pytest.raises(RuntimeError, match="worker exited"):
+        pipe.close()
+
+    assert pipe.failed is True
+    assert loaded == [["ok"]]
+    assert cleaned_up == [True]
+
+
+@pytest.mark.integration
+def test_pipeline_uses_configured_queue_size(monkeypatch):
+    # The default queue bound comes from config.PIPELINE_QUEUE_PAGES.
+    monkeypatch.setattr(config, "PIPELINE_QUEUE_PAGES", 2)
+
+    pipe = pipeline.PullPipeline(lambda rows: rows, lambda _rows: None)
+    pipe.close()
+
+    assert pipe.standardize_queue.maxsize == 2
+    assert pipe.load_queue.maxsize == 2
+
+
+@pytest.mark.integration
+def test_build_pull_pipeline_streams_rows_into_database(monkeypatch, tmp_path):
+    # Rows should be standardized by the worker, written to JSONL, and inserted.
+    table_name = "applicant_test"
+    set_test_table(monkeypatch, table_name)
+    output_path = tmp_path / "cleaned.jsonl"
+    output_path.write_text('{"stale": true}\n', encoding="utf-8")
+
+    standardizer = TitleCaseStandardizer()
+    requested = []
+    monkeypatch.setattr(pipeline, "get_standardizer",
+                        lambda directory: requested.append(directory) or standardizer)
+
+    truncate_table(table_name)
+    try:
+        pipe = pipeline.build_pull_pipeline(str(tmp_path / "app.py"), str(output_path))
+        pipe.submit([_record(1), _record(2)])
+        pipe.submit([_record(2), _record(3)])
+        pipe.close()
+
+        assert count_rows(table_name) == 3
+        assert fetch_one_as_dict(table_name, ["gpa"]) == {"gpa": 3.8}
+        lines = [json.loads(line) for line in output_path.read_text(encoding="utf-8").splitlines()]
+        assert [line["url"][-1] for line in lines] == ["1", "2", "2", "3"]
+        assert {line["llm-generated-program"] for line in lines} == {"Computer Science"}
+        assert requested == [str(tmp_path)]
+        assert standardizer.closed is True
+    finally:
+        truncate_table(table_name)
+
+
+@pytest.mark.integration
+def test_build_pull_pipeline_closes_connection_when_worker_fails(monkeypatch, tmp_path):
+    # A standardizer that cannot load should not leak the database connection.
+    closed = []
+
+    class FakeConnection:
+        def commit(self):
+            # Accept the table-creation commit.
+            return None
+
+        def close(self):
+            # Record that the connection was closed.
+            closed.append(True)
+
+    def failing_standardizer(_directory):
+        # Simulate llama_cpp not being installed.
+        raise ImportError("no llama_cpp")
+
+    monkeypatch.setattr(pipeline.psycopg, "connect", lambda **_kwargs: FakeConnection())
+    monkeypatch.setattr(load_data, "create_table_if_not_exists", lambda _conn: None)
+    monkeypatch.setattr(pipeline, "get_standardizer", failing_standardizer)
+
+    with pytest.raises(ImportError, match="no llama_cpp"):
+        pipeline.build_pull_pipeline("app.py", str(tmp_path / "out.jsonl"))
+
+    assert closed == [True]
@@ -1,9 +1,19 @@
+import importlib
 import runpy
 
 import pytest
 import psycopg
 
+import config
+import migrate
 import query_data
+from tests.utils.db_test_utils import connect_db
+
+EXPLAIN_TABLE = "applicant_explain"
+EXPLAIN_ROWS = 1_000_000
+# Averages over every applicant who reports any score read most of the table
+# by design; a sequential scan is the right plan for them.
+WHOLE_TABLE_QUESTIONS = ("What is the average GPA, GRE, GRE V, GRE AW",)
 
 
 class FakeCursor:
@@ -67,3 +77,80 @@ def test_query_data_module_main_executes(monkeypatch):
     monkeypatch.setattr(psycopg, "connect", lambda **_kwargs: FakeConnection(cursor))
 
     runpy.run_module("query_data", run_name="__main__")
+
+
+@pytest.mark.db
+def test_aggregates_are_keyed_by_their_questions():
+    # Only the whole-table questions fold; the indexed, narrowed ones keep their own queries.
+    questions = list(query_data.question_sql_dict)
+    assert set(query_data.question_aggregate_dict) <= set(questions)
+    assert [questions.index(q) for q in query_data.question_aggregate_dict] == [1, 2, 11]
+
+
+def _plan_nodes(plan):
+    # Yield every node of an EXPLAIN (FORMAT JSON) plan tree.
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from _plan_nodes(child)
+
+
+def _drop_explain_table(conn):
+    # Drop the scratch tables and forget their applied migrations.
+    migrate.status(conn)
+    conn.execute(f"DROP TABLE IF EXISTS {EXPLAIN_TABLE};")
+    conn.execute(f"DROP TABLE IF EXISTS {migrate.error_table_name()};")
+    conn.execute(
+        f"DELETE FROM {migrate.SCHEMA_VERSION_TABLE} WHERE table_name = %s;", (EXPLAIN_TABLE,)
+    )
+
+
+@pytest.fixture(scope="module")
+def explain_questions():
+    # Fill a scratch table with 1M synthetic applicants spread over 34 terms.
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(config, "TABLE_NAME", EXPLAIN_TABLE)
+        with connect_db() as conn:
+            conn.autocommit = True
+            _drop_explain_table(conn)
+            # Bulk-load before the index migrations, as a restore would.
+            migrate.upgrade(conn, target=2)
+            conn.execute(
+                f"""
+                INSERT INTO {EXPLAIN_TABLE} (
+                    program, url, status, term, us_or_international, gpa, gre,
+                    degree, llm_generated_program, llm_generated_university)
+                SELECT field || ', University ' || (i % 997),
+                    'https://www.thegradcafe.com/result/' || i,
+                    (ARRAY['Accepted', 'Rejected', 'Interview', 'Wait listed'])[1 + i % 4],
+                    (ARRAY['Fall', 'Spring'])[1 + i % 2] || ' ' || (2010 + i % 17),
+                    (ARRAY['American', 'International', 'Other'])[1 + i % 3],
+                    3.0 + (i % 100) / 100.0,
+                    CASE WHEN i % 3 = 0 THEN 320 END,
+                    (ARRAY['Masters', 'PhD'])[1 + i % 2],
+                    field,
+                    'University ' || (i % 997)
+                FROM generate_series(1, {EXPLAIN_ROWS}) AS i,
+                    LATERAL (SELECT (ARRAY['Computer Science', 'Physics', 'Economics',
+                        'Biology', 'Mathematics'])[1 + i % 5] AS field) AS f;
+                """
+            )
+            migrate.upgrade(conn)
+            conn.execute(f"VACUUM ANALYZE {EXPLAIN_TABLE};")
+            questions = dict(importlib.reload(query_data).question_sql_dict)
+            yield conn, questions
+            _drop_explain_table(conn)
+    importlib.reload(query_data)
+
+
+@pytest.mark.db
+def test_questions_avoid_sequential_scans_at_1m_rows(explain_questions):
+    # Every selective question should be answered from an index, not a table scan.
+    conn, questions = explain_questions
+    scanned = []
+    for question, sql in questions.items():
+        if question.startswith(WHOLE_TABLE_QUESTIONS):
+            continue
+        (plan,) = conn.execute(f"EXPLAIN (FORMAT JSON) {sql}").fetchone()[0]
+        if any(node["Node Type"] == "Seq Scan" for node in _plan_nodes(plan["Plan"])):
+            scanned.append(question)
+    assert scanned == []
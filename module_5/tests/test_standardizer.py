@@ -0,0 +1,694 @@
+import difflib
+import importlib.util
+import json
+import os
+import random
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+import config
+import standardizer
+import standardize_cache
+from fuzzy_index import FuzzyIndex
+
+LLM_HOSTING_DIR = os.path.abspath(config.LLM_HOSTING_DIR)
+
+
+def _load_llm_app():
+    # Import llm_hosting/app.py under a name that cannot clash with src/app.
+    spec = importlib.util.spec_from_file_location(
+        "llm_hosting_app", os.path.join(LLM_HOSTING_DIR, "app.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class FakeLlama:
+    # Minimal llama.cpp stand-in that returns a fixed JSON answer.
+    instances = 0
+
+    def __init__(self, **kwargs):
+        # Count constructions so tests can check the model is loaded once.
+        FakeLlama.instances += 1
+        self.kwargs = kwargs
+
+    def create_chat_completion(self, **_kwargs):
+        # Answer in the format the prompt requests.
+        content = ('{"standardized_program": "Mathematics", '
+                   '"standardized_university": "University Of British Columbia"}')
+        return {"choices": [{"message": {"content": content}}]}
+
+
+@pytest.fixture
+def fake_model_libs(monkeypatch):
+    # Provide fake huggingface_hub/llama_cpp modules and an unloaded model slot.
+    downloads = []
+
+    def fake_download(**kwargs):
+        # Record the download check and return a model path.
+        downloads.append(kwargs)
+        return os.path.join(kwargs["local_dir"], kwargs["filename"])
+
+    FakeLlama.instances = 0
+    monkeypatch.setitem(sys.modules, "huggingface_hub",
+                        SimpleNamespace(hf_hub_download=fake_download))
+    monkeypatch.setitem(sys.modules, "llama_cpp", SimpleNamespace(Llama=FakeLlama))
+    monkeypatch.setattr(standardizer, "_LLM", None)
+    return downloads
+
+
+@pytest.mark.db
+def test_model_is_loaded_once_per_process(fake_model_libs):
+    # Repeated calls should reuse the warm model instead of reloading it.
+    standardizer.warm_up()
+    rows = standardizer.standardize_rows([{"program": "Math, UBC"}, {"program": "math ubc"}])
+    standardizer.standardize_rows([{"program": "Mathematics"}])
+
+    assert FakeLlama.instances == 1
+    assert len(fake_model_libs) == 1
+    assert fake_model_libs[0]["local_dir"] == standardizer.MODEL_DIR
+    assert [row["llm-generated-university"] for row in rows] == [
+        "University of British Columbia"] * 2
+
+
+@pytest.mark.db
+def test_canonical_lists_resolve_next_to_module():
+    # Canon files should load regardless of the caller's working directory.
+    assert os.path.dirname(standardizer.CANON_PROGS_PATH) == LLM_HOSTING_DIR
+    assert standardizer.CANON_PROGS
+    assert standardizer.CANON_UNIS
+
+
+@pytest.mark.db
+def test_llm_app_standardize_route_uses_module(fake_model_libs):
+    # The HTTP API should delegate to the shared standardizer module.
+    llm_app = _load_llm_app()
+    client = llm_app.app.test_client()
+
+    response = client.post("/standardize", json={"rows": [{"program": "Math, UBC"}]})
+
+    assert response.status_code == 200
+    assert response.get_json()["rows"][0]["llm-generated-program"] == "Mathematics"
+    assert FakeLlama.instances == 1
+
+
+class CountingLlama(FakeLlama):
+    # FakeLlama that counts completions to show which rows skipped inference.
+    completions = 0
+
+    def create_chat_completion(self, **kwargs):
+        # Count, then answer like FakeLlama.
+        CountingLlama.completions += 1
+        return super().create_chat_completion(**kwargs)
+
+
+@pytest.mark.db
+def test_repeated_programs_skip_inference(monkeypatch):
+    # Rows whose normalized program text was seen before should be served from cache.
+    CountingLlama.completions = 0
+    monkeypatch.setattr(standardizer, "_LLM", CountingLlama())
+    rows = [{"program": "Math, UBC"}, {"program": "  math,   ubc "}, {"program": "MATH, UBC"}]
+
+    out = [standardizer.standardize_rows([row])[0] for row in rows]
+
+    assert CountingLlama.completions == 1
+    assert len({(r["llm-generated-program"], r["llm-generated-university"]) for r in out}) == 1
+    assert standardizer.cache_stats() == {"hits": 2, "misses": 1, "entries": 1}
+
+
+@pytest.mark.db
+def test_cache_persists_across_processes(monkeypatch, isolated_state):
+    # A new cache object on the same file should answer without the model.
+    monkeypatch.setattr(standardizer, "_LLM", CountingLlama())
+    standardizer.standardize_texts(["Math, UBC"])
+    standardizer._CACHE.close()
+    monkeypatch.setattr(standardizer, "_CACHE", None)
+    monkeypatch.setattr(standardizer, "_LLM", None)
+    monkeypatch.setattr(standardizer, "_load_llm", lambda: pytest.fail("model loaded"))
+
+    (result,) = standardizer.standardize_texts(["math, ubc"])
+
+    assert result["standardized_university"] == "University of British Columbia"
+    assert isolated_state.standardize_cache.exists()
+
+
+@pytest.mark.db
+def test_cache_entries_are_scoped_to_model_and_prompt(tmp_path):
+    # A different version string must not see answers stored under another version.
+    path = str(tmp_path / "cache.sqlite3")
+    old = standardize_cache.StandardizeCache(path, "v1")
+    old.put("Math, UBC", {"standardized_program": "Math", "standardized_university": "UBC"})
+    old.close()
+
+    new = standardize_cache.StandardizeCache(path, "v2")
+
+    assert new.get("Math, UBC") is None
+    assert new.stats() == {"hits": 0, "misses": 1, "entries": 0}
+    new.close()
+    # Opening under v2 deleted the v1 rows for good.
+    reopened = standardize_cache.StandardizeCache(path, "v1")
+    assert reopened.get("Math, UBC") is None
+    reopened.close()
+
+
+@pytest.mark.db
+def test_cache_version_changes_with_prompt(monkeypatch):
+    # Editing the prompt should produce a new cache version.
+    before = standardizer.cache_version()
+    monkeypatch.setattr(standardizer, "SYSTEM_PROMPT", standardizer.SYSTEM_PROMPT + " ")
+
+    assert standardizer.cache_version() != before
+
+
+@pytest.mark.db
+def test_cache_can_be_disabled(monkeypatch):
+    # An empty cache path should call the model every time and report zero counters.
+    CountingLlama.completions = 0
+    monkeypatch.setattr(standardizer, "CACHE_PATH", "")
+    monkeypatch.setattr(standardizer, "_LLM", CountingLlama())
+
+    standardizer.standardize_rows([{"program": "Math, UBC"}])
+    standardizer.standardize_rows([{"program": "Math, UBC"}])
+
+    assert CountingLlama.completions == 2
+    assert standardizer.cache_stats() == {"hits": 0, "misses": 0, "entries": 0}
+
+
+@pytest.mark.db
+def test_llm_app_stats_route_reports_cache(fake_model_libs):
+    # /stats should expose the cache counters and the rows taken by each path.
+    client = _load_llm_app().app.test_client()
+    client.post("/standardize", json=[{"program": "Math, UBC"}])
+    client.post("/standardize", json=[{"program": "Math, UBC"}])
+
+    response = client.get("/stats")
+
+    assert response.get_json() == {
+        "cache": {"hits": 1, "misses": 1, "entries": 1},
+        "paths": {"rows": 2, "rules": 0, "cache": 1, "model": 1,
+                  "rules_share": 0.0, "cache_share": 0.5, "model_share": 0.5},
+    }
+
+
+class RuleLlama:
+    # Deterministic model stand-in that answers both single and batched prompts.
+    def __init__(self, broken_batches=False):
+        self.prompts = []
+        self.broken_batches = broken_batches
+
+    @staticmethod
+    def _answer(program):
+        # Split "program, university" the same way for either prompt shape.
+        prog, _, uni = program.partition(",")
+        return {"standardized_program": prog.strip(),
+                "standardized_university": uni.strip() or "Unknown"}
+
+    def create_chat_completion(self, messages, **_kwargs):
+        # Answer the last user message, which is an object or an array of objects.
+        request = json.loads(messages[-1]["content"])
+        self.prompts.append(request)
+        if isinstance(request, list):
+            if self.broken_batches:
+                return {"choices": [{"message": {"content": "Sure! Here you go."}}]}
+            content = json.dumps([self._answer(item["program"]) for item in request])
+        else:
+            content = json.dumps(self._answer(request["program"]))
+        return {"choices": [{"message": {"content": "Output: " + content}}]}
+
+
+PARITY_PROGRAMS = [
+    "Mathematics, University Of British Columbia",
+    "Info Studies, McG",
+    "Computer Science, Stanford University",
+    "mathematics,  university of british columbia",
+    "Mathematic",
+    "Physics, UBC",
+    "Computer Science, Stanford University",
+]
+
+
+@pytest.mark.db
+def test_batched_path_matches_single_row_path(monkeypatch):
+    # Batching and deduping must not change any row's standardized output.
+    monkeypatch.setattr(standardizer, "CACHE_PATH", "")
+    monkeypatch.setattr(standardizer, "RULES_FAST_PATH", False)
+    single_llm = RuleLlama()
+    monkeypatch.setattr(standardizer, "_LLM", single_llm)
+    single = [standardizer._call_llm(text) for text in PARITY_PROGRAMS]
+
+    batch_llm = RuleLlama()
+    monkeypatch.setattr(standardizer, "_LLM", batch_llm)
+    batched = standardizer.standardize_texts(PARITY_PROGRAMS, batch_size=3)
+
+    assert batched == single
+    assert len(single_llm.prompts) == len(PARITY_PROGRAMS)
+    assert [len(prompt) for prompt in batch_llm.prompts] == [3, 2]
+
+
+@pytest.mark.db
+def test_batch_size_one_uses_single_row_prompts(monkeypatch):
+    # A batch size of 1 should send the original single-object prompt.
+    llm = RuleLlama()
+    monkeypatch.setattr(standardizer, "_LLM", llm)
+    monkeypatch.setattr(standardizer, "BATCH_SIZE", 1)
+
+    standardizer.standardize_rows([{"program": "Physics, UBC"}, {"program": "Math, McG"}])
+
+    assert all(isinstance(prompt, dict) for prompt in llm.prompts)
+
+
+@pytest.mark.db
+def test_unparseable_batch_reply_falls_back_to_single_rows(monkeypatch):
+    # A reply that is not a matching JSON array should be redone one row at a time.
+    llm = RuleLlama(broken_batches=True)
+    monkeypatch.setattr(standardizer, "_LLM", llm)
+    monkeypatch.setattr(standardizer, "RULES_FAST_PATH", False)
+
+    rows = standardizer.standardize_rows(
+        [{"program": "Physics, UBC"}, {"program": "Math, McG"}], batch_size=8)
+
+    assert [type(prompt) for prompt in llm.prompts] == [list, dict, dict]
+    assert rows[0]["llm-generated-university"] == "University of British Columbia"
+    assert rows[1]["llm-generated-university"] == "McGill University"
+
+
+@pytest.mark.db
+def test_llm_app_caps_batch_size_to_the_context_window(monkeypatch):
+    # A batch_size too large for N_CTX is cut down so no prompt overflows the context.
+    llm = RuleLlama()
+    monkeypatch.setattr(standardizer, "_LLM", llm)
+    client = _load_llm_app().app.test_client()
+    cap = standardizer.max_batch_size()
+    assert standardizer.BATCH_SIZE <= cap < 100
+
+    client.post("/standardize", json={"rows": [{"program": f"P{i}, UBC"} for i in range(100)],
+                                      "batch_size": 100})
+    monkeypatch.setattr(standardizer, "N_CTX", 0)
+    assert standardizer.max_batch_size() == 1
+    client.post("/standardize", json={"rows": [{"program": f"Q{i}, UBC"} for i in range(2)],
+                                      "batch_size": 100})
+
+    sizes = [len(prompt) if isinstance(prompt, list) else 1 for prompt in llm.prompts]
+    assert max(sizes[:-2]) == cap and sum(sizes[:-2]) == 100
+    assert sizes[-2:] == [1, 1]
+
+
+@pytest.mark.db
+def test_llm_app_accepts_batch_size(monkeypatch):
+    # /standardize should honor an integer batch_size in the request body.
+    llm = RuleLlama()
+    monkeypatch.setattr(standardizer, "_LLM", llm)
+    client = _load_llm_app().app.test_client()
+
+    client.post("/standardize", json={"rows": [{"program": f"P{i}, UBC"} for i in range(4)],
+                                      "batch_size": 2})
+    client.post("/standardize", json={"rows": [{"program": "Q, UBC"}], "batch_size": "x"})
+
+    assert [len(prompt) for prompt in llm.prompts] == [2, 2, 1]
+
+
+class StatefulLlama(RuleLlama):
+    # RuleLlama that also records llama.cpp state saves and restores.
+    def __init__(self):
+        super().__init__()
+        self.events = []
+
+    def create_chat_completion(self, messages, **kwargs):
+        # Log the call shape before answering.
+        request = json.loads(messages[-1]["content"])
+        self.events.append(("complete", kwargs["max_tokens"], request))
+        return super().create_chat_completion(messages, **kwargs)
+
+    def save_state(self):
+        # Hand back a token that identifies the saved prefix.
+        self.events.append(("save",))
+        return f"state-{len(self.events)}"
+
+    def load_state(self, state):
+        # Record which saved prefix was restored.
+        self.events.append(("load", state))
+
+
+@pytest.mark.db
+def test_prefix_state_is_restored_only_when_the_prompt_shape_changes(monkeypatch):
+    # Each shape is prefilled once; its state is restored only after the other shape ran.
+    llm = StatefulLlama()
+    monkeypatch.setattr(standardizer, "_LLM", llm)
+    monkeypatch.setattr(standardizer, "PROMPT_PREFIX_CACHE", True)
+
+    standardizer._call_llm("Physics, UBC")
+    standardizer._call_llm("Math, McG")
+    standardizer._call_llm_batch(["A, UBC", "B, UBC"])
+    standardizer._call_llm("Law, UBC")
+
+    assert llm.events == [
+        ("complete", 1, {"program": ""}),
+        ("save",),
+        ("load", "state-2"),
+        ("complete", 128, {"program": "Physics, UBC"}),
+        ("complete", 128, {"program": "Math, McG"}),
+        ("complete", 1, [{"program": ""}]),
+        ("save",),
+        ("load", "state-7"),
+        ("complete", 160, [{"program": "A, UBC"}, {"program": "B, UBC"}]),
+        ("load", "state-2"),
+        ("complete", 128, {"program": "Law, UBC"}),
+    ]
+
+
+@pytest.mark.db
+def test_prefix_states_are_dropped_when_model_loads(fake_model_libs, monkeypatch):
+    # States saved for one model instance must not be restored into another.
+    monkeypatch.setattr(standardizer, "_PREFIX_STATES", {"single": "old-model-state"})
+    monkeypatch.setattr(standardizer, "_LAST_SHAPE", "single")
+
+    standardizer.warm_up()
+
+    assert standardizer._PREFIX_STATES == {}
+    assert standardizer._LAST_SHAPE is None
+
+
+FAKE_HF_HUB = """
+def hf_hub_download(**kwargs):
+    return kwargs["filename"]
+"""
+
+FAKE_LLAMA_CPP = """
+import json
+import os
+
+
+class Llama:
+    def __init__(self, n_threads, **_kwargs):
+        self.n_threads = n_threads
+
+    def _answer(self, item):
+        return {"standardized_program": item["program"],
+                "standardized_university": f"Pid {os.getpid()} Threads {self.n_threads}"}
+
+    def create_chat_completion(self, messages, **_kwargs):
+        request = json.loads(messages[-1]["content"])
+        if isinstance(request, list):
+            content = json.dumps([self._answer(item) for item in request])
+        else:
+            content = json.dumps(self._answer(request))
+        return {"choices": [{"message": {"content": content}}]}
+
+    def save_state(self):
+        return None
+
+    def load_state(self, _state):
+        return None
+"""
+
+
+@pytest.mark.db
+def test_replica_pool_shards_batches_and_keeps_order(tmp_path, monkeypatch):
+    # Batches should run in worker replicas with N_THREADS/K threads, in input order.
+    (tmp_path / "huggingface_hub.py").write_text(FAKE_HF_HUB, encoding="utf-8")
+    (tmp_path / "llama_cpp.py").write_text(FAKE_LLAMA_CPP, encoding="utf-8")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setattr(standardizer, "N_THREADS", 4)
+    monkeypatch.setattr(standardizer, "_POOL", None)
+    programs = [f"P{i}" for i in range(12)]
+
+    try:
+        pool = standardizer.start_replicas(2)
+        assert standardizer.start_replicas(2) is pool
+        results = standardizer.standardize_texts(programs, batch_size=2)
+    finally:
+        standardizer.stop_replicas()
+
+    assert [r["standardized_program"] for r in results] == programs
+    workers = {tuple(r["standardized_university"].split()[1::2]) for r in results}
+    assert all(pid != str(os.getpid()) and threads == "2" for pid, threads in workers)
+    assert standardizer._POOL is None
+
+
+@pytest.mark.db
+def test_warm_up_starts_replicas_when_configured(monkeypatch):
+    # With REPLICAS above 1, warm_up should start the pool instead of a local model.
+    started = []
+    monkeypatch.setattr(standardizer, "REPLICAS", 3)
+    monkeypatch.setattr(standardizer, "start_replicas", lambda: started.append(True))
+    monkeypatch.setattr(standardizer, "_load_llm", lambda: pytest.fail("local model loaded"))
+
+    standardizer.warm_up()
+
+    assert started == [True]
+
+
+def _mutate(rng, text):
+    # Apply a few random deletions, insertions and substitutions to text.
+    chars = list(text)
+    for _ in range(rng.randint(0, 4)):
+        op, i = rng.random(), rng.randrange(len(chars) + 1)
+        if op < 0.33 and chars:
+            chars.pop(min(i, len(chars) - 1))
+        elif op < 0.66:
+            chars.insert(i, rng.choice("abcdefghijklmnopqrstuvwxyz ,."))
+        elif chars:
+            chars[min(i, len(chars) - 1)] = rng.choice("abcdefghijklmnopqrstuvwxyz")
+    return "".join(chars).title()
+
+
+@pytest.mark.db
+@pytest.mark.parametrize("canon_name,cutoff", [
+    ("CANON_PROGS", 0.84), ("CANON_UNIS", 0.86), ("CANON_UNIS", 0.6)])
+def test_fuzzy_index_matches_difflib(canon_name, cutoff):
+    # The index must pick exactly what difflib.get_close_matches picks.
+    candidates = getattr(standardizer, canon_name)
+    index = FuzzyIndex(candidates)
+    rng = random.Random(7)
+    queries = [_mutate(rng, rng.choice(candidates)) for _ in range(300)]
+    queries += ["", "X", "Of", candidates[0], "a" * 300]
+
+    for query in queries:
+        expected = difflib.get_close_matches(query, candidates, n=1, cutoff=cutoff)
+        assert index.best_match(query, cutoff) == (expected[0] if expected else None), query
+
+
+@pytest.mark.db
+def test_fuzzy_index_edge_cases():
+    # Empty candidate lists, zero cutoffs and ties should behave like difflib.
+    assert FuzzyIndex([]).best_match("Math") is None
+    assert FuzzyIndex(["Ab", "Ba"]).best_match("Aa", 0.0) == "Ba"
+    assert FuzzyIndex(["Math", "Art"]).best_match("", 0.0) == "Math"
+    assert len(FuzzyIndex(["Math", "Math", "Art"])) == 2
+
+
+@pytest.mark.db
+def test_post_normalize_uses_fuzzy_index():
+    # Misspelled names should still snap to their canonical spelling.
+    assert standardizer._post_normalize_university("Mcgil Universty") == "McGill University"
+    assert standardizer._post_normalize_program("Computer Scince") == "Computer Science"
+
+
+@pytest.mark.db
+@pytest.mark.parametrize("raw,expected", [
+    ("McG", "McGill University"), ("mcgill", "McGill University"),
+    ("u.b.c.", "University of British Columbia"), ("UofT", "University of Toronto"),
+])
+def test_abbreviations_expand_through_combined_pattern(raw, expected):
+    # Each abbreviation should still map to its own expansion.
+    assert standardizer._post_normalize_university(raw) == expected
+
+
+@pytest.fixture
+def canon_files(tmp_path, monkeypatch):
+    # Point the canon lists at temp files and restore the real ones afterwards.
+    unis, progs = tmp_path / "unis.txt", tmp_path / "progs.txt"
+    unis.write_text("ETH Zürich\n", encoding="utf-8")
+    progs.write_text("Mathematics\n", encoding="utf-8")
+    monkeypatch.setattr(standardizer, "CANON_UNIS_PATH", str(unis))
+    monkeypatch.setattr(standardizer, "CANON_PROGS_PATH", str(progs))
+    monkeypatch.setattr(standardizer, "CANON_RELOAD_SECONDS", 0.0)
+    standardizer.reload_canon(force=True)
+    yield unis, progs
+    monkeypatch.undo()
+    standardizer.reload_canon(force=True)
+
+
+@pytest.mark.db
+def test_case_insensitive_canon_hit_keeps_official_spelling(canon_files):
+    # Title casing would give "Eth Zürich"; the folded lookup restores "ETH".
+    assert standardizer._post_normalize_university("eth zürich") == "ETH Zürich"
+    assert standardizer._post_normalize_program("MATHEMATICS") == "Mathematics"
+
+
+@pytest.mark.db
+def test_canon_files_reload_when_edited(canon_files, monkeypatch):
+    # A name appended on disk should apply to cached answers without a restart or a new version.
+    unis, _progs = canon_files
+    calls = []
+
+    def complete(**_kwargs):
+        # Answer with a misspelled university that only the edited canon corrects.
+        calls.append(1)
+        content = ('{"standardized_program": "Mathematics", '
+                   '"standardized_university": "Simon Frazer University"}')
+        return {"choices": [{"message": {"content": content}}]}
+
+    monkeypatch.setattr(standardizer, "_LLM", SimpleNamespace(create_chat_completion=complete))
+    version = standardizer.cache_version()
+    first = standardizer.standardize_texts(["Math, SFU"])
+    assert first[0]["standardized_university"] == "Simon Frazer University"
+    assert standardizer.reload_canon() is False
+
+    unis.write_text("ETH Zürich\nSimon Fraser University\n", encoding="utf-8")
+    os.utime(unis, ns=(0, 10**9))
+    second = standardizer.standardize_texts(["Math, SFU"])
+
+    assert "Simon Fraser University" in standardizer.CANON_UNIS
+    assert second[0]["standardized_university"] == "Simon Fraser University"
+    assert len(calls) == 1
+    assert standardizer.cache_version() == version == standardizer._CACHE.version
+
+
+@pytest.mark.db
+@pytest.mark.parametrize("text,expected", [
+    ("Materials Science And Engineering, Carnegie Mellon University",
+     ("Materials Science and Engineering", "Carnegie Mellon University")),
+    ("Physics at UBC", ("Physics", "University of British Columbia")),
+    ("Computer Scince, McGill Universty", ("Computer Science", "McGill University")),
+])
+def test_rules_answer_resolves_canonical_pairs(text, expected):
+    # Both halves map to canon entries, so no model call is needed.
+    answer = standardizer.rules_answer(text)
+
+    assert (answer["standardized_program"], answer["standardized_university"]) == expected
+
+
+@pytest.mark.db
+@pytest.mark.parametrize("text", [
+    "Mathematics", "Information, McG", "Physics, Nowhere Institute",
+    "Computer Science, University of California, Berkeley, CA",
+])
+def test_rules_answer_leaves_ambiguous_text_to_model(text):
+    # One part, extra parts, or a non-canonical half all go to the model.
+    assert standardizer.rules_answer(text) is None
+
+
+@pytest.mark.db
+def test_rules_fast_path_skips_model_and_reports_paths(monkeypatch):
+    # Canonical rows bypass the model; the rest are counted per path.
+    llm = RuleLlama()
+    monkeypatch.setattr(standardizer, "_LLM", llm)
+    texts = ["Physics, UBC", "Physics, UBC", "Information, McG", "Chemistry, Auburn University"]
+
+    out = standardizer.standardize_texts(texts)
+    standardizer.standardize_texts(["Information, McG"])
+    standardizer.standardize_texts(["Physics, UBC"])
+
+    assert llm.prompts == [{"program": "Information, McG"}]
+    assert out[0] == {"standardized_program": "Physics",
+                      "standardized_university": "University of British Columbia"}
+    assert standardizer.path_stats() == {
+        "rows": 6, "rules": 4, "cache": 1, "model": 1,
+        "rules_share": 0.6667, "cache_share": 0.1667, "model_share": 0.1667}
+
+
+@pytest.mark.db
+def test_rules_fast_path_can_be_disabled(monkeypatch):
+    # With the fast path off, every new text reaches the model.
+    llm = RuleLlama()
+    monkeypatch.setattr(standardizer, "_LLM", llm)
+    monkeypatch.setattr(standardizer, "RULES_FAST_PATH", False)
+
+    standardizer.standardize_texts(["Physics, UBC"])
+
+    assert llm.prompts == [{"program": "Physics, UBC"}]
+    assert standardizer.path_stats()["model_share"] == 1.0
+
+
+@pytest.mark.db
+@pytest.mark.parametrize("text", [
+    json.dumps([{"program": "A, ]x"}, {"program": "B", "n": 12345}], indent=2),
+    '{"program": "A, ]x"}\n\n{"program": "B", "n": 12345}\n',
+    json.dumps({"rows": [{"program": "A, ]x"}, {"program": "B", "n": 12345}]}),
+    "\n" * 12 + '{"program": "A, ]x"}\n{"program": "B", "n": 12345}',
+])
+def test_cli_reads_json_array_jsonl_and_rows_wrapper(tmp_path, monkeypatch, text):
+    # All three input shapes yield the same rows, even with tiny reads.
+    llm_app = _load_llm_app()
+    monkeypatch.setattr(llm_app, "CLI_READ_CHARS", 5)
+    path = tmp_path / "in.json"
+    path.write_text(text, encoding="utf-8")
+
+    assert list(llm_app._iter_rows(str(path))) == [
+        {"program": "A, ]x"}, {"program": "B", "n": 12345}]
+
+
+@pytest.mark.db
+def test_cli_streams_json_array_before_reading_it_all(tmp_path, monkeypatch):
+    # Rows are produced as soon as they parse, before a bad tail is reached.
+    llm_app = _load_llm_app()
+    monkeypatch.setattr(llm_app, "CLI_READ_CHARS", 8)
+    path = tmp_path / "in.json"
+    path.write_text('[{"program": "A"},\n {"program": "B"},\n {"program": ', encoding="utf-8")
+    rows = llm_app._iter_rows(str(path))
+
+    assert next(rows) == {"program": "A"}
+    assert next(rows) == {"program": "B"}
+    with pytest.raises(json.JSONDecodeError):
+        next(rows)
+
+
+@pytest.mark.db
+def test_cli_json_array_numbers_split_across_reads(tmp_path, monkeypatch):
+    # A bare number cut after "." or "e" by a one-character read must not be yielded early.
+    llm_app = _load_llm_app()
+    monkeypatch.setattr(llm_app, "CLI_READ_CHARS", 1)
+    path = tmp_path / "in.json"
+    path.write_text("[-500.25, 1e3,7]", encoding="utf-8")
+
+    assert list(llm_app._iter_rows(str(path))) == [-500.25, 1000.0, 7]
+
+
+@pytest.mark.db
+def test_cli_flushes_the_first_prompt_batch_before_reading_on(tmp_path, monkeypatch):
+    # The first rows are written after one prompt batch, not a full CLI chunk.
+    llm_app = _load_llm_app()
+    monkeypatch.setattr(standardizer, "_LLM", RuleLlama())
+    monkeypatch.setattr(standardizer, "RULES_FAST_PATH", False)
+    in_path, out_path = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+    in_path.write_text("".join(
+        json.dumps({"program": f"P{i}, U{i}"}) + "\n" for i in range(5)), encoding="utf-8")
+    chunks = []
+    real = llm_app.standardize_rows
+
+    def recording(rows, batch_size=None):
+        # Record how many rows each call was handed.
+        chunks.append(len(rows))
+        return real(rows, batch_size=batch_size)
+
+    monkeypatch.setattr(llm_app, "standardize_rows", recording)
+    llm_app._cli_process_file(str(in_path), str(out_path), append=False, to_stdout=False,
+                              batch_size=2)
+
+    assert chunks == [2, 3]
+    assert len(out_path.read_text(encoding="utf-8").splitlines()) == 5
+
+
+@pytest.mark.db
+def test_cli_resume_skips_rows_already_written(tmp_path, monkeypatch):
+    # Resume should keep complete lines, drop a torn one, and finish the rest.
+    llm_app = _load_llm_app()
+    llm = RuleLlama()
+    monkeypatch.setattr(standardizer, "_LLM", llm)
+    monkeypatch.setattr(standardizer, "RULES_FAST_PATH", False)
+    monkeypatch.setattr(llm_app, "CLI_CHUNK_ROWS", 2)
+    in_path, out_path = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+    in_path.write_text("".join(
+        json.dumps({"program": f"P{i}, U{i}"}) + "\n" for i in range(5)), encoding="utf-8")
+    out_path.write_text('{"done": 0}\n{"done": 1}\n{"torn', encoding="utf-8")
+
+    llm_app._cli_process_file(str(in_path), str(out_path), append=False, to_stdout=False,
+                              batch_size=1, resume=True)
+
+    lines = [json.loads(ln) for ln in out_path.read_text(encoding="utf-8").splitlines()]
+    assert lines[:2] == [{"done": 0}, {"done": 1}]
+    assert [ln["program"] for ln in lines[2:]] == ["P2, U2", "P3, U3", "P4, U4"]
+    assert [prompt["program"] for prompt in llm.prompts] == ["P2, U2", "P3, U3", "P4, U4"]